@@ -0,0 +1,26 @@
+"""Add meeting room change sequence
+
+Revision ID: 1c830be3a83f
+Revises: e31458950681
+Create Date: 2026-10-18 06:00:53.384491
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c830be3a83f'
+down_revision: Union[str, None] = 'e31458950681'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("meetingroom_change_seq")))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence("meetingroom_change_seq")))
@@ -0,0 +1,48 @@
+"""Replace change sequence with counter
+
+Revision ID: a2b2fbb95b51
+Revises: 6f6c9ad9b5fe
+Create Date: 2026-10-18 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2b2fbb95b51'
+down_revision: Union[str, None] = '6f6c9ad9b5fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('changecounter',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created', sa.DateTime(), nullable=True),
+    sa.Column('updated', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    # Номера событий продолжаются с последовательности, чтобы клиенты
+    # с Last-Event-ID получили resync, а не пропуск событий.
+    op.execute(
+        "INSERT INTO changecounter (name, value, created) "
+        "SELECT 'meetingroom_changes', "
+        "CASE WHEN is_called THEN last_value ELSE 0 END, "
+        "now() AT TIME ZONE 'utc' FROM meetingroom_change_seq"
+    )
+    op.execute(sa.schema.DropSequence(sa.Sequence("meetingroom_change_seq")))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("meetingroom_change_seq")))
+    op.execute(
+        "SELECT setval('meetingroom_change_seq', value) FROM changecounter "
+        "WHERE name = 'meetingroom_changes' AND value > 0"
+    )
+    op.drop_table('changecounter')
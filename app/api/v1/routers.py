@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.internal.api.v1 import internal_router
 from app.meeting_room.api.v1 import meeting_room_router
+from app.reservation.api.v1 import reservation_router
 
 main_router = APIRouter(prefix="/api/v1")
 main_router.include_router(
     meeting_room_router, prefix="/meeting_rooms", tags=["Meeting Rooms"]
 )
+main_router.include_router(
+    reservation_router, prefix="/reservations", tags=["Reservations"]
+)
+main_router.include_router(
+    internal_router, prefix="/internal", tags=["Internal"]
+)
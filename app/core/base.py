@@ -1,2 +1,5 @@
 from app.core.db import Base  # noqa
+from app.core.feed import ChangeCounter  # noqa
+from app.idempotency.models import IdempotencyKey  # noqa
 from app.meeting_room.models import MeetingRoom  # noqa
+from app.reservation.models import Reservation  # noqa
@@ -0,0 +1,202 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable
+
+from app.core.config import settings
+
+
+@dataclass
+class CacheStats:
+    """Счётчики кэша.
+
+    Args:
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+        evictions (int): Количество вытеснений по размеру.
+        expirations (int): Количество записей, устаревших по TTL.
+        size (int): Текущее количество записей.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+
+class CacheBackend(ABC):
+    """Интерфейс хранилища кэша.
+
+    Методы асинхронные, чтобы хранилище можно было вынести из процесса,
+    например в Redis. Значения должны быть простыми данными, а не
+    объектами ORM, привязанными к сессии.
+
+    Каждое удаление увеличивает поколение кэша. Читатель запоминает
+    поколение до запроса к базе и передаёт его в set: если за время
+    запроса запись удалила значения из кэша, прочитанное могло
+    устареть и не сохраняется.
+    """
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Any | None:
+        """Получить значение или None при промахе."""
+
+    @abstractmethod
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: int | None = None,
+    ) -> None:
+        """Сохранить значение, если поколение не изменилось."""
+
+    @abstractmethod
+    async def generation(self) -> int:
+        """Получить текущее поколение кэша."""
+
+    async def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """Получить значения по нескольким ключам.
+
+        Промахи в результат не попадают. Хранилище вне процесса может
+        переопределить метод, чтобы обойтись одним обращением.
+        """
+        values = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    async def set_many(
+        self,
+        items: dict[Hashable, Any],
+        generation: int | None = None,
+    ) -> None:
+        """Сохранить несколько значений, если поколение не изменилось."""
+        for key, value in items.items():
+            await self.set(key, value, generation)
+
+    @abstractmethod
+    async def delete(self, *keys: Hashable) -> None:
+        """Удалить значения по ключам."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Удалить все значения."""
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """Получить счётчики кэша."""
+
+
+class LRUCache(CacheBackend):
+    """Ограниченный по размеру кэш в памяти процесса с TTL.
+
+    Args:
+        max_size (int): Максимальное количество записей.
+        ttl (float): Время жизни записи в секундах.
+        clock (Callable[[], float]): Источник монотонного времени.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._stats = CacheStats()
+        self._generation = 0
+
+    async def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self._stats.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= self.clock():
+            del self._data[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: int | None = None,
+    ) -> None:
+        if generation is not None and generation != self._generation:
+            return
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def delete(self, *keys: Hashable) -> None:
+        self._generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            expirations=self._stats.expirations,
+            size=len(self._data),
+        )
+
+
+class NullCache(CacheBackend):
+    """Отключённый кэш: всегда промах."""
+
+    def __init__(self) -> None:
+        self._stats = CacheStats()
+
+    async def get(self, key: Hashable) -> Any | None:
+        self._stats.misses += 1
+        return None
+
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: int | None = None,
+    ) -> None:
+        pass
+
+    async def generation(self) -> int:
+        return 0
+
+    async def delete(self, *keys: Hashable) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+    def stats(self) -> CacheStats:
+        return CacheStats(misses=self._stats.misses)
+
+
+cache: CacheBackend = (
+    LRUCache(settings.cache_max_size, settings.cache_ttl_seconds)
+    if settings.cache_max_size > 0
+    else NullCache()
+)
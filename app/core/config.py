@@ -6,6 +6,39 @@ class Settings(BaseSettings):
     app_description: str
     database_url: str
     database_url_test: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_pgbouncer: bool = False
+    database_replica_urls: list[str] = []
+    replica_sticky_seconds: float = 2
+    replica_retry_seconds: float = 30
+    availability_refresh_seconds: int = 60
+    page_size_default: int = 100
+    page_size_max: int = 1000
+    batch_size_max: int = 500
+    cache_max_size: int = 10000
+    cache_ttl_seconds: float = 60
+    single_flight: bool = True
+    sql_statement_budget: int = 50
+    sql_budget_strict: bool = False
+    sql_n_plus_one_threshold: int = 5
+    sql_slowest_count: int = 3
+    change_feed_backend: str = "postgres"
+    change_feed_buffer_size: int = 1000
+    change_feed_queue_size: int = 100
+    change_feed_keepalive_seconds: float = 15
+    change_feed_retry_seconds: float = 5
+    catalog_snapshot: bool = False
+    catalog_snapshot_retry_seconds: float = 5
+    idempotency_ttl_seconds: float = 86400
+    idempotency_lock_seconds: float = 60
+    idempotency_wait_seconds: float = 10
+    idempotency_poll_seconds: float = 0.05
+    idempotency_cache_size: int = 10000
+    idempotency_cleanup_seconds: float = 3600
 
     class Config:
         env_file = ".env"
@@ -1,11 +1,54 @@
-from dataclasses import dataclass
-from typing import Generic, Type, TypeVar
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Sequence,
+    Type,
+    TypeVar,
+)
 
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    ColumnElement,
+    FromClause,
+    Insert,
+    Integer,
+    Row,
+    Update,
+    any_,
+    bindparam,
+    column,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import aliased, make_transient_to_detached
 
+from app.core.cache import CacheBackend, cache
 from app.core.db import Base
+from app.core.feed import (
+    CREATE,
+    DEACTIVATE,
+    RESTORE,
+    RESYNC,
+    UPDATE,
+    ChangeEvent,
+    ChangeFeed,
+    Subscription,
+)
+from app.core.pagination import Page, encode_cursor
+from app.core.singleflight import SingleFlight, single_flight
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -14,7 +57,27 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 @dataclass
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Базовые CRUD методы.
+
+    Чтение по идентификатору идёт через кэш, одинаковые одновременные
+    чтения мимо кэша объединяются в одну загрузку. Методы записи
+    публикуют изменения в ленту, если она задана, тем же запросом,
+    что изменяет объекты, и после фиксации удаляют из кэша записи
+    изменённых объектов. Кэш общий только для процесса, поэтому сессии,
+    закреплённые за основной базой, например проверки перед записью,
+    читают объект из базы, а не из кэша.
+
+    Args:
+        model (Type[ModelType]): Модель.
+        cache (CacheBackend): Хранилище кэша.
+        feed (None or ChangeFeed): Лента изменений объектов.
+        flights (SingleFlight): Объединение одинаковых чтений.
+    """
+
     model: Type[ModelType]
+    cache: CacheBackend = field(default=cache, repr=False)
+    feed: ChangeFeed | None = field(default=None, repr=False)
+    flights: SingleFlight = field(default=single_flight, repr=False)
 
     async def get_all(
         self,
@@ -31,6 +94,97 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_objs = await session.scalars(select(self.model))
         return list(db_objs.all())
 
+    async def get_page(
+        self,
+        session: AsyncSession,
+        after: int | None = None,
+        limit: int = 100,
+        *where: ColumnElement[bool],
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> Page[ModelType] | Page[Row]:
+        """Получить страницу объектов, упорядоченных по id.
+
+        Пагинация по ключу: страница начинается сразу после объекта
+        с идентификатором after, поэтому любая страница читается поиском
+        по первичному ключу, а не пропуском OFFSET строк.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+            after (None or int): Идентификатор последнего объекта
+                предыдущей страницы.
+            limit (int): Размер страницы.
+            *where (ColumnElement[bool]): Дополнительные условия отбора.
+            columns (None or Sequence[ColumnElement]): Читаемые столбцы,
+                среди них должен быть id. По умолчанию читаются объекты.
+
+        Returns:
+            Page[ModelType] | Page[Row]: Страница объектов или строк
+                и курсор следующей.
+        """
+        query = select(*columns) if columns else select(self.model)
+        query = query.where(*where)
+        if after is not None:
+            query = query.where(self.model.id > after)
+        # Лишняя строка показывает, есть ли следующая страница.
+        query = query.order_by(self.model.id).limit(limit + 1)
+        if columns:
+            items = list((await session.execute(query)).all())
+        else:
+            items = list((await session.scalars(query)).all())
+        if len(items) <= limit:
+            return Page(items, None)
+        items = items[:limit]
+        return Page(items, encode_cursor(items[-1].id))
+
+    async def stream(
+        self,
+        bind: AsyncEngine,
+        columns: Sequence[ColumnElement],
+        *where: ColumnElement[bool],
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Читать столбцы объектов пачками через серверный курсор.
+
+        Генератор держит собственное соединение, поэтому его можно
+        отдавать в потоковый ответ, который читается уже после выхода
+        из эндпоинта. Строки не попадают в identity map сессии,
+        и память не растёт вместе с размером таблицы.
+
+        Args:
+            bind (AsyncEngine): Движок базы данных.
+            columns (Sequence[ColumnElement]): Выбираемые столбцы.
+            *where (ColumnElement[bool]): Условия отбора.
+            yield_per (int): Размер пачки.
+
+        Yields:
+            Sequence[Row]: Пачка строк.
+        """
+        async with bind.connect() as connection:
+            result = await connection.stream(
+                select(*columns)
+                .where(*where)
+                .order_by(self.model.id)
+                .execution_options(yield_per=yield_per)
+            )
+            async for partition in result.partitions():
+                yield partition
+
+    async def get_version(self, session: AsyncSession) -> int:
+        """Получить версию набора объектов для ETag коллекции.
+
+        Версия - зафиксированное значение счётчика ленты изменений.
+        Каждая запись увеличивает счётчик в своей транзакции и держит
+        его до фиксации, поэтому версия растёт в порядке фиксации
+        и не зависит от часов процессов. Нужна лента изменений.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            int: Номер последнего зафиксированного изменения.
+        """
+        return await self.feed.get_version(session)
+
     async def get_by_id(
         self,
         obj_id: int,
@@ -45,7 +199,68 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             ModelType: Полученный объект.
         """
-        return await session.get(self.model, obj_id)
+        key = self._cache_key("id", obj_id)
+        if not session.info.get("primary"):
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return await self._from_cache(cached, session)
+
+        async def load() -> list[ModelType]:
+            # Поколение запоминается до запроса: если запись удалит объект
+            # из кэша раньше, чем он будет сохранён, прочитанное устарело.
+            generation = await self.cache.generation()
+            db_obj = await session.get(self.model, obj_id)
+            if db_obj is None:
+                return []
+            await self.cache.set(key, self._to_cache(db_obj), generation)
+            return [db_obj]
+
+        db_objs = await self._single_flight(key, session, load)
+        return db_objs[0] if db_objs else None
+
+    async def get_many(
+        self,
+        obj_ids: Sequence[int],
+        session: AsyncSession,
+    ) -> dict[int, ModelType]:
+        """Получить объекты по нескольким идентификаторам.
+
+        Объекты из кэша используются без запроса, остальные читаются
+        одним запросом WHERE id = ANY(...) и попадают в кэш.
+
+        Args:
+            obj_ids (Sequence[int]): Идентификаторы объектов.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            dict[int, ModelType]: Найденные объекты по идентификаторам
+                в порядке запроса.
+        """
+        obj_ids = list(dict.fromkeys(obj_ids))
+        cached = await self.cache.get_many(
+            self._cache_key("id", obj_id) for obj_id in obj_ids
+        )
+        found = {}
+        for obj_id in obj_ids:
+            data = cached.get(self._cache_key("id", obj_id))
+            if data is not None:
+                found[obj_id] = await self._from_cache(data, session)
+
+        missing = [obj_id for obj_id in obj_ids if obj_id not in found]
+        if missing:
+            generation = await self.cache.generation()
+            db_objs = await session.scalars(
+                select(self.model).where(
+                    self.model.id
+                    == any_(bindparam("ids", missing, type_=ARRAY(Integer)))
+                )
+            )
+            to_cache = {}
+            for db_obj in db_objs:
+                found[db_obj.id] = db_obj
+                to_cache[self._cache_key("id", db_obj.id)] = self._to_cache(db_obj)
+            await self.cache.set_many(to_cache, generation)
+        return {obj_id: found[obj_id] for obj_id in obj_ids if obj_id in found}
 
     async def create(
         self,
@@ -54,6 +269,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> ModelType:
         """Создать объект.
 
+        Значения, сгенерированные базой, возвращаются тем же запросом
+        через RETURNING, без отдельного SELECT после фиксации.
+
         Args:
             obj_in (CreateSchemaType): Входные данные для нового объекта.
             session (AsyncSession): Сессия базы данных.
@@ -62,10 +280,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             ModelType: Созданный объект.
         """
         obj_in_data = obj_in.model_dump()
-        db_obj = self.model(**obj_in_data)
-        session.add(db_obj)
+        (db_obj,) = await self._write(
+            session,
+            insert(self.model).values(**obj_in_data),
+            CREATE,
+        )
         await session.commit()
-        await session.refresh(db_obj)
+        await self.invalidate(db_obj)
         return db_obj
 
     async def update(
@@ -73,46 +294,55 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: UpdateSchemaType,
         session: AsyncSession,
-    ) -> ModelType:
+        *where: ColumnElement[bool],
+    ) -> ModelType | None:
         """Обновить объект.
 
         Args:
             db_obj (ModelType): Объект для обновления.
             obj_in (UpdateSchemaType): Входные данные для обновления.
             session (AsyncSession): Сессия базы данных.
+            *where (ColumnElement[bool]): Дополнительные условия,
+                например на версию объекта.
 
         Returns:
-            ModelType: Обновленный объект.
+            ModelType | None: Обновленный объект, None если условия
+                не выполнены.
         """
         update_data = obj_in.model_dump(exclude_unset=True)
-
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        return await self._update_by_id(
+            db_obj,
+            update_data,
+            session,
+            *where,
+            kind=UPDATE,
+        )
 
     async def remove(
         self,
         db_obj: ModelType,
         session: AsyncSession,
-    ) -> ModelType:
+        *where: ColumnElement[bool],
+    ) -> ModelType | None:
         """Мягкое удаление объекта.
 
         Args:
             db_obj (ModelType): Объект для удаления.
             session (AsyncSession): Сессия базы данных.
+            *where (ColumnElement[bool]): Дополнительные условия,
+                например на версию объекта.
 
         Returns:
-            ModelType: Удаленный объект.
+            ModelType | None: Удаленный объект, None если условия
+                не выполнены.
         """
-        db_obj.is_active = False
-        session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        return await self._update_by_id(
+            db_obj,
+            {"is_active": False},
+            session,
+            *where,
+            kind=DEACTIVATE,
+        )
 
     async def restore(
         self,
@@ -131,12 +361,361 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             ModelType: Восстановленный объект.
         """
         restore_data = obj_in.model_dump(exclude_unset=True)
+        restore_data["is_active"] = True
+        return await self._update_by_id(
+            db_obj,
+            restore_data,
+            session,
+            kind=RESTORE,
+        )
 
-        for field, value in restore_data.items():
-            setattr(db_obj, field, value)
+    async def bulk_create(
+        self,
+        objs_in: Sequence[CreateSchemaType],
+        session: AsyncSession,
+    ) -> list[ModelType]:
+        """Создать объекты одним многострочным INSERT ... RETURNING.
 
-        db_obj.is_active = True
-        session.add(db_obj)
+        Args:
+            objs_in (Sequence[CreateSchemaType]): Входные данные объектов.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            list[ModelType]: Созданные объекты в порядке входных данных.
+        """
+        if not objs_in:
+            return []
+        # Строки VALUES получают id по порядку, поэтому объекты,
+        # упорядоченные по id, идут в порядке входных данных.
+        db_objs = await self._write(
+            session,
+            insert(self.model).values([obj_in.model_dump() for obj_in in objs_in]),
+            CREATE,
+        )
+        await session.commit()
+        await self.invalidate(*db_objs)
+        return db_objs
+
+    async def bulk_update(
+        self,
+        objs_in: Sequence[tuple[int, UpdateSchemaType]],
+        session: AsyncSession,
+        *where: ColumnElement[bool],
+    ) -> dict[int, ModelType]:
+        """Обновить объекты запросами UPDATE ... FROM (VALUES ...).
+
+        Объекты с одинаковым набором изменяемых полей обновляются одним
+        запросом, все запросы выполняются в одной транзакции.
+
+        Args:
+            objs_in (Sequence[tuple[int, UpdateSchemaType]]): Пары
+                идентификатор объекта и входные данные для обновления.
+            session (AsyncSession): Сессия базы данных.
+            *where (ColumnElement[bool]): Дополнительные условия отбора.
+
+        Returns:
+            dict[int, ModelType]: Обновленные объекты по идентификаторам,
+                ненайденных объектов в словаре нет.
+        """
+        groups: dict[tuple[str, ...], list[tuple]] = {}
+        for obj_id, obj_in in objs_in:
+            update_data = obj_in.model_dump(exclude_unset=True)
+            groups.setdefault(tuple(update_data), []).append(
+                (obj_id, *update_data.values())
+            )
+
+        table = self.model.__table__
+        updated = {}
+        for fields, rows in groups.items():
+            data = values(
+                column("id", Integer),
+                *(column(field, table.c[field].type) for field in fields),
+                name="data",
+            ).data(rows)
+            db_objs = await self._write(
+                session,
+                update(self.model)
+                .where(self.model.id == data.c.id, *where)
+                .values({field: data.c[field] for field in fields}),
+                UPDATE,
+            )
+            updated.update((db_obj.id, db_obj) for db_obj in db_objs)
         await session.commit()
-        await session.refresh(db_obj)
+        await self.invalidate(*updated.values())
+        return updated
+
+    async def bulk_remove(
+        self,
+        obj_ids: Sequence[int],
+        session: AsyncSession,
+        *where: ColumnElement[bool],
+    ) -> dict[int, ModelType]:
+        """Мягкое удаление объектов запросом UPDATE ... WHERE id = ANY.
+
+        Args:
+            obj_ids (Sequence[int]): Идентификаторы объектов.
+            session (AsyncSession): Сессия базы данных.
+            *where (ColumnElement[bool]): Дополнительные условия отбора.
+
+        Returns:
+            dict[int, ModelType]: Удаленные объекты по идентификаторам,
+                ненайденных объектов в словаре нет.
+        """
+        db_objs = await self._write(
+            session,
+            update(self.model)
+            .where(
+                self.model.id
+                == any_(bindparam("ids", list(obj_ids), type_=ARRAY(Integer))),
+                *where,
+            )
+            .values(is_active=False),
+            DEACTIVATE,
+        )
+        removed = {db_obj.id: db_obj for db_obj in db_objs}
+        await session.commit()
+        await self.invalidate(*removed.values())
+        return removed
+
+    async def _update_by_id(
+        self,
+        db_obj: ModelType,
+        values: dict,
+        session: AsyncSession,
+        *where: ColumnElement[bool],
+        kind: str = UPDATE,
+    ) -> ModelType | None:
+        """Обновить строку объекта одним запросом UPDATE ... RETURNING.
+
+        Объект в сессии получает новые значения из RETURNING, поэтому
+        после фиксации его не нужно перечитывать.
+
+        Args:
+            db_obj (ModelType): Объект для обновления.
+            values (dict): Новые значения полей.
+            session (AsyncSession): Сессия базы данных.
+            *where (ColumnElement[bool]): Дополнительные условия.
+            kind (str): Тип события в ленте изменений.
+
+        Returns:
+            ModelType | None: Обновленный объект, None если строка
+                не удовлетворяет условиям.
+        """
+        # Ключи считаются до запроса, пока у объекта прежние значения.
+        stale_keys = self._cache_keys(db_obj)
+        db_objs = await self._write(
+            session,
+            update(self.model)
+            .where(self.model.id == db_obj.id, *where)
+            .values(**values),
+            kind,
+        )
+        db_obj = db_objs[0] if db_objs else None
+        await session.commit()
+        await self.cache.delete(*stale_keys)
+        if db_obj is not None:
+            await self.invalidate(db_obj)
         return db_obj
+
+    async def invalidate(self, *db_objs: ModelType) -> None:
+        """Удалить из кэша записи объектов.
+
+        Args:
+            *db_objs (ModelType): Изменённые объекты.
+        """
+        keys = [key for db_obj in db_objs for key in self._cache_keys(db_obj)]
+        if keys:
+            await self._evict(keys)
+
+    @asynccontextmanager
+    async def invalidating(self, lag_seconds: float = 0) -> AsyncIterator[None]:
+        """Удалять из кэша объекты по событиям ленты, пока открыт контекст.
+
+        Так до кэша процесса доходят записи других процессов. Чтение
+        из отстающей реплики сразу после записи может вернуть прежнюю
+        строку и снова положить её в кэш, поэтому с репликами записи
+        кэша удаляются повторно через lag_seconds после события.
+        Без ленты изменений контекст ничего не делает.
+
+        Args:
+            lag_seconds (float): Наибольшее отставание реплик в секундах,
+                0 если чтения идут только в основную базу.
+        """
+        if self.feed is None:
+            yield
+            return
+        subscription = self.feed.broker.subscribe()
+        task = asyncio.create_task(self._follow(subscription, lag_seconds))
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            subscription.close()
+
+    async def _follow(self, subscription: Subscription, lag_seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+        # Повторные удаления: время и ключи, None - очистка всего кэша.
+        delayed: deque[tuple[float, list[Hashable] | None]] = deque()
+        while True:
+            timeout = delayed[0][0] - loop.time() if delayed else None
+            try:
+                change = await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._evict(delayed.popleft()[1])
+                continue
+            # После resync неизвестно, какие объекты изменились.
+            keys = None if change.kind == RESYNC else self._change_keys(change)
+            await self._evict(keys)
+            if lag_seconds:
+                delayed.append((loop.time() + lag_seconds, keys))
+
+    async def _evict(self, keys: list[Hashable] | None) -> None:
+        """Удалить записи кэша и забыть выполняющиеся загрузки по ним.
+
+        Args:
+            keys (None or list[Hashable]): Ключи кэша, None - очистить
+                весь кэш.
+        """
+        if keys is None:
+            await self.cache.clear()
+            return
+        await self.cache.delete(*keys)
+        # Список активных объектов, загружаемый сейчас, может не увидеть
+        # изменения, поэтому новые чтения к нему не присоединяются.
+        keys = [*keys, self._cache_key("active", None)]
+        self.flights.forget(
+            *((key, primary) for key in keys for primary in (False, True))
+        )
+
+    async def _write(
+        self,
+        session: AsyncSession,
+        statement: Insert | Update,
+        kind: str | Callable[[FromClause], ColumnElement[str]],
+    ) -> list[ModelType]:
+        """Выполнить запрос записи с RETURNING и опубликовать изменения.
+
+        С лентой изменений запрос записи становится CTE, и события
+        публикуются тем же запросом, без отдельного обращения к базе.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+            statement (Insert | Update): Запрос записи без RETURNING.
+            kind (str | Callable[[FromClause], ColumnElement[str]]): Тип
+                события или функция, строящая тип для каждой строки
+                по записанным строкам.
+
+        Returns:
+            list[ModelType]: Записанные объекты по возрастанию id.
+        """
+        options = {"populate_existing": True}
+        if self.feed is None:
+            db_objs = await session.scalars(
+                statement.returning(self.model),
+                execution_options={**options, "synchronize_session": False},
+            )
+            return sorted(db_objs, key=lambda db_obj: db_obj.id)
+        columns = self._columns()
+        written = statement.returning(*columns).cte("written")
+        data = func.jsonb_build_object(
+            *(
+                item
+                for column_ in columns
+                for item in (column_.key, written.c[column_.name])
+            )
+        )
+        rows = await self.feed.write(
+            session,
+            written,
+            data,
+            kind if isinstance(kind, str) else kind(written),
+            aliased(self.model, written),
+            execution_options=options,
+        )
+        return [db_obj for (db_obj,) in rows]
+
+    async def _single_flight(
+        self,
+        key: Hashable,
+        session: AsyncSession,
+        load: Callable[[], Awaitable[list[ModelType]]],
+    ) -> list[ModelType]:
+        """Загрузить объекты, объединив загрузку с такой же выполняющейся.
+
+        Загрузку выполняет первый запрос в своей сессии. Остальные
+        получают снимки значений столбцов и восстанавливают объекты
+        в своих сессиях без запроса к базе, как из кэша. Чтения сессий,
+        закреплённых за основной базой, не объединяются с чтениями,
+        которые могут идти в реплику.
+
+        Args:
+            key (Hashable): Ключ загрузки.
+            session (AsyncSession): Сессия базы данных.
+            load (Callable[[], Awaitable[list[ModelType]]]): Загрузка
+                объектов в сессии session.
+
+        Returns:
+            list[ModelType]: Объекты в сессии session.
+        """
+        db_objs = None
+
+        async def load_rows() -> list[dict[str, Any]]:
+            nonlocal db_objs
+            db_objs = await load()
+            return [self._to_cache(db_obj) for db_obj in db_objs]
+
+        rows = await self.flights.do(
+            (key, bool(session.info.get("primary"))),
+            load_rows,
+        )
+        if db_objs is not None:
+            return db_objs
+        return [await self._from_cache(row, session) for row in rows]
+
+    def _cache_key(self, field_name: str, value: Any) -> Hashable:
+        return (self.model.__tablename__, field_name, value)
+
+    def _cache_keys(self, db_obj: ModelType) -> list[Hashable]:
+        """Ключи кэша, по которым может храниться объект."""
+        return [self._cache_key("id", db_obj.id)]
+
+    def _change_keys(self, change: ChangeEvent) -> list[Hashable]:
+        """Ключи кэша объекта из события ленты.
+
+        Если значения не поместились в уведомление, удаляется только
+        запись по id: остальные ключи проверяются по ней при чтении.
+        """
+        if change.data is None:
+            return [self._cache_key("id", change.id)]
+        return self._cache_keys(self.model(**change.data))
+
+    def _columns(self) -> list[ColumnElement]:
+        """Столбцы, загружаемые с объектом, без отложенных."""
+        return [
+            attr.columns[0]
+            for attr in self.model.__mapper__.column_attrs
+            if not attr.deferred
+        ]
+
+    def _to_cache(self, db_obj: ModelType) -> dict[str, Any]:
+        """Снимок значений столбцов объекта для хранения в кэше.
+
+        Отложенные столбцы не загружаются с объектом и в кэш не попадают.
+        """
+        return {
+            attr.key: getattr(db_obj, attr.key)
+            for attr in self.model.__mapper__.column_attrs
+            if not attr.deferred
+        }
+
+    async def _from_cache(
+        self,
+        data: dict[str, Any],
+        session: AsyncSession,
+    ) -> ModelType:
+        """Восстановить объект из кэша в сессии без запроса к базе."""
+        db_obj = self.model(**data)
+        make_transient_to_detached(db_obj)
+        return await session.merge(db_obj, load=False)
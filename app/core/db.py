@@ -1,8 +1,11 @@
 from datetime import datetime
 from typing import AsyncGenerator
+from uuid import uuid4
 
+from fastapi import Request
 from sqlalchemy import Column, DateTime, Integer
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -10,6 +13,9 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import declarative_base, declared_attr
 
 from app.core.config import settings
+from app.core.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedNullPool
+from app.core.profiling import instrument_engine
+from app.core.replicas import ReplicaSet, RoutingSession
 
 
 def fresh_timestamp() -> datetime:
@@ -37,11 +43,102 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession)
+def create_db_engine(database_url: str) -> AsyncEngine:
+    """Создать движок с настройками пула из конфигурации.
 
+    В режиме pgbouncer пулом соединений управляет pgbouncer: приложение
+    не удерживает соединения, а кэш подготовленных запросов asyncpg
+    отключён, так как в режиме транзакций соединение с сервером
+    меняется между запросами.
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    Args:
+        database_url (str): Адрес базы данных.
+
+    Returns:
+        AsyncEngine: Движок базы данных.
+    """
+    if settings.db_pgbouncer:
+        return create_async_engine(
+            database_url,
+            poolclass=InstrumentedNullPool,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        )
+    return create_async_engine(
+        database_url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+engine = create_db_engine(settings.database_url)
+
+replica_set = ReplicaSet(
+    [create_db_engine(url) for url in settings.database_replica_urls],
+    sticky_seconds=settings.replica_sticky_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+)
+
+for instrumented in (engine, *replica_set.engines):
+    instrument_engine(instrumented)
+
+# Объекты не устаревают после фиксации: значения, полученные через
+# RETURNING, остаются актуальными без повторного SELECT.
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    replicas=replica_set,
+)
+
+# Методы, которые не меняют данные и могут читать из реплики.
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def get_async_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия базы данных запроса.
+
+    Соединение берётся из пула только при первом запросе к базе,
+    поэтому эндпоинты, которые отвечают из кэша или снимка, пул
+    не занимают. Маршруты SessionReleasingRoute закрывают сессию сразу
+    после эндпоинта, здесь она закрывается повторно без обращения
+    к базе.
+
+    Args:
+        request (Request): Запрос.
+
+    Yields:
+        AsyncSession: Сессия базы данных.
+    """
     async with AsyncSessionLocal() as async_session:
+        if request.method not in SAFE_METHODS:
+            # Проверки перед записью не должны читать отстающую реплику.
+            async_session.info["primary"] = True
         yield async_session
+
+
+def get_read_engine(session: AsyncSession) -> AsyncEngine:
+    """Движок, из которого сессия читала бы сейчас.
+
+    Нужен для чтения на отдельном соединении, например потоковой
+    выгрузки, которая переживает сессию запроса.
+
+    Args:
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        AsyncEngine: Движок реплики или основной базы.
+    """
+    return AsyncEngine(session.sync_session.get_bind())
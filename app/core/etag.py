@@ -0,0 +1,123 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Type
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, func
+
+from app.core.db import Base
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def version_column(model: Type[Base]) -> ColumnElement[datetime]:
+    """Версия строки: время последнего изменения или создания."""
+    return func.coalesce(model.updated, model.created)
+
+
+def object_etag(db_obj: Base) -> str:
+    """Слабый ETag объекта из его id и времени последнего изменения.
+
+    Args:
+        db_obj (Base): Объект модели.
+
+    Returns:
+        str: Значение заголовка ETag.
+    """
+    version = (db_obj.updated or db_obj.created) - EPOCH
+    return f'W/"{db_obj.id}-{version // MICROSECOND}"'
+
+
+def collection_etag(*parts: Any) -> str:
+    """Слабый ETag коллекции из её версии и параметров запроса.
+
+    Args:
+        *parts (Any): Версия коллекции и параметры выборки.
+
+    Returns:
+        str: Значение заголовка ETag.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def parse_etags(header: str) -> list[str]:
+    """Разобрать список ETag из If-Match или If-None-Match.
+
+    Признак слабого ETag отбрасывается: сравнение всегда слабое.
+    """
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tags.append(tag.strip('"'))
+    return tags
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Проверить, совпадает ли ETag с одним из ETag заголовка.
+
+    Args:
+        header (None or str): Значение If-None-Match.
+        etag (str): Текущий ETag ресурса.
+
+    Returns:
+        bool: True, если у клиента актуальная версия ресурса.
+    """
+    if header is None:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or parse_etags(etag)[0] in tags
+
+
+def if_match_clauses(
+    model: Type[Base],
+    obj_id: int,
+    if_match: str | None,
+) -> list[ColumnElement[bool]]:
+    """Условия UPDATE для оптимистичной блокировки по If-Match.
+
+    Версия проверяется самим запросом на изменение, а не сравнением
+    с прочитанным (возможно, из кэша) объектом, поэтому конкурентная
+    запись между чтением и изменением тоже будет замечена.
+
+    Args:
+        model (Type[Base]): Модель.
+        obj_id (int): Идентификатор изменяемого объекта.
+        if_match (None or str): Значение заголовка If-Match.
+
+    Raises:
+        HTTPException: Если ни один ETag не относится к объекту.
+
+    Returns:
+        list[ColumnElement[bool]]: Условия для WHERE, пустой список,
+            если заголовка нет или он равен *.
+    """
+    if if_match is None:
+        return []
+    tags = parse_etags(if_match)
+    if "*" in tags:
+        return []
+
+    versions = []
+    for tag in tags:
+        tag_id, _, version = tag.partition("-")
+        if tag_id == str(obj_id) and version.isdigit():
+            versions.append(EPOCH + int(version) * MICROSECOND)
+    if not versions:
+        raise_precondition_failed()
+    return [version_column(model).in_(versions)]
+
+
+def raise_precondition_failed() -> None:
+    """Ответить 412, если объект изменился после получения клиентом.
+
+    Raises:
+        HTTPException: Всегда.
+    """
+    raise HTTPException(
+        status_code=412,
+        detail="Объект был изменён, получите актуальную версию!",
+    )
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+
+class ExportFormat(str, Enum):
+    """Формат выгрузки."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.ndjson: "application/x-ndjson",
+            ExportFormat.csv: "text/csv; charset=utf-8",
+        }[self]
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence[Row]],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Кодировать пачки строк в NDJSON или CSV по мере их чтения.
+
+    Каждая пачка превращается в один фрагмент ответа, поэтому в памяти
+    одновременно находится не больше одной пачки.
+
+    Args:
+        partitions (AsyncIterator[Sequence[Row]]): Пачки строк выборки.
+        fields (Sequence[str]): Названия полей в порядке столбцов.
+        export_format (ExportFormat): Формат выгрузки.
+
+    Yields:
+        bytes: Фрагмент ответа.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format is ExportFormat.csv:
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    async for rows in partitions:
+        if export_format is ExportFormat.csv:
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                buffer.write(
+                    json.dumps(
+                        {
+                            field: value
+                            for field, value in zip(fields, row)
+                            if value is not None
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+                buffer.write("\n")
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,558 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, Sequence
+
+import asyncpg
+import orjson
+from sqlalchemy import (
+    BigInteger,
+    CTE,
+    Column,
+    ColumnElement,
+    DateTime,
+    String,
+    Text,
+    bindparam,
+    case,
+    cast,
+    column,
+    event,
+    func,
+    literal,
+    select,
+    text,
+    true,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import Base, fresh_timestamp
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DEACTIVATE = "deactivate"
+RESTORE = "restore"
+# Пропущенные события восстановить нельзя: клиенту нужно перечитать
+# список целиком.
+RESYNC = "resync"
+
+# Размер уведомления NOTIFY ограничен 8000 байт, часть оставлена
+# под тип, идентификатор и номер события.
+NOTIFY_PAYLOAD_MAX = 7900
+
+# События, ожидающие фиксации транзакции сессии.
+PENDING_KEY = "change_feed_pending"
+
+
+class ChangeCounter(Base):
+    """Модель счётчика событий ленты изменений.
+
+    Запись увеличивает счётчик тем же запросом, что изменяет объекты,
+    и держит блокировку его строки до фиксации, поэтому номера событий
+    растут в порядке фиксации транзакций, а зафиксированное значение -
+    номер последнего видимого изменения.
+
+    Args:
+        name (str): Канал ленты.
+        value (int): Номер последнего события.
+    """
+
+    name = Column(String(100), unique=True, nullable=False)
+    value = Column(BigInteger, nullable=False)
+
+
+@dataclass
+class ChangeEvent:
+    """Событие изменения объекта.
+
+    Args:
+        seq (int): Номер события, растёт вместе с изменениями.
+        kind (str): Тип события: create, update, deactivate, restore
+            или resync.
+        id (None or int): Идентификатор объекта.
+        data (None or dict[str, Any]): Значения столбцов объекта после
+            изменения, None если они не поместились в уведомление.
+    """
+
+    seq: int
+    kind: str
+    id: int | None = None
+    data: dict[str, Any] | None = None
+
+    def to_sse(self) -> bytes:
+        """Событие в формате Server-Sent Events.
+
+        Поля со значением None опускаются, как в ответах API. Если
+        значений нет, в data передаётся только идентификатор.
+        """
+        if self.data is not None:
+            data = {key: value for key, value in self.data.items() if value is not None}
+        elif self.id is not None:
+            data = {"id": self.id}
+        else:
+            data = {}
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+            self.seq,
+            self.kind.encode(),
+            orjson.dumps(data),
+        )
+
+
+class Subscription:
+    """Очередь событий одного подписчика.
+
+    Если подписчик не успевает читать и очередь заполнена, накопленные
+    события заменяются одним событием resync.
+
+    Args:
+        broker (ChangeBroker): Брокер, от которого получены события.
+        max_size (int): Наибольшая длина очереди.
+        events (Iterable[ChangeEvent]): События для повтора после
+            переподключения, не ограничены max_size.
+    """
+
+    def __init__(
+        self,
+        broker: "ChangeBroker",
+        max_size: int,
+        events: Iterable[ChangeEvent] = (),
+    ) -> None:
+        self.broker = broker
+        self.max_size = max_size
+        self._events: deque[ChangeEvent] = deque(events)
+        self._ready = asyncio.Event()
+
+    def push(self, event: ChangeEvent) -> None:
+        if len(self._events) >= self.max_size:
+            self._events.clear()
+            event = ChangeEvent(event.seq, RESYNC)
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self) -> ChangeEvent:
+        """Дождаться следующего события."""
+        while not self._events:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._events.popleft()
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли события, которые подписчик ещё не прочитал."""
+        return bool(self._events)
+
+    def clear(self) -> None:
+        """Пропустить все непрочитанные события."""
+        self._events.clear()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class ChangeBroker:
+    """Рассылка событий подписчикам внутри процесса.
+
+    Последние события хранятся в кольцевом буфере, чтобы клиент после
+    переподключения получил пропущенные события по номеру последнего
+    полученного, а не перечитывал список.
+
+    Args:
+        buffer_size (int): Количество хранимых последних событий.
+        queue_size (int): Наибольшая очередь одного подписчика.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int) -> None:
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.head = 0
+        self._buffer: deque[ChangeEvent] = deque()
+        self._subscribers: set[Subscription] = set()
+        # Все события с номером больше floor есть в буфере или ещё придут.
+        self._floor = 0
+
+    def publish(self, event: ChangeEvent) -> None:
+        self._buffer.append(event)
+        if len(self._buffer) > self.buffer_size:
+            self._floor = max(self._floor, self._buffer.popleft().seq)
+        self.head = max(self.head, event.seq)
+        for subscription in list(self._subscribers):
+            subscription.push(event)
+
+    def reset(self, head: int) -> None:
+        """Начать отсчёт заново после возможного пропуска событий.
+
+        События новее head остаются в буфере, текущие подписчики
+        получают resync.
+
+        Args:
+            head (int): Номер последнего события, которое могло быть
+                пропущено.
+        """
+        self._buffer = deque(event for event in self._buffer if event.seq > head)
+        self._floor = head
+        self.head = max([head, *(event.seq for event in self._buffer)])
+        for subscription in list(self._subscribers):
+            subscription.push(ChangeEvent(head, RESYNC))
+
+    def subscribe(self, after: int | None = None) -> Subscription:
+        """Подписаться на события.
+
+        Args:
+            after (None or int): Номер последнего полученного клиентом
+                события. Если события после него уже вытеснены из буфера
+                или номер из будущего, первым приходит resync.
+
+        Returns:
+            Subscription: Очередь событий подписчика.
+        """
+        events = []
+        if after is not None:
+            if self._floor <= after <= self.head:
+                events = [event for event in self._buffer if event.seq > after]
+            else:
+                events = [ChangeEvent(self.head, RESYNC)]
+        subscription = Subscription(self, self.queue_size, events)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+class ChangeFeed:
+    """Лента изменений объектов одной таблицы.
+
+    Методы записи CRUD публикуют события тем же запросом, что изменяет
+    объекты: запрос записи с RETURNING становится CTE, к которому
+    добавляются увеличение счётчика и уведомления. Запись по-прежнему
+    занимает один запрос и фиксацию.
+
+    Номера событий берутся из счётчика ChangeCounter в базе, общего
+    для всех процессов: клиент может продолжить с того же номера,
+    переподключившись к любому процессу. Блокировка строки счётчика
+    до фиксации упорядочивает записи, поэтому событие с меньшим номером
+    не может прийти позже события с большим. Счётчик изменяется
+    последним запросом перед фиксацией, и блокировка держится только
+    на время фиксации.
+
+    В режиме postgres события отправляются через NOTIFY в том же
+    запросе и доходят до слушателей всех процессов только после
+    фиксации. Уведомление о собственной записи приходит позже ответа
+    на неё, поэтому номер последнего события, зафиксированного
+    процессом, запоминается сразу после фиксации в last_committed.
+
+    В режиме local события копятся в сессии и передаются брокеру
+    процесса после фиксации. Режим для тестов и одного процесса.
+
+    Args:
+        channel (str): Канал LISTEN/NOTIFY и имя счётчика.
+        backend (str): Режим: postgres или local.
+        broker (None or ChangeBroker): Брокер подписчиков процесса.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        backend: str = settings.change_feed_backend,
+        broker: ChangeBroker | None = None,
+    ) -> None:
+        self.channel = channel
+        self.backend = backend
+        self.broker = broker or ChangeBroker(
+            settings.change_feed_buffer_size,
+            settings.change_feed_queue_size,
+        )
+        self.last_committed = 0
+        self._connected = False
+
+    def _bump(self, written: CTE) -> CTE:
+        """Запрос, увеличивающий счётчик на количество записанных строк.
+
+        Если строк нет, счётчик не изменяется и не блокируется. Запрос
+        текстовый: SQLAlchemy вычисляет значения по умолчанию столбцов
+        только для одного INSERT или UPDATE в запросе, и им должна
+        остаться запись объектов.
+
+        Args:
+            written (CTE): Записанные строки.
+
+        Returns:
+            CTE: INSERT ... ON CONFLICT DO UPDATE ... RETURNING value.
+        """
+        table = ChangeCounter.__tablename__
+        return (
+            text(
+                f'INSERT INTO "{table}" (name, value, created) '
+                "SELECT :counter_name, count(*), :counter_created "
+                f'FROM "{written.name}" '
+                "HAVING count(*) > 0 "
+                "ON CONFLICT (name) DO UPDATE "
+                f'SET value = "{table}".value + excluded.value, '
+                "updated = excluded.created "
+                "RETURNING value"
+            )
+            .bindparams(
+                bindparam("counter_name", self.channel, type_=String),
+                bindparam(
+                    "counter_created", fresh_timestamp(), type_=DateTime
+                ),
+            )
+            .columns(column("value", BigInteger))
+            .cte("counter")
+        )
+
+    async def write(
+        self,
+        session: AsyncSession,
+        written: CTE,
+        data: ColumnElement,
+        kind: str | ColumnElement[str],
+        *columns: Any,
+        execution_options: dict[str, Any] | None = None,
+    ) -> list[Sequence[Any]]:
+        """Выполнить запись и опубликовать её изменения одним запросом.
+
+        Строки written получают номера событий по возрастанию id,
+        счётчик увеличивается на их количество. В режиме postgres
+        каждая строка отправляется через NOTIFY, значения, которые
+        не помещаются в уведомление, заменяются идентификатором.
+
+        Args:
+            session (AsyncSession): Сессия, в которой выполняется запись.
+            written (CTE): CTE запроса записи с RETURNING или другой
+                источник строк со столбцом id.
+            data (ColumnElement): Значения столбцов строки в JSONB.
+            kind (str | ColumnElement[str]): Тип события, общий или
+                для каждой строки.
+            *columns (Any): Выбираемые из written столбцы или сущности.
+            execution_options (None or dict[str, Any]): Параметры
+                выполнения запроса.
+
+        Returns:
+            list[Sequence[Any]]: Значения columns для каждой записанной
+                строки по возрастанию id.
+        """
+        counter = self._bump(written)
+        seq = (
+            counter.c.value
+            - func.count().over()
+            + func.row_number().over(order_by=written.c.id)
+        )
+        if isinstance(kind, str):
+            kind = literal(kind, String)
+        if self.backend == "postgres":
+            message = func.jsonb_build_object(
+                "kind", kind, "id", written.c.id, "seq", seq
+            ).op("||")(
+                case(
+                    (
+                        func.octet_length(cast(data, Text)) > NOTIFY_PAYLOAD_MAX,
+                        cast(literal("{}"), JSONB),
+                    ),
+                    else_=func.jsonb_build_object("data", data),
+                )
+            )
+            data = func.pg_notify(self.channel, cast(message, Text))
+        rows = await session.execute(
+            # Столбец written идёт первым, чтобы CTE written
+            # оказалось в WITH раньше ссылающегося на него counter.
+            select(written.c.id, seq, kind, data, *columns)
+            .select_from(written.join(counter, true()))
+            .order_by(written.c.id),
+            execution_options=execution_options or {},
+        )
+        events = []
+        values = []
+        for row in rows:
+            obj_id, number, row_kind, row_data = row[:4]
+            if self.backend == "postgres":
+                row_data = None
+            events.append(ChangeEvent(number, row_kind, obj_id, row_data))
+            values.append(row[4:])
+        if events:
+            session.info.setdefault(PENDING_KEY, []).append((self, events))
+        return values
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        kind: str,
+        rows: Iterable[dict[str, Any]],
+    ) -> None:
+        """Опубликовать изменения объектов, записанных отдельно.
+
+        Args:
+            session (AsyncSession): Сессия, в которой изменены объекты.
+            kind (str): Тип события.
+            rows (Iterable[dict[str, Any]]): Значения столбцов объектов.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        values = func.jsonb_array_elements(
+            bindparam("rows", rows, type_=JSONB)
+        ).table_valued(column("value", JSONB))
+        written = select(
+            cast(values.c.value["id"].astext, BigInteger).label("id"),
+            values.c.value.label("data"),
+        ).cte("written")
+        await self.write(session, written, written.c.data, kind)
+
+    async def get_version(self, session: AsyncSession) -> int:
+        """Номер последнего зафиксированного события.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            int: Значение счётчика, 0 если записей ещё не было.
+        """
+        version = await session.scalar(
+            select(ChangeCounter.value).where(ChangeCounter.name == self.channel)
+        )
+        return version or 0
+
+    @property
+    def live(self) -> bool:
+        """Доходят ли до брокера все зафиксированные события.
+
+        В режиме postgres - только пока открыто соединение с LISTEN:
+        уведомления без него теряются.
+        """
+        return self.backend != "postgres" or self._connected
+
+    def on_commit(self, events: list[ChangeEvent]) -> None:
+        """Учесть события записи после фиксации её транзакции.
+
+        Args:
+            events (list[ChangeEvent]): События записи по возрастанию
+                номеров.
+        """
+        self.last_committed = max(self.last_committed, events[-1].seq)
+        if self.backend == "postgres":
+            return
+        for change in events:
+            self.broker.publish(change)
+
+    @asynccontextmanager
+    async def listening(self, engine: AsyncEngine) -> AsyncIterator[None]:
+        """Слушать канал в фоне, пока открыт контекст.
+
+        В режиме local слушать нечего, и контекст ничего не делает.
+
+        Args:
+            engine (AsyncEngine): Движок основной базы данных.
+        """
+        if self.backend != "postgres":
+            yield
+            return
+        task = asyncio.create_task(self._listen(engine.url))
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _listen(self, url: URL) -> None:
+        """Держать отдельное соединение с LISTEN и переподключаться.
+
+        Соединение не берётся из пула движка: оно занято всё время
+        работы процесса. Уведомления, отправленные, пока соединения
+        не было, потеряны, поэтому после подключения брокер начинает
+        отсчёт с текущего значения счётчика.
+        """
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning("Лента %s: нет соединения: %s", self.channel, error)
+                await asyncio.sleep(settings.change_feed_retry_seconds)
+                continue
+            try:
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                head = await connection.fetchval(
+                    "SELECT coalesce(max(value), 0) "
+                    f'FROM "{ChangeCounter.__tablename__}" WHERE name = $1',
+                    self.channel,
+                )
+                self.broker.reset(head)
+                self._connected = True
+                await lost.wait()
+                logger.warning("Лента %s: соединение потеряно", self.channel)
+            finally:
+                self._connected = False
+                if not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(settings.change_feed_retry_seconds)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        message = orjson.loads(payload)
+        if message["kind"] == RESYNC:
+            # Таблицу заменили целиком, например загрузкой набора данных:
+            # продолжить с прежних номеров нельзя.
+            self.broker.reset(message["seq"])
+            return
+        self.broker.publish(
+            ChangeEvent(
+                message["seq"],
+                message["kind"],
+                message["id"],
+                message.get("data"),
+            )
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for feed, events in session.info.pop(PENDING_KEY, ()):
+        feed.on_commit(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+async def stream_events(
+    subscription: Subscription,
+    keepalive: float = settings.change_feed_keepalive_seconds,
+) -> AsyncIterator[bytes]:
+    """Поток Server-Sent Events подписки.
+
+    Пока событий нет, раз в keepalive секунд отправляется комментарий,
+    чтобы прокси не закрывали соединение. Подписка закрывается, когда
+    клиент отключается.
+
+    Args:
+        subscription (Subscription): Подписка на события.
+        keepalive (float): Интервал комментариев, с.
+
+    Yields:
+        bytes: События в формате Server-Sent Events.
+    """
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield event.to_sse()
+    finally:
+        subscription.close()
@@ -0,0 +1,48 @@
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+
+class FieldSelector:
+    """Зависимость, разбирающая параметр fields со списком полей ответа.
+
+    Поля возвращаются в порядке схемы ответа, а не запроса, чтобы
+    одинаковые выборки давали одинаковые ответы.
+
+    Args:
+        schema (type[BaseModel]): Схема ответа с допустимыми полями.
+    """
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        self.allowed = list(schema.model_fields)
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            None,
+            description="Поля ответа через запятую, по умолчанию все.",
+        ),
+    ) -> list[str]:
+        """Получить список полей ответа.
+
+        Args:
+            fields (None or str): Поля через запятую.
+
+        Raises:
+            HTTPException: Если поле неизвестно или список пуст.
+
+        Returns:
+            list[str]: Поля ответа.
+        """
+        if fields is None:
+            return self.allowed
+        requested = {field.strip() for field in fields.split(",")} - {""}
+        unknown = requested.difference(self.allowed)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    "Некорректный список полей! Допустимые поля: "
+                    + ", ".join(self.allowed)
+                ),
+            )
+        return [field for field in self.allowed if field in requested]
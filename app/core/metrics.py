@@ -0,0 +1,259 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import CacheStats
+from app.core.pool import PoolStats
+from app.core.singleflight import SingleFlightStats
+
+# Границы корзин гистограммы времени ответа, с.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Метка маршрута для запросов, не попавших ни в один маршрут.
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами.
+
+    Хранит количество наблюдений в каждой корзине отдельно, а
+    накопленные значения считает только при выгрузке.
+
+    Args:
+        buckets (Iterable[float]): Возрастающие верхние границы корзин.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Накопленные количества по корзинам, включая +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    pairs = (f'{name}="{escape_label(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+class RequestMetrics:
+    """Метрики HTTP-запросов по маршрутам.
+
+    Ключом служит шаблон пути маршрута, а не сам путь, чтобы число
+    рядов не росло с количеством объектов.
+    """
+
+    def __init__(self) -> None:
+        self.latency: dict[tuple[str, str, str], Histogram] = defaultdict(Histogram)
+        self.responses: dict[tuple[str, str, str, int], int] = defaultdict(int)
+        self.in_progress = 0
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        handler: str,
+        status_code: int,
+        duration: float,
+    ) -> None:
+        self.latency[method, route, handler].observe(duration)
+        self.responses[method, route, handler, status_code] += 1
+
+    def clear(self) -> None:
+        self.latency.clear()
+        self.responses.clear()
+
+    def render(
+        self,
+        pool: PoolStats | None = None,
+        cache: CacheStats | None = None,
+        flights: SingleFlightStats | None = None,
+    ) -> str:
+        """Выгрузить метрики в текстовом формате Prometheus.
+
+        Args:
+            pool (None or PoolStats): Состояние пула соединений.
+            cache (None or CacheStats): Счётчики кэша.
+            flights (None or SingleFlightStats): Счётчики объединения
+                одинаковых чтений.
+
+        Returns:
+            str: Метрики в текстовом формате.
+        """
+        lines = [
+            "# HELP http_request_duration_seconds Время обработки запроса.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, handler), histogram in sorted(self.latency.items()):
+            labels = {"method": method, "route": route, "handler": handler}
+            for bound, count in histogram.cumulative():
+                bucket = format_labels({**labels, "le": bound})
+                lines.append(f"http_request_duration_seconds_bucket{bucket} {count}")
+            lines.append(
+                f"http_request_duration_seconds_sum{format_labels(labels)} "
+                f"{histogram.sum!r}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{format_labels(labels)} "
+                f"{histogram.count}"
+            )
+
+        lines += [
+            "# HELP http_requests_total Количество ответов по статусам.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, handler, status_code), count in sorted(
+            self.responses.items()
+        ):
+            labels = format_labels(
+                {
+                    "method": method,
+                    "route": route,
+                    "handler": handler,
+                    "status": str(status_code),
+                }
+            )
+            lines.append(f"http_requests_total{labels} {count}")
+
+        lines += [
+            "# HELP http_requests_in_progress Запросы в обработке.",
+            "# TYPE http_requests_in_progress gauge",
+            f"http_requests_in_progress {self.in_progress}",
+        ]
+        if pool is not None:
+            lines += render_pool(pool)
+        if cache is not None:
+            lines += render_cache(cache)
+        if flights is not None:
+            lines += render_single_flight(flights)
+        return "\n".join(lines) + "\n"
+
+
+def render_pool(pool: PoolStats) -> list[str]:
+    lines = []
+    gauges = {
+        "db_pool_size": ("Размер пула.", pool.size),
+        "db_pool_checked_out": ("Выданные соединения.", pool.checked_out),
+        "db_pool_overflow": ("Соединения сверх размера пула.", pool.overflow),
+    }
+    for name, (help_text, value) in gauges.items():
+        if value is not None:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines.append(f"{name} {value}")
+    counters = {
+        "db_pool_checkouts_total": ("Выданные пулом соединения.", pool.checkouts),
+        "db_pool_timeouts_total": ("Таймауты ожидания соединения.", pool.timeouts),
+        "db_pool_wait_seconds_total": (
+            "Суммарное ожидание соединения.",
+            pool.wait_total_ms / 1000,
+        ),
+    }
+    for name, (help_text, value) in counters.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines.append(f"{name} {value}")
+    return lines
+
+
+def render_cache(cache: CacheStats) -> list[str]:
+    lines = [
+        "# HELP cache_size Записи в кэше.",
+        "# TYPE cache_size gauge",
+        f"cache_size {cache.size}",
+        "# HELP cache_requests_total Обращения к кэшу.",
+        "# TYPE cache_requests_total counter",
+        f'cache_requests_total{{result="hit"}} {cache.hits}',
+        f'cache_requests_total{{result="miss"}} {cache.misses}',
+    ]
+    return lines
+
+
+def render_single_flight(flights: SingleFlightStats) -> list[str]:
+    lines = [
+        "# HELP single_flight_in_flight Выполняющиеся загрузки.",
+        "# TYPE single_flight_in_flight gauge",
+        f"single_flight_in_flight {flights.in_flight}",
+        "# HELP single_flight_requests_total Чтения по способу получения.",
+        "# TYPE single_flight_requests_total counter",
+        f'single_flight_requests_total{{result="executed"}} {flights.executed}',
+        f'single_flight_requests_total{{result="coalesced"}} {flights.coalesced}',
+        "# HELP single_flight_errors_total Загрузки, завершившиеся ошибкой.",
+        "# TYPE single_flight_errors_total counter",
+        f"single_flight_errors_total {flights.errors}",
+    ]
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Промежуточный слой, замеряющий время обработки запросов.
+
+    Время считается до отправки последней части тела ответа. Запрос,
+    завершившийся исключением, учитывается со статусом 500.
+
+    Args:
+        app (ASGIApp): Приложение.
+        metrics (RequestMetrics): Хранилище метрик.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        finished = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif not message.get("more_body", False):
+                finished = time.perf_counter()
+            await send(message)
+
+        self.metrics.in_progress += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.metrics.in_progress -= 1
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                getattr(route, "name", UNMATCHED_ROUTE),
+                status_code,
+                (finished or time.perf_counter()) - started,
+            )
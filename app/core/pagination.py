@@ -0,0 +1,112 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from fastapi import HTTPException, Query
+
+ItemType = TypeVar("ItemType")
+
+
+@dataclass
+class Page(Generic[ItemType]):
+    """Страница выборки.
+
+    Args:
+        items (list[ItemType]): Объекты страницы.
+        next_cursor (None or str): Курсор следующей страницы,
+            None для последней страницы.
+    """
+
+    items: list[ItemType]
+    next_cursor: str | None
+
+
+def encode_cursor(obj_id: int, **keys: Any) -> str:
+    """Закодировать ключ последнего объекта в курсор.
+
+    Args:
+        obj_id (int): Идентификатор последнего объекта.
+        **keys (Any): Другие значения ключа сортировки.
+    """
+    payload = json.dumps({"id": obj_id, **keys}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor_keys(cursor: str) -> dict[str, Any]:
+    """Раскодировать курсор в значения ключа последнего объекта.
+
+    Raises:
+        ValueError: Если курсор повреждён.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        keys = json.loads(payload)
+    except ValueError:
+        raise ValueError("Некорректный курсор")
+    if not isinstance(keys, dict) or not isinstance(keys.get("id"), int):
+        raise ValueError("Некорректный курсор")
+    return keys
+
+
+def decode_cursor(cursor: str) -> int:
+    """Раскодировать курсор в идентификатор последнего объекта.
+
+    Raises:
+        ValueError: Если курсор повреждён.
+    """
+    return decode_cursor_keys(cursor)["id"]
+
+
+def get_cursor(
+    after: str | None = Query(None, description="Курсор следующей страницы."),
+) -> int | None:
+    """Зависимость, извлекающая идентификатор из курсора запроса.
+
+    Args:
+        after (None or str): Непрозрачный курсор из ответа.
+
+    Raises:
+        HTTPException: Если курсор повреждён.
+
+    Returns:
+        int | None: Идентификатор, после которого начинается страница.
+    """
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail="Некорректный курсор страницы!",
+        )
+
+
+def get_ranked_cursor(
+    after: str | None = Query(None, description="Курсор следующей страницы."),
+) -> dict[str, Any] | None:
+    """Зависимость, извлекающая ключ (rank, id) из курсора запроса.
+
+    Args:
+        after (None or str): Непрозрачный курсор из ответа.
+
+    Raises:
+        HTTPException: Если курсор повреждён.
+
+    Returns:
+        dict[str, Any] | None: Релевантность и идентификатор, после
+            которых начинается страница.
+    """
+    if after is None:
+        return None
+    try:
+        keys = decode_cursor_keys(after)
+    except ValueError:
+        keys = None
+    if keys is None or not isinstance(keys.get("rank"), (int, float)):
+        raise HTTPException(
+            status_code=422,
+            detail="Некорректный курсор страницы!",
+        )
+    return keys
@@ -0,0 +1,125 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+@dataclass
+class CheckoutStats:
+    """Накопленные счётчики выдачи соединений пулом.
+
+    Время ожидания учитывается только для выданных соединений,
+    ожидания, закончившиеся таймаутом, считаются отдельно.
+
+    Args:
+        checkouts (int): Количество выданных соединений.
+        timeouts (int): Количество ожиданий, закончившихся таймаутом.
+        wait_total (float): Суммарное время ожидания соединения, с.
+        wait_max (float): Наибольшее время ожидания соединения, с.
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class CheckoutTimingMixin:
+    """Примесь к пулу, замеряющая время получения соединения.
+
+    Замер охватывает ожидание свободного соединения, открытие нового
+    и pre-ping, то есть всё время, которое запрос ждёт соединение.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.timeouts += 1
+            raise
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedAsyncAdaptedQueuePool(
+    CheckoutTimingMixin,
+    AsyncAdaptedQueuePool,
+):
+    """Асинхронный пул с очередью и замером ожидания соединений."""
+
+
+class InstrumentedNullPool(CheckoutTimingMixin, NullPool):
+    """Пул без удержания соединений с замером их открытия."""
+
+
+@dataclass
+class PoolStats:
+    """Состояние пула соединений движка.
+
+    Args:
+        pool_class (str): Класс пула.
+        size (None or int): Размер пула.
+        checked_out (None or int): Выданные сейчас соединения.
+        checked_in (None or int): Свободные соединения в пуле.
+        overflow (None or int): Соединения сверх размера пула.
+        checkouts (int): Количество выданных соединений.
+        timeouts (int): Количество таймаутов ожидания.
+        wait_total_ms (float): Суммарное время ожидания, мс.
+        wait_avg_ms (float): Среднее время ожидания, мс.
+        wait_max_ms (float): Наибольшее время ожидания, мс.
+    """
+
+    pool_class: str
+    size: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total_ms: float = 0.0
+    wait_avg_ms: float = 0.0
+    wait_max_ms: float = 0.0
+
+
+def get_pool_stats(engine: AsyncEngine) -> PoolStats:
+    """Собрать состояние пула соединений движка.
+
+    Для пула без удержания соединений (режим pgbouncer) текущие
+    количества соединений не определены и остаются None.
+
+    Args:
+        engine (AsyncEngine): Движок базы данных.
+
+    Returns:
+        PoolStats: Состояние пула.
+    """
+    pool = engine.sync_engine.pool
+    stats = PoolStats(pool_class=type(pool).__name__)
+    if isinstance(pool, QueuePool):
+        stats.size = pool.size()
+        stats.checked_out = pool.checkedout()
+        stats.checked_in = pool.checkedin()
+        # До заполнения пула счётчик переполнения отрицательный.
+        stats.overflow = max(pool.overflow(), 0)
+
+    checkout_stats = getattr(pool, "checkout_stats", None)
+    if checkout_stats is not None:
+        stats.checkouts = checkout_stats.checkouts
+        stats.timeouts = checkout_stats.timeouts
+        stats.wait_total_ms = checkout_stats.wait_total * 1000
+        stats.wait_max_ms = checkout_stats.wait_max * 1000
+        if checkout_stats.checkouts:
+            stats.wait_avg_ms = stats.wait_total_ms / checkout_stats.checkouts
+    return stats
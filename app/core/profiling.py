@@ -0,0 +1,205 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Статистика SQL-запросов одного HTTP-запроса.
+
+    Args:
+        count (int): Количество выполненных запросов.
+        total (float): Суммарное время выполнения, с.
+        statements (Counter): Количество выполнений каждого текста запроса.
+        slowest (list[tuple[float, str]]): Самые долгие запросы.
+        slowest_count (int): Сколько самых долгих запросов хранить.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    slowest_count: int = settings.sql_slowest_count
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.statements[statement] += 1
+        self.slowest.append((duration, statement))
+        self.slowest.sort(key=lambda item: item[0], reverse=True)
+        del self.slowest[self.slowest_count:]
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Найти запросы, повторённые не меньше threshold раз.
+
+        Одинаковый текст запроса, выполненный много раз за один
+        HTTP-запрос, обычно означает загрузку в цикле (N+1).
+
+        Args:
+            threshold (int): Минимальное количество повторов.
+
+        Returns:
+            dict[str, int]: Текст запроса и количество выполнений.
+        """
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold
+        }
+
+    def server_timing(self) -> str:
+        """Значение метрики db для заголовка Server-Timing."""
+        return f'db;dur={self.total * 1000:.2f};desc="{self.count} statements"'
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats",
+    default=None,
+)
+
+
+def get_query_stats() -> QueryStats | None:
+    """Статистика SQL текущего HTTP-запроса или None вне запроса."""
+    return _current_stats.get()
+
+
+# Время начала хранится в контексте выполнения, а не в соединении:
+# после ошибки запроса after_cursor_execute не вызывается, и контекст
+# освобождается вместе с ним.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "query_started", None)
+    stats = _current_stats.get()
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключить сбор статистики SQL к движку.
+
+    Args:
+        engine (AsyncEngine): Движок базы данных.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class StatementBudgetExceeded(RuntimeError):
+    """HTTP-запрос выполнил больше SQL-запросов, чем разрешено."""
+
+
+class QueryStatsMiddleware:
+    """Промежуточный слой, собирающий статистику SQL по HTTP-запросам.
+
+    Добавляет в ответ заголовок Server-Timing и пишет статистику в лог.
+    При превышении бюджета запросов пишет предупреждение, а в строгом
+    режиме (в тестах) завершает запрос ошибкой. Повторяющиеся запросы
+    отмечаются в логе как возможный N+1.
+
+    Args:
+        app (ASGIApp): Приложение.
+        budget (int): Допустимое количество SQL-запросов, 0 - без ограничения.
+        strict (bool): Завершать запрос ошибкой при превышении бюджета.
+        n_plus_one_threshold (int): Количество повторов одного запроса,
+            после которого он считается N+1.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budget: int = settings.sql_statement_budget,
+        strict: bool = settings.sql_budget_strict,
+        n_plus_one_threshold: int = settings.sql_n_plus_one_threshold,
+    ) -> None:
+        self.app = app
+        self.budget = budget
+        self.strict = strict
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    def over_budget(self, stats: QueryStats) -> bool:
+        return bool(self.budget) and stats.count > self.budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                if self.strict and self.over_budget(stats):
+                    raise StatementBudgetExceeded(
+                        f"{scope['method']} {scope['path']}: "
+                        f"{stats.count} SQL-запросов при бюджете {self.budget}"
+                    )
+                total = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f"{stats.server_timing()}, total;dur={total:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self.log(scope, stats, time.perf_counter() - started)
+
+    def log(self, scope: Scope, stats: QueryStats, duration: float) -> None:
+        request = f"{scope['method']} {scope['path']}"
+        extra = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "statements": stats.count,
+            "db_ms": round(stats.total * 1000, 2),
+            "total_ms": round(duration * 1000, 2),
+            "slowest": [
+                {"ms": round(duration * 1000, 2), "statement": statement}
+                for duration, statement in stats.slowest
+            ],
+        }
+        logger.info(
+            "%s: %d SQL за %.2f мс",
+            request,
+            stats.count,
+            stats.total * 1000,
+            extra=extra,
+        )
+        if self.over_budget(stats):
+            logger.warning(
+                "%s: %d SQL-запросов при бюджете %d",
+                request,
+                stats.count,
+                self.budget,
+                extra=extra,
+            )
+        for statement, count in stats.repeated(self.n_plus_one_threshold).items():
+            logger.warning(
+                "%s: возможный N+1, запрос выполнен %d раз: %s",
+                request,
+                count,
+                statement,
+                extra={**extra, "repeated": count, "statement": statement},
+            )
@@ -0,0 +1,228 @@
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Cookie со временем последней записи клиента.
+LAST_WRITE_COOKIE = "last_write"
+
+
+@dataclass
+class ClientWrites:
+    """Записи клиента, от которых зависит выбор базы для чтения.
+
+    Args:
+        last_write (None or float): Время последней записи клиента
+            по часам ReplicaSet.
+        wrote (bool): Была ли запись в текущем HTTP-запросе.
+    """
+
+    last_write: float | None = None
+    wrote: bool = False
+
+
+_client_writes: ContextVar[ClientWrites | None] = ContextVar(
+    "client_writes",
+    default=None,
+)
+
+
+class ReplicaSet:
+    """Набор реплик для чтения с учётом их доступности.
+
+    Реплика, к которой не удалось подключиться или соединение с которой
+    оборвалось, исключается из выбора на retry_seconds. После записи
+    чтения того же клиента идут в основную базу в течение
+    sticky_seconds, чтобы он увидел свою запись, даже если реплика
+    отстаёт. Время записи клиента передаёт ReadYourWritesMiddleware,
+    остальные клиенты продолжают читать из реплик.
+
+    Args:
+        engines (Sequence[AsyncEngine]): Движки реплик.
+        sticky_seconds (float): Окно чтения из основной базы после записи.
+        retry_seconds (float): Время исключения недоступной реплики.
+        clock (Callable[[], float]): Источник времени. Время записи
+            сравнивается между процессами, поэтому часы настенные.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        sticky_seconds: float,
+        retry_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.engines = list(engines)
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._counter = 0
+        for engine in self.engines:
+            self._watch(engine)
+
+    def _watch(self, engine: AsyncEngine) -> None:
+        @event.listens_for(engine.sync_engine, "do_connect")
+        def connect(dialect, conn_rec, cargs, cparams):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception:
+                self.mark_down(engine)
+                raise
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def handle_error(context):
+            if context.is_disconnect:
+                self.mark_down(engine)
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """Исключить реплику из выбора на retry_seconds."""
+        self._down_until[engine] = self.clock() + self.retry_seconds
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._down_until.get(engine, 0) <= self.clock()
+
+    def record_write(self) -> None:
+        """Отметить запись клиента текущего HTTP-запроса."""
+        writes = _client_writes.get()
+        if writes is not None:
+            writes.last_write = self.clock()
+            writes.wrote = True
+
+    def is_sticky(self) -> bool:
+        """Должен ли клиент текущего запроса читать из основной базы."""
+        writes = _client_writes.get()
+        if writes is None or writes.last_write is None:
+            return False
+        # Время из cookie в будущем не закрепляет клиента навсегда.
+        return abs(self.clock() - writes.last_write) < self.sticky_seconds
+
+    def choose(self) -> AsyncEngine | None:
+        """Выбрать реплику для чтения по кругу среди доступных.
+
+        Returns:
+            AsyncEngine | None: Движок реплики или None, если читать
+                нужно из основной базы.
+        """
+        if self.is_sticky():
+            return None
+        healthy = [engine for engine in self.engines if self.is_healthy(engine)]
+        if not healthy:
+            return None
+        self._counter += 1
+        return healthy[self._counter % len(healthy)]
+
+
+def is_write(clause: Any) -> bool:
+    """Проверить, должен ли запрос выполняться в основной базе."""
+    return clause is not None and (
+        getattr(clause, "is_dml", False)
+        or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+class RoutingSession(Session):
+    """Сессия, направляющая чтения в реплики, а запись в основную базу.
+
+    Основная база задаётся как обычный bind сессии. После первой записи
+    и в сессиях, помеченных info["primary"], все запросы идут в основную
+    базу.
+
+    Args:
+        replicas (None or ReplicaSet): Набор реплик для чтения.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        replicas: ReplicaSet | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any) -> Engine:
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if not self.replicas or not self.replicas.engines:
+            return primary
+        if self._flushing or is_write(clause):
+            self.info["primary"] = True
+            self.replicas.record_write()
+            return primary
+        if self.info.get("primary"):
+            return primary
+        replica = self.replicas.choose()
+        return primary if replica is None else replica.sync_engine
+
+    def _connection_for_bind(
+        self,
+        engine: Engine,
+        execution_options: Any = None,
+        **kwargs: Any,
+    ) -> Connection:
+        primary = super().get_bind()
+        try:
+            return super()._connection_for_bind(engine, execution_options, **kwargs)
+        except (OSError, DBAPIError):
+            if engine is primary:
+                raise
+        # Реплика недоступна и уже исключена из выбора: запрос читает
+        # из основной базы, а не завершается ошибкой.
+        self.info["primary"] = True
+        return super()._connection_for_bind(primary, execution_options, **kwargs)
+
+
+class ReadYourWritesMiddleware:
+    """Промежуточный слой, закрепляющий клиента за основной базой.
+
+    После записи клиент получает cookie со временем записи и в течение
+    sticky_seconds читает из основной базы в любом процессе. Чтения
+    других клиентов по-прежнему идут в реплики.
+
+    Args:
+        app (ASGIApp): Приложение.
+        replicas (ReplicaSet): Набор реплик.
+    """
+
+    def __init__(self, app: ASGIApp, replicas: ReplicaSet) -> None:
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.replicas.engines:
+            await self.app(scope, receive, send)
+            return
+
+        cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+        try:
+            last_write = float(cookies[LAST_WRITE_COOKIE])
+        except (KeyError, ValueError):
+            last_write = None
+        writes = ClientWrites(last_write)
+        token = _client_writes.set(writes)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.wrote:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={writes.last_write:.3f}; "
+                    f"Max-Age={math.ceil(self.replicas.sticky_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _client_writes.reset(token)
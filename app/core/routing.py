@@ -0,0 +1,48 @@
+import asyncio
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def release_sessions(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Обернуть эндпоинт, чтобы он закрывал свои сессии после выполнения.
+
+    Сигнатура эндпоинта сохраняется, поэтому FastAPI разбирает
+    зависимости и параметры обёртки так же, как у исходной функции.
+
+    Args:
+        endpoint (Callable[..., Any]): Асинхронный эндпоинт.
+
+    Returns:
+        Callable[..., Any]: Эндпоинт, закрывающий переданные ему сессии.
+    """
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            for value in kwargs.values():
+                if isinstance(value, AsyncSession):
+                    await value.close()
+
+    return wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """Маршрут, освобождающий соединение с базой до сериализации ответа.
+
+    Зависимость get_async_session закрывает сессию только после того,
+    как ответ сериализован, и всё это время читающий запрос держит
+    соединение из пула в открытой транзакции. Маршрут закрывает сессии
+    эндпоинта сразу после его выполнения. Загруженные атрибуты объектов
+    остаются доступны: сессия не сбрасывает их ни при фиксации, ни при
+    закрытии.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs) -> None:
+        super().__init__(path, release_sessions(endpoint), **kwargs)
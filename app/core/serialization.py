@@ -0,0 +1,42 @@
+from typing import Iterable, Sequence
+
+import orjson
+
+
+def dump_rows(rows: Iterable[Sequence], fields: Sequence[str]) -> bytes:
+    """Сериализовать строки результата в JSON-массив объектов.
+
+    Быстрый путь для данных, прочитанных из базы: строки не проходят
+    валидацию схемой ответа. Поля со значением None опускаются, как при
+    response_model_exclude_none. Результат совпадает побайтно с
+    JSONResponse для тех же словарей, если значения - строки, числа
+    и логические значения.
+
+    Args:
+        rows (Iterable[Sequence]): Строки со значениями в порядке fields.
+        fields (Sequence[str]): Имена полей в порядке схемы ответа.
+
+    Returns:
+        bytes: JSON в кодировке UTF-8.
+    """
+    return orjson.dumps(
+        [
+            {field: value for field, value in zip(fields, row) if value is not None}
+            for row in rows
+        ]
+    )
+
+
+def dump_row(row: Sequence, fields: Sequence[str]) -> bytes:
+    """Сериализовать одну строку в JSON-объект.
+
+    Args:
+        row (Sequence): Значения в порядке fields.
+        fields (Sequence[str]): Имена полей в порядке схемы ответа.
+
+    Returns:
+        bytes: JSON в кодировке UTF-8.
+    """
+    return orjson.dumps(
+        {field: value for field, value in zip(fields, row) if value is not None}
+    )
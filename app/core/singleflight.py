@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.config import settings
+
+
+@dataclass
+class SingleFlightStats:
+    """Счётчики объединения одинаковых чтений.
+
+    Args:
+        executed (int): Загрузки, выполненные первым запросом.
+        coalesced (int): Запросы, получившие результат чужой загрузки.
+        errors (int): Загрузки, завершившиеся ошибкой.
+        in_flight (int): Загрузки, выполняющиеся сейчас.
+    """
+
+    executed: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    in_flight: int = 0
+
+
+class LeaderCancelled(Exception):
+    """Запрос, выполнявший загрузку, отменён, её нужно повторить."""
+
+
+@dataclass
+class Flight:
+    """Выполняющаяся загрузка и ожидающие её запросы."""
+
+    future: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных загрузок внутри процесса.
+
+    Первый запрос с ключом выполняет загрузку сам, в своём контексте
+    и своей сессии, остальные ждут её результата или ошибки. Отмена
+    ожидающего запроса не затрагивает загрузку. Если отменён запрос,
+    выполнявший загрузку, один из ожидающих выполняет её заново.
+    Результат не хранится после завершения загрузки.
+
+    Args:
+        enabled (bool): Объединять ли загрузки.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._flights: dict[Hashable, Flight] = {}
+        self._stats = SingleFlightStats()
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить загрузку или дождаться такой же выполняющейся.
+
+        Args:
+            key (Hashable): Ключ загрузки.
+            load (Callable[[], Awaitable[Any]]): Загрузка. Результат
+                получают все ожидающие запросы, поэтому он не должен
+                быть привязан к сессии.
+
+        Returns:
+            Any: Результат загрузки.
+        """
+        if not self.enabled:
+            return await load()
+        while (flight := self._flights.get(key)) is not None:
+            flight.waiters += 1
+            try:
+                # shield: отмена ожидающего не должна отменять загрузку.
+                result = await asyncio.shield(flight.future)
+            except LeaderCancelled:
+                continue
+            except Exception:
+                self._stats.coalesced += 1
+                raise
+            finally:
+                flight.waiters -= 1
+            self._stats.coalesced += 1
+            return result
+
+        flight = Flight(asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        self._stats.executed += 1
+        self._stats.in_flight += 1
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            self._finish(key, flight, LeaderCancelled())
+            raise
+        except Exception as error:
+            self._stats.errors += 1
+            self._finish(key, flight, error)
+            raise
+        flight.future.set_result(result)
+        self._finish(key, flight)
+        return result
+
+    def forget(self, *keys: Hashable) -> None:
+        """Не присоединять новые запросы к выполняющимся загрузкам.
+
+        Загрузка, начатая до записи, может вернуть старые данные, поэтому
+        после записи новые запросы выполняют загрузку заново.
+
+        Args:
+            *keys (Hashable): Ключи загрузок.
+        """
+        for key in keys:
+            self._flights.pop(key, None)
+
+    def stats(self) -> SingleFlightStats:
+        return replace(self._stats)
+
+    def _finish(
+        self,
+        key: Hashable,
+        flight: Flight,
+        error: BaseException | None = None,
+    ) -> None:
+        self._stats.in_flight -= 1
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Ошибку без ожидающих некому получить, asyncio предупредил бы о ней.
+        if error is not None and flight.waiters:
+            flight.future.set_exception(error)
+
+
+single_flight = SingleFlight(enabled=settings.single_flight)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.db import Base
+
+# Наибольшая длина ключа идемпотентности.
+KEY_MAX_LENGTH = 255
+
+
+class IdempotencyKey(Base):
+    """Модель ключа идемпотентности с сохранённым ответом.
+
+    Пока запрос выполняется, ответа нет, а expires_at - срок, после
+    которого ключ считается брошенным и его может занять повтор.
+    После сохранения ответа expires_at - срок хранения ответа.
+
+    Args:
+        key (str): Ключ из заголовка Idempotency-Key.
+        fingerprint (str): Хэш метода, пути, параметров и тела запроса.
+        status_code (None or int): Статус сохранённого ответа.
+        headers (None or list[list[str]]): Заголовки ответа.
+        body (None or bytes): Тело ответа.
+        expires_at (datetime): Срок действия записи.
+    """
+
+    key = Column(String(KEY_MAX_LENGTH), unique=True, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    headers = Column(JSONB)
+    body = Column(LargeBinary)
+    # Очистка удаляет устаревшие записи поиском по индексу.
+    expires_at = Column(DateTime, nullable=False, index=True)
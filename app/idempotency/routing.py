@@ -0,0 +1,43 @@
+from typing import Callable, Coroutine
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.routing import SessionReleasingRoute
+from app.idempotency.models import KEY_MAX_LENGTH
+from app.idempotency.store import (
+    IDEMPOTENCY_HEADER,
+    KEY_INVALID,
+    idempotency_store,
+    request_fingerprint,
+)
+
+# Методы, запросы которых повторяются по ключу идемпотентности.
+IDEMPOTENT_METHODS = {"POST", "PATCH"}
+
+
+class IdempotentRoute(SessionReleasingRoute):
+    """Маршрут, повторяющий ответ на запрос с тем же Idempotency-Key.
+
+    Запросы POST и PATCH с заголовком Idempotency-Key выполняются один
+    раз, повторы получают сохранённый ответ с заголовком
+    Idempotent-Replayed. Запросы без заголовка обрабатываются как обычно.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+        if not self.methods & IDEMPOTENT_METHODS:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return await handler(request)
+            if not key or len(key) > KEY_MAX_LENGTH:
+                raise HTTPException(**KEY_INVALID)
+            return await idempotency_store.run(
+                key,
+                await request_fingerprint(request),
+                lambda: handler(request),
+            )
+
+        return idempotent_handler
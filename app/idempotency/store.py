@@ -0,0 +1,433 @@
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, fresh_timestamp
+from app.core.singleflight import SingleFlight
+from app.idempotency.models import KEY_MAX_LENGTH, IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Заголовок повторённого ответа, как у Stripe.
+REPLAYED_HEADER = b"idempotent-replayed"
+
+KEY_INVALID = {
+    "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+    "detail": (
+        f"Ключ идемпотентности должен быть непустым "
+        f"и не длиннее {KEY_MAX_LENGTH} символов!"
+    ),
+}
+KEY_REUSED = {
+    "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+    "detail": "Ключ идемпотентности уже использован с другим запросом!",
+}
+KEY_IN_PROGRESS = {
+    "status_code": status.HTTP_409_CONFLICT,
+    "detail": "Запрос с этим ключом идемпотентности ещё выполняется!",
+}
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Сохранённый ответ на запрос с ключом идемпотентности.
+
+    Args:
+        fingerprint (str): Хэш запроса, на который получен ответ.
+        status_code (int): Статус ответа.
+        headers (tuple[tuple[bytes, bytes], ...]): Заголовки ответа.
+        body (bytes): Тело ответа.
+        expires_at (datetime): Срок хранения ответа.
+    """
+
+    fingerprint: str
+    status_code: int
+    headers: tuple[tuple[bytes, bytes], ...]
+    body: bytes
+    expires_at: datetime
+
+    @classmethod
+    def from_row(cls, row: Row) -> "StoredResponse":
+        return cls(
+            fingerprint=row.fingerprint,
+            status_code=row.status_code,
+            headers=tuple(
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in row.headers
+            ),
+            body=row.body,
+            expires_at=row.expires_at,
+        )
+
+    def to_response(self) -> Response:
+        response = Response(self.body, self.status_code)
+        response.raw_headers = [*self.headers, (REPLAYED_HEADER, b"true")]
+        return response
+
+
+async def request_fingerprint(request: Request) -> str:
+    """Хэш метода, пути, параметров и тела запроса.
+
+    Args:
+        request (Request): Запрос.
+
+    Returns:
+        str: Хэш SHA-256 в шестнадцатеричном виде.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        request.method.encode(),
+        request.url.path.encode(),
+        request.url.query.encode(),
+        await request.body(),
+    ):
+        digest.update(b"%d:" % len(part))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Ответы на запросы с ключом идемпотентности.
+
+    Первый запрос с ключом занимает его вставкой строки без ответа,
+    выполняет обработчик и сохраняет ответ. Повторы получают сохранённый
+    ответ без выполнения обработчика. Одновременные запросы с тем же
+    ключом в процессе ждут первый через SingleFlight, в других
+    процессах - опрашивают строку до wait_seconds. Ответы со статусом
+    5xx не сохраняются: повтор выполняет обработчик заново.
+
+    Пока обработчик выполняется, срок занятия ключа продлевается каждую
+    треть lock_seconds. Занять ключ заново повтор может, только если
+    процесс первого запроса перестал продлевать его, например завершился.
+    Если ответ не удалось сохранить, ключ остаётся занятым, а сохранение
+    повторяется в фоне: запись уже выполнена и не должна повториться.
+
+    Args:
+        session_factory (async_sessionmaker): Фабрика сессий.
+        ttl_seconds (float): Срок хранения ответа.
+        lock_seconds (float): Срок, на который запрос занимает ключ
+            без продления.
+        wait_seconds (float): Наибольшее ожидание запроса с тем же
+            ключом в другом процессе.
+        poll_seconds (float): Интервал опроса при ожидании.
+        cache_size (int): Количество ответов в кэше процесса.
+        cleanup_seconds (float): Интервал удаления устаревших ключей.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        ttl_seconds: float,
+        lock_seconds: float,
+        wait_seconds: float,
+        poll_seconds: float,
+        cache_size: int,
+        cleanup_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock = timedelta(seconds=lock_seconds)
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.cleanup_seconds = cleanup_seconds
+        self.renew_seconds = lock_seconds / 3
+        # Срок записи проверяется по expires_at, TTL кэша - верхняя граница.
+        self.cache = LRUCache(cache_size, ttl_seconds)
+        self.flights = SingleFlight()
+        self._saving: set[asyncio.Task] = set()
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        handle: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Выполнить обработчик или повторить сохранённый ответ.
+
+        Args:
+            key (str): Ключ идемпотентности.
+            fingerprint (str): Хэш запроса.
+            handle (Callable[[], Awaitable[Response]]): Обработчик запроса.
+
+        Raises:
+            HTTPException: Если ключ использован с другим запросом или
+                запрос с тем же ключом не завершился за wait_seconds.
+
+        Returns:
+            Response: Ответ обработчика или сохранённый ответ.
+        """
+        response = None
+
+        async def load() -> StoredResponse | None:
+            nonlocal response
+            claimed = await self._claim(key, fingerprint)
+            if isinstance(claimed, StoredResponse):
+                return claimed
+            holding = asyncio.create_task(self._hold(key, claimed))
+            try:
+                try:
+                    response = await handle()
+                except BaseException:
+                    await self._release(key, claimed)
+                    raise
+                return await self._save(key, fingerprint, claimed, response)
+            finally:
+                holding.cancel()
+
+        stored = await self.flights.do((key, fingerprint), load)
+        if response is not None:
+            return response
+        if stored is None:
+            # Ответ первого запроса не сохранён, обработчик выполняется
+            # заново, но не параллельно с другими повторами.
+            return await self.run(key, fingerprint, handle)
+        return stored.to_response()
+
+    async def _claim(
+        self,
+        key: str,
+        fingerprint: str,
+    ) -> StoredResponse | datetime:
+        """Занять ключ или получить сохранённый ответ.
+
+        Returns:
+            StoredResponse | datetime: Сохранённый ответ или время, когда
+                ключ занят этим запросом. Время отличает занятие от
+                следующих, если ключ займёт повтор.
+        """
+        stored = await self.cache.get(key)
+        if stored is not None and stored.expires_at > fresh_timestamp():
+            if stored.fingerprint != fingerprint:
+                raise HTTPException(**KEY_REUSED)
+            return stored
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            async with self.session_factory() as session:
+                session.info["primary"] = True
+                now = fresh_timestamp()
+                claimed = await session.scalar(
+                    insert(IdempotencyKey)
+                    .values(
+                        key=key,
+                        fingerprint=fingerprint,
+                        expires_at=now + self.lock,
+                        created=now,
+                    )
+                    # Устаревший ответ или брошенный ключ занимается заново.
+                    .on_conflict_do_update(
+                        index_elements=[IdempotencyKey.key],
+                        set_={
+                            "fingerprint": fingerprint,
+                            "status_code": None,
+                            "headers": None,
+                            "body": None,
+                            "expires_at": now + self.lock,
+                            "created": now,
+                            "updated": None,
+                        },
+                        where=IdempotencyKey.expires_at <= now,
+                    )
+                    .returning(IdempotencyKey.id)
+                )
+                if claimed is None:
+                    row = await session.execute(
+                        select(
+                            IdempotencyKey.fingerprint,
+                            IdempotencyKey.status_code,
+                            IdempotencyKey.headers,
+                            IdempotencyKey.body,
+                            IdempotencyKey.expires_at,
+                        ).where(IdempotencyKey.key == key)
+                    )
+                    row = row.first()
+                await session.commit()
+            if claimed is not None:
+                return now
+            if row is None:
+                # Ключ удалён между запросами, занять его снова.
+                continue
+            if row.fingerprint != fingerprint:
+                raise HTTPException(**KEY_REUSED)
+            if row.status_code is not None:
+                stored = StoredResponse.from_row(row)
+                await self.cache.set(key, stored)
+                return stored
+            if time.monotonic() >= deadline:
+                raise HTTPException(**KEY_IN_PROGRESS)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _hold(self, key: str, claimed: datetime) -> None:
+        """Продлевать занятие ключа, пока задача не отменена."""
+        while True:
+            await asyncio.sleep(self.renew_seconds)
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(
+                        update(IdempotencyKey)
+                        .where(
+                            IdempotencyKey.key == key,
+                            IdempotencyKey.created == claimed,
+                            IdempotencyKey.status_code.is_(None),
+                        )
+                        .values(expires_at=fresh_timestamp() + self.lock)
+                    )
+                    await session.commit()
+            except (SQLAlchemyError, OSError) as error:
+                logger.warning("Не удалось продлить ключ %s: %s", key, error)
+
+    async def _save(
+        self,
+        key: str,
+        fingerprint: str,
+        claimed: datetime,
+        response: Response,
+    ) -> StoredResponse | None:
+        """Сохранить ответ обработчика.
+
+        Returns:
+            StoredResponse | None: Сохранённый ответ, None если ответ
+                не сохраняется и ключ освобождён.
+        """
+        body = getattr(response, "body", None)
+        if body is None or response.status_code >= 500:
+            await self._release(key, claimed)
+            return None
+        stored = StoredResponse(
+            fingerprint=fingerprint,
+            status_code=response.status_code,
+            headers=tuple(response.raw_headers),
+            body=body,
+            expires_at=fresh_timestamp() + self.ttl,
+        )
+        await self.cache.set(key, stored)
+        try:
+            await self._store(key, claimed, stored)
+        except (SQLAlchemyError, OSError) as error:
+            # Запись уже выполнена, клиент должен получить её ответ,
+            # а повтор - не выполнить её снова.
+            logger.warning("Не удалось сохранить ответ ключа %s: %s", key, error)
+            task = asyncio.create_task(self._save_later(key, claimed, stored))
+            self._saving.add(task)
+            task.add_done_callback(self._saving.discard)
+        return stored
+
+    async def _store(
+        self,
+        key: str,
+        claimed: datetime,
+        stored: StoredResponse,
+    ) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.created == claimed,
+                )
+                .values(
+                    status_code=stored.status_code,
+                    headers=[
+                        [name.decode("latin-1"), value.decode("latin-1")]
+                        for name, value in stored.headers
+                    ],
+                    body=stored.body,
+                    expires_at=stored.expires_at,
+                )
+            )
+            await session.commit()
+
+    async def _save_later(
+        self,
+        key: str,
+        claimed: datetime,
+        stored: StoredResponse,
+    ) -> None:
+        """Повторять сохранение ответа, пока оно не удастся.
+
+        Пока ответ не сохранён, повторы в этом процессе получают его
+        из кэша, а в других - ждут, пока не истечёт занятие ключа.
+        """
+        delay = self.poll_seconds
+        while stored.expires_at > fresh_timestamp():
+            await asyncio.sleep(delay)
+            try:
+                await self._store(key, claimed, stored)
+                return
+            except (SQLAlchemyError, OSError) as error:
+                logger.warning("Не удалось сохранить ответ ключа %s: %s", key, error)
+                delay = min(delay * 2, self.renew_seconds)
+
+    async def _release(self, key: str, claimed: datetime) -> None:
+        """Освободить ключ, ответ на который не сохранён."""
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.created == claimed,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                )
+                await session.commit()
+        except (SQLAlchemyError, OSError) as error:
+            logger.warning("Не удалось освободить ключ %s: %s", key, error)
+
+    async def cleanup(self) -> int:
+        """Удалить устаревшие ответы и брошенные ключи.
+
+        Returns:
+            int: Количество удалённых ключей.
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.expires_at <= fresh_timestamp()
+                )
+            )
+            await session.commit()
+        return result.rowcount
+
+    @asynccontextmanager
+    async def cleaning(self) -> AsyncIterator[None]:
+        """Удалять устаревшие ключи в фоне, пока открыт контекст."""
+        task = asyncio.create_task(self._clean())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _clean(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_seconds)
+            try:
+                await self.cleanup()
+            except (SQLAlchemyError, OSError) as error:
+                logger.warning("Не удалось удалить устаревшие ключи: %s", error)
+
+
+idempotency_store = IdempotencyStore(
+    AsyncSessionLocal,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    lock_seconds=settings.idempotency_lock_seconds,
+    wait_seconds=settings.idempotency_wait_seconds,
+    poll_seconds=settings.idempotency_poll_seconds,
+    cache_size=settings.idempotency_cache_size,
+    cleanup_seconds=settings.idempotency_cleanup_seconds,
+)
@@ -0,0 +1,2 @@
+from .endpoints import metrics_router  # noqa
+from .endpoints import router as internal_router  # noqa
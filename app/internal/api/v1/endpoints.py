@@ -0,0 +1,77 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import CacheStats, cache
+from app.core.db import engine
+from app.core.metrics import CONTENT_TYPE, request_metrics
+from app.core.pool import PoolStats, get_pool_stats
+from app.core.singleflight import SingleFlightStats, single_flight
+from app.internal.schemas import (
+    CacheStatsResponse,
+    PoolStatsResponse,
+    SingleFlightStatsResponse,
+)
+
+router = APIRouter()
+metrics_router = APIRouter()
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStatsResponse,
+)
+async def get_cache_stats() -> CacheStats:
+    """Получить счётчики кэша.
+
+    Returns:
+        CacheStats: Счётчики кэша.
+    """
+    return cache.stats()
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatsResponse,
+)
+async def get_database_pool_stats() -> PoolStats:
+    """Получить состояние пула соединений с базой данных.
+
+    Returns:
+        PoolStats: Состояние пула.
+    """
+    return get_pool_stats(engine)
+
+
+@router.get(
+    "/single_flight",
+    response_model=SingleFlightStatsResponse,
+)
+async def get_single_flight_stats() -> SingleFlightStats:
+    """Получить счётчики объединения одинаковых чтений.
+
+    Returns:
+        SingleFlightStats: Счётчики объединения чтений.
+    """
+    return single_flight.stats()
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics() -> PlainTextResponse:
+    """Получить метрики в текстовом формате Prometheus.
+
+    Returns:
+        PlainTextResponse: Метрики запросов, пула соединений, кэша
+            и объединения чтений.
+    """
+    return PlainTextResponse(
+        request_metrics.render(
+            get_pool_stats(engine),
+            cache.stats(),
+            single_flight.stats(),
+        ),
+        media_type=CONTENT_TYPE,
+    )
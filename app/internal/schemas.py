@@ -0,0 +1,72 @@
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    """Схема ответа со счётчиками кэша.
+
+    Args:
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+        evictions (int): Количество вытеснений по размеру.
+        expirations (int): Количество записей, устаревших по TTL.
+        size (int): Текущее количество записей.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+
+    class ConfigDict:
+        from_attributes = True
+
+
+class PoolStatsResponse(BaseModel):
+    """Схема ответа с состоянием пула соединений.
+
+    Args:
+        pool_class (str): Класс пула.
+        size (None or int): Размер пула.
+        checked_out (None or int): Выданные сейчас соединения.
+        checked_in (None or int): Свободные соединения в пуле.
+        overflow (None or int): Соединения сверх размера пула.
+        checkouts (int): Количество выданных соединений.
+        timeouts (int): Количество таймаутов ожидания.
+        wait_total_ms (float): Суммарное время ожидания, мс.
+        wait_avg_ms (float): Среднее время ожидания, мс.
+        wait_max_ms (float): Наибольшее время ожидания, мс.
+    """
+
+    pool_class: str
+    size: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    checkouts: int
+    timeouts: int
+    wait_total_ms: float
+    wait_avg_ms: float
+    wait_max_ms: float
+
+    class ConfigDict:
+        from_attributes = True
+
+
+class SingleFlightStatsResponse(BaseModel):
+    """Схема ответа со счётчиками объединения одинаковых чтений.
+
+    Args:
+        executed (int): Загрузки, выполненные первым запросом.
+        coalesced (int): Запросы, получившие результат чужой загрузки.
+        errors (int): Загрузки, завершившиеся ошибкой.
+        in_flight (int): Загрузки, выполняющиеся сейчас.
+    """
+
+    executed: int
+    coalesced: int
+    errors: int
+    in_flight: int
+
+    class ConfigDict:
+        from_attributes = True
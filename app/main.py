@@ -1,8 +1,44 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.v1.routers import main_router
 from app.core.config import settings
+from app.core.db import engine, replica_set
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import QueryStatsMiddleware
+from app.core.replicas import ReadYourWritesMiddleware
+from app.idempotency.store import idempotency_store
+from app.internal.api.v1 import metrics_router
+from app.meeting_room.crud import meeting_room_crud, meeting_room_feed
+from app.meeting_room.snapshot import catalog_snapshot
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(meeting_room_feed.listening(engine))
+        await stack.enter_async_context(idempotency_store.cleaning())
+        await stack.enter_async_context(
+            meeting_room_crud.invalidating(
+                replica_set.sticky_seconds if replica_set.engines else 0
+            )
+        )
+        if settings.catalog_snapshot:
+            await stack.enter_async_context(
+                catalog_snapshot.following(meeting_room_feed)
+            )
+        yield
+
 
-app = FastAPI(title=settings.app_title, description=settings.app_description)
+app = FastAPI(
+    title=settings.app_title,
+    description=settings.app_description,
+    lifespan=lifespan,
+)
 
 app.include_router(main_router)
+app.include_router(metrics_router)
+app.add_middleware(ReadYourWritesMiddleware, replicas=replica_set)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
@@ -1,20 +1,70 @@
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.meeting_room.api.v1.validators import (
     check_meeting_room_exists,
+    check_meeting_room_saved,
     check_name_duplicate,
+    check_snapshot_room_exists,
+)
+from app.core.config import settings
+from app.core.db import get_async_session, get_read_engine
+from app.core.etag import (
+    collection_etag,
+    etag_matches,
+    if_match_clauses,
+    object_etag,
+    raise_precondition_failed,
 )
-from app.core.db import get_async_session
-from app.meeting_room.crud import meeting_room_crud
+from app.core.export import ExportFormat, encode_rows
+from app.core.feed import stream_events
+from app.core.fields import FieldSelector
+from app.core.pagination import get_cursor, get_ranked_cursor
+from app.core.serialization import dump_row, dump_rows
+from app.idempotency.routing import IdempotentRoute
+from app.meeting_room.crud import meeting_room_crud, meeting_room_feed
 from app.meeting_room.models import MeetingRoom
 from app.meeting_room.schemas import (
+    MeetingRoomBatchResult,
+    MeetingRoomBatchUpdate,
     MeetingRoomCreate,
+    MeetingRoomLookup,
+    MeetingRoomLookupResult,
     MeetingRoomResponse,
     MeetingRoomUpdate,
 )
+from app.meeting_room.snapshot import catalog_snapshot
+from app.reservation.api.v1.validators import check_reservation_interval
+from app.reservation.availability import availability_index
+
+router = APIRouter(route_class=IdempotentRoute)
+
+select_fields = FieldSelector(MeetingRoomResponse)
 
-router = APIRouter()
+BATCH_NAME_DUPLICATE = {
+    "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+    "detail": "Переговорка с таким именем уже существует!",
+}
+BATCH_ID_DUPLICATE = {
+    "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+    "detail": "Переговорка повторяется в запросе!",
+}
+BATCH_NOT_FOUND = {
+    "status_code": status.HTTP_404_NOT_FOUND,
+    "detail": "Переговорка не найдена!",
+}
 
 
 @router.get(
@@ -23,18 +73,453 @@ router = APIRouter()
     response_model_exclude_none=True,
 )
 async def get_all_meeting_rooms(
+    request: Request,
+    after: int | None = Depends(get_cursor),
+    limit: int = Query(
+        settings.page_size_default,
+        ge=1,
+        le=settings.page_size_max,
+    ),
+    name: str | None = None,
+    name_prefix: str | None = None,
+    fields: list[str] = Depends(select_fields),
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Получить страницу списка переговорок.
+
+    Курсор следующей страницы возвращается в заголовках
+    X-Next-Cursor и Link. ETag строится по версии каталога, и если
+    у клиента актуальная версия, страница не читается и не
+    сериализуется.
+
+    Читаются только запрошенные поля ответа, и строки сериализуются
+    сразу в JSON без построения объектов ORM и валидации
+    MeetingRoomResponse. В режиме снимка каталога страница берётся
+    из памяти без соединения с базой данных.
+
+    Args:
+        request (Request): Запрос.
+        after (None or int): Идентификатор из курсора страницы.
+        limit (int): Размер страницы.
+        name (None or str): Точное название переговорки.
+        name_prefix (None or str): Начало названия переговорки.
+        fields (list[str]): Поля ответа.
+        if_none_match (None or str): ETag версии страницы у клиента.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        Response: Список переговорок в JSON или ответ 304.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        version = snapshot.version
+    else:
+        version = await meeting_room_crud.get_version(session)
+    etag = collection_etag(version, str(request.query_params))
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+    headers = {"ETag": etag}
+
+    if snapshot is not None:
+        page = snapshot.page(after, limit, name=name, name_prefix=name_prefix)
+        body = snapshot.dump(page.items, fields)
+    else:
+        columns = [getattr(MeetingRoom, field) for field in fields]
+        if "id" not in fields:
+            # Нужен для курсора, в ответ не попадает.
+            columns.append(MeetingRoom.id)
+        page = await meeting_room_crud.get_active_page(
+            session,
+            after,
+            limit,
+            name=name,
+            name_prefix=name_prefix,
+            columns=columns,
+        )
+        body = dump_rows(page.items, fields)
+    if page.next_cursor is not None:
+        next_url = request.url.include_query_params(after=page.next_cursor)
+        headers["X-Next-Cursor"] = page.next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+)
+async def export_meeting_rooms(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    fields: list[str] = Depends(select_fields),
+    session: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """Выгрузить каталог активных переговорок в NDJSON или CSV.
+
+    Строки читаются серверным курсором и отдаются клиенту по мере
+    чтения, не собираясь в памяти целиком.
+
+    Args:
+        export_format (ExportFormat): Формат выгрузки.
+        fields (list[str]): Выгружаемые поля.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        StreamingResponse: Потоковый ответ с каталогом.
+    """
+    partitions = meeting_room_crud.stream(
+        get_read_engine(session),
+        [getattr(MeetingRoom, field) for field in fields],
+        MeetingRoom.is_active,
+    )
+    return StreamingResponse(
+        encode_rows(partitions, fields, export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="meeting_rooms.{export_format.value}"'
+            ),
+        },
+    )
+
+
+@router.get(
+    "/changes",
+    response_class=StreamingResponse,
+)
+async def stream_meeting_room_changes(
+    after: int | None = Query(None, ge=0),
+    last_event_id: int | None = Header(None, ge=0),
+) -> StreamingResponse:
+    """Поток изменений переговорок в формате Server-Sent Events.
+
+    Событие содержит номер в id, тип create, update, deactivate или
+    restore в event и переговорку в data. После переподключения клиент
+    получает события после номера из заголовка Last-Event-ID или
+    параметра after. Если пропущенные события уже вытеснены из буфера,
+    приходит событие resync: список нужно перечитать. Поток не
+    обращается к базе данных.
+
+    Args:
+        after (None or int): Номер последнего полученного события.
+        last_event_id (None or int): Номер последнего полученного
+            события, который браузер передаёт при переподключении.
+
+    Returns:
+        StreamingResponse: Поток событий.
+    """
+    subscription = meeting_room_feed.broker.subscribe(
+        last_event_id if last_event_id is not None else after
+    )
+    return StreamingResponse(
+        stream_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/available",
+    response_model=list[MeetingRoomResponse],
+    response_model_exclude_none=True,
+)
+async def get_available_meeting_rooms(
+    from_reserve: datetime,
+    to_reserve: datetime,
+    fields: list[str] = Depends(select_fields),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Получить переговорки, свободные в интервале.
+
+    Занятость проверяется по индексу бронирований в памяти, интервалы
+    раньше горизонта индекса проверяются одним запросом к базе данных.
+
+    Args:
+        from_reserve (datetime): Начало интервала.
+        to_reserve (datetime): Окончание интервала.
+        fields (list[str]): Поля ответа.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если начало интервала не раньше окончания.
+
+    Returns:
+        Response: Список свободных переговорок в JSON.
+    """
+    from_reserve, to_reserve = check_reservation_interval(
+        from_reserve, to_reserve
+    )
+    await availability_index.ensure_loaded(session)
+    if not availability_index.covers(from_reserve):
+        rooms = await meeting_room_crud.get_available(
+            from_reserve,
+            to_reserve,
+            session,
+        )
+    else:
+        all_rooms = await meeting_room_crud.get_all_active(session)
+        rooms = [
+            room
+            for room in all_rooms
+            if availability_index.is_free(room.id, from_reserve, to_reserve)
+        ]
+    return Response(
+        dump_rows(
+            ([getattr(room, field) for field in fields] for room in rooms),
+            fields,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[MeetingRoomResponse],
+    response_model_exclude_none=True,
+)
+async def search_meeting_rooms(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    after: dict | None = Depends(get_ranked_cursor),
+    limit: int = Query(
+        settings.page_size_default,
+        ge=1,
+        le=settings.page_size_max,
+    ),
+    fields: list[str] = Depends(select_fields),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Найти переговорки по началу слов в названии и описании.
+
+    Результаты упорядочены по релевантности, курсор следующей
+    страницы возвращается в заголовках X-Next-Cursor и Link.
+
+    Args:
+        request (Request): Запрос.
+        q (str): Текст запроса.
+        after (None or dict): Ключ из курсора страницы.
+        limit (int): Размер страницы.
+        fields (list[str]): Поля ответа.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        Response: Список найденных переговорок в JSON.
+    """
+    page = await meeting_room_crud.search(
+        session,
+        q,
+        [getattr(MeetingRoom, field) for field in fields],
+        after,
+        limit,
+    )
+    headers = {}
+    if page.next_cursor is not None:
+        next_url = request.url.include_query_params(after=page.next_cursor)
+        headers["X-Next-Cursor"] = page.next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(
+        dump_rows(page.items, fields),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.post(
+    "/lookup",
+    response_model=MeetingRoomLookupResult,
+    response_model_exclude_none=True,
+)
+async def lookup_meeting_rooms(
+    lookup: MeetingRoomLookup,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """Получить несколько переговорок по идентификаторам и названиям.
+
+    Переговорки берутся из кэша, остальные читаются одним запросом
+    по идентификаторам и одним по названиям. Ненайденные и удалённые
+    переговорки перечисляются в ответе, а не приводят к ошибке.
+
+    Args:
+        lookup (MeetingRoomLookup): Идентификаторы и названия.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        dict: Найденные переговорки и ненайденные идентификаторы и названия.
+    """
+    by_id = await meeting_room_crud.get_many(lookup.ids, session)
+    by_name = await meeting_room_crud.get_many_by_name(lookup.names, session)
+    items = {}
+    for meeting_room in (*by_id.values(), *by_name.values()):
+        if meeting_room.is_active:
+            items[meeting_room.id] = meeting_room
+    return {
+        "items": list(items.values()),
+        "missing_ids": [
+            obj_id
+            for obj_id in dict.fromkeys(lookup.ids)
+            if obj_id not in items
+        ],
+        "missing_names": [
+            name
+            for name in dict.fromkeys(lookup.names)
+            if name not in by_name or by_name[name].id not in items
+        ],
+    }
+
+
+@router.post(
+    "/batch",
+    response_model=list[MeetingRoomBatchResult],
+    response_model_exclude_none=True,
+)
+async def create_meeting_rooms_batch(
+    meeting_rooms: list[MeetingRoomCreate] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.batch_size_max,
+    ),
+    session: AsyncSession = Depends(get_async_session),
+) -> list[dict]:
+    """Создать или восстановить несколько переговорок.
+
+    Весь пакет сохраняется в одной транзакции многострочными запросами,
+    результат возвращается для каждого элемента в порядке запроса.
+
+    Args:
+        meeting_rooms (list[MeetingRoomCreate]): Данные по переговоркам.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        list[dict]: Результаты по элементам пакета.
+    """
+    results: list[dict | None] = []
+    first_index: dict[str, int] = {}
+    for index, meeting_room in enumerate(meeting_rooms):
+        if meeting_room.name in first_index:
+            results.append(BATCH_NAME_DUPLICATE)
+        else:
+            first_index[meeting_room.name] = index
+            results.append(None)
+
+    saved = await meeting_room_crud.bulk_create_or_restore(
+        [meeting_rooms[index] for index in first_index.values()],
+        session,
+    )
+    for name, index in first_index.items():
+        if name in saved:
+            results[index] = {
+                "status_code": status.HTTP_201_CREATED,
+                "data": saved[name],
+            }
+        else:
+            results[index] = BATCH_NAME_DUPLICATE
+    return results
+
+
+@router.patch(
+    "/batch",
+    response_model=list[MeetingRoomBatchResult],
+    response_model_exclude_none=True,
+)
+async def partially_update_meeting_rooms_batch(
+    meeting_rooms: list[MeetingRoomBatchUpdate] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.batch_size_max,
+    ),
+    session: AsyncSession = Depends(get_async_session),
+) -> list[dict]:
+    """Обновить информацию по нескольким переговоркам.
+
+    Занятость новых названий проверяется одним запросом, обновление
+    выполняется запросами UPDATE ... FROM (VALUES ...) в одной
+    транзакции.
+
+    Args:
+        meeting_rooms (list[MeetingRoomBatchUpdate]): Данные
+            для обновления переговорок.
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        list[dict]: Результаты по элементам пакета.
+    """
+    results: list[dict | None] = [None] * len(meeting_rooms)
+    seen_ids: set[int] = set()
+    new_names: dict[str, int] = {}
+    for index, meeting_room in enumerate(meeting_rooms):
+        if meeting_room.id in seen_ids:
+            results[index] = BATCH_ID_DUPLICATE
+        elif meeting_room.name is not None and meeting_room.name in new_names:
+            results[index] = BATCH_NAME_DUPLICATE
+        else:
+            seen_ids.add(meeting_room.id)
+            if meeting_room.name is not None:
+                new_names[meeting_room.name] = meeting_room.id
+
+    taken = await meeting_room_crud.get_room_ids_by_names(
+        list(new_names),
+        session,
+    )
+    objs_in = {}
+    for index, meeting_room in enumerate(meeting_rooms):
+        if results[index] is not None:
+            continue
+        if taken.get(meeting_room.name, meeting_room.id) != meeting_room.id:
+            results[index] = BATCH_NAME_DUPLICATE
+            continue
+        objs_in[index] = MeetingRoomUpdate(
+            **meeting_room.model_dump(exclude_unset=True, exclude={"id"})
+        )
+
+    updated = await meeting_room_crud.bulk_update(
+        [(meeting_rooms[index].id, obj_in) for index, obj_in in objs_in.items()],
+        session,
+        MeetingRoom.is_active.is_(True),
+    )
+    for index in objs_in:
+        meeting_room = updated.get(meeting_rooms[index].id)
+        if meeting_room is None:
+            results[index] = BATCH_NOT_FOUND
+        else:
+            results[index] = {
+                "status_code": status.HTTP_200_OK,
+                "data": meeting_room,
+            }
+    return results
+
+
+@router.delete(
+    "/batch",
+    response_model=list[MeetingRoomBatchResult],
+    response_model_exclude_none=True,
+)
+async def remove_meeting_rooms_batch(
+    ids: list[int] = Query(..., max_length=settings.batch_size_max),
     session: AsyncSession = Depends(get_async_session),
-) -> list[MeetingRoom]:
-    """Получить список переговорок.
+) -> list[dict]:
+    """Удалить несколько переговорок.
 
     Args:
+        ids (list[int]): Идентификаторы переговорок.
         session (AsyncSession): Сессия базы данных.
 
     Returns:
-        list[MeetingRoom]: Список переговорок.
+        list[dict]: Результаты по идентификаторам в порядке запроса.
     """
-    all_rooms = await meeting_room_crud.get_all_active(session)
-    return all_rooms
+    removed = await meeting_room_crud.bulk_remove(
+        list(dict.fromkeys(ids)),
+        session,
+        MeetingRoom.is_active.is_(True),
+    )
+    return [
+        {"status_code": status.HTTP_200_OK, "data": removed[meeting_room_id]}
+        if meeting_room_id in removed
+        else BATCH_NOT_FOUND
+        for meeting_room_id in ids
+    ]
 
 
 @router.get(
@@ -44,25 +529,46 @@ async def get_all_meeting_rooms(
 )
 async def get_meeting_room_by_id(
     meeting_room_id: int,
+    fields: list[str] = Depends(select_fields),
+    if_none_match: str | None = Header(None),
     session: AsyncSession = Depends(get_async_session),
-) -> MeetingRoom:
+) -> Response:
     """Получить переговорку по идентификатору id.
 
+    Переговорка читается целиком через кэш по id или из снимка
+    каталога, поэтому выборка полей применяется только к ответу.
+
     Args:
         meeting_room_id (int): Идентификатор переговорки.
+        fields (list[str]): Поля ответа.
+        if_none_match (None or str): ETag версии переговорки у клиента.
         session (AsyncSession): Сессия базы данных.
 
     Raises:
         HTTPException: Если переговорка не найдена.
 
     Returns:
-        MeetingRoom: Объект переговорки.
+        Response: Переговорка в JSON или ответ 304.
     """
-    meeting_room = await check_meeting_room_exists(
-        meeting_room_id,
-        session,
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        meeting_room = check_snapshot_room_exists(snapshot, meeting_room_id)
+    else:
+        meeting_room = await check_meeting_room_exists(
+            meeting_room_id,
+            session,
+        )
+    etag = object_etag(meeting_room)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+    return Response(
+        dump_row([getattr(meeting_room, field) for field in fields], fields),
+        media_type="application/json",
+        headers={"ETag": etag},
     )
-    return meeting_room
 
 
 @router.post(
@@ -87,24 +593,11 @@ async def create_new_meeting_room(
     Returns:
         MeetingRoom: Объект переговорки.
     """
-    deleted_meeting_room = await check_name_duplicate(
-        meeting_room.name,
-        session,
-    )
-
-    if deleted_meeting_room:
-        restore_room = await meeting_room_crud.restore(
-            deleted_meeting_room,
-            meeting_room,
-            session,
-        )
-        return restore_room
-
-    new_room = await meeting_room_crud.create(
+    new_room = await meeting_room_crud.create_or_restore(
         meeting_room,
         session,
     )
-    return new_room
+    return check_meeting_room_saved(new_room)
 
 
 @router.patch(
@@ -115,6 +608,8 @@ async def create_new_meeting_room(
 async def partially_update_meeting_room(
     meeting_room_id: int,
     obj_in: MeetingRoomUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     session: AsyncSession = Depends(get_async_session),
 ) -> MeetingRoom:
     """Обновить информацию по переговорке.
@@ -122,10 +617,13 @@ async def partially_update_meeting_room(
     Args:
         meeting_room_id (int): Идентификатор переговорки.
         obj_in (MeetingRoomUpdate): Данные для обновления переговорки.
+        response (Response): Ответ.
+        if_match (None or str): ETag версии, которую изменяет клиент.
         session (AsyncSession): Сессия базы данных.
 
     Raises:
-        HTTPException: Если переговорка не найдена или удалена.
+        HTTPException: Если переговорка не найдена или удалена,
+            или изменилась после получения клиентом.
 
     Returns:
         MeetingRoom: Объект обновленной переговорки.
@@ -134,17 +632,22 @@ async def partially_update_meeting_room(
         meeting_room_id,
         session,
     )
+    conditions = if_match_clauses(MeetingRoom, meeting_room_id, if_match)
 
     # Позволяет изменять информацию переговорки
     # без необходимости менять название.
-    if obj_in.name != meeting_room.name:
+    if obj_in.name is not None and obj_in.name != meeting_room.name:
         await check_name_duplicate(obj_in.name, session)
 
     meeting_room = await meeting_room_crud.update(
         meeting_room,
         obj_in,
         session,
+        *conditions,
     )
+    if meeting_room is None:
+        raise_precondition_failed()
+    response.headers["ETag"] = object_etag(meeting_room)
     return meeting_room
 
 
@@ -155,20 +658,30 @@ async def partially_update_meeting_room(
 )
 async def remove_meeting_room(
     meeting_room_id: int,
+    if_match: str | None = Header(None),
     session: AsyncSession = Depends(get_async_session),
 ) -> MeetingRoom:
     """Удалить переговорку.
 
     Args:
         meeting_room_id (int): Идентификатор переговорки.
+        if_match (None or str): ETag версии, которую удаляет клиент.
         session (AsyncSession): Сессия базы данных.
 
     Raises:
-        HTTPException: Если переговорка не найдена в базе данных.
+        HTTPException: Если переговорка не найдена в базе данных
+            или изменилась после получения клиентом.
 
     Returns:
         MeetingRoom: Объект удаленной переговорки.
     """
     meeting_room = await check_meeting_room_exists(meeting_room_id, session)
-    meeting_room = await meeting_room_crud.remove(meeting_room, session)
+    conditions = if_match_clauses(MeetingRoom, meeting_room_id, if_match)
+    meeting_room = await meeting_room_crud.remove(
+        meeting_room,
+        session,
+        *conditions,
+    )
+    if meeting_room is None:
+        raise_precondition_failed()
     return meeting_room
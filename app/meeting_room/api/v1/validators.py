@@ -1,8 +1,10 @@
 from fastapi import HTTPException
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.meeting_room.crud import meeting_room_crud
 from app.meeting_room.models import MeetingRoom
+from app.meeting_room.snapshot import CatalogSnapshot
 
 
 async def check_name_duplicate(
@@ -33,6 +35,28 @@ async def check_name_duplicate(
     return meeting_room
 
 
+def check_meeting_room_saved(
+    meeting_room: MeetingRoom | None,
+) -> MeetingRoom:
+    """Проверяет, что переговорка создана или восстановлена.
+
+    Args:
+        meeting_room (MeetingRoom | None): Результат сохранения.
+
+    Raises:
+        HTTPException: Если переговорка с таким именем уже существует.
+
+    Returns:
+        MeetingRoom: Объект переговорки.
+    """
+    if meeting_room is None:
+        raise HTTPException(
+            status_code=422,
+            detail="Переговорка с таким именем уже существует!",
+        )
+    return meeting_room
+
+
 async def check_meeting_room_exists(
     meeting_room_id: int,
     session: AsyncSession,
@@ -60,3 +84,31 @@ async def check_meeting_room_exists(
             detail="Переговорка не найдена!",
         )
     return meeting_room
+
+
+def check_snapshot_room_exists(
+    snapshot: CatalogSnapshot,
+    meeting_room_id: int,
+) -> Row:
+    """Проверяет, наличие переговорки в снимке каталога.
+
+    В снимке только активные переговорки, поэтому удалённая переговорка
+    тоже не найдена.
+
+    Args:
+        snapshot (CatalogSnapshot): Снимок каталога.
+        meeting_room_id (int): Идентификатор переговорки.
+
+    Raises:
+        HTTPException: Если переговорки нет в снимке.
+
+    Returns:
+        Row: Строка переговорки.
+    """
+    meeting_room = snapshot.get(meeting_room_id)
+    if meeting_room is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Переговорка не найдена!",
+        )
+    return meeting_room
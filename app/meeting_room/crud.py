@@ -1,11 +1,32 @@
+import re
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Hashable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    String,
+    and_,
+    any_,
+    bindparam,
+    case,
+    exists,
+    func,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.crud import CRUDBase
-from app.meeting_room.models import MeetingRoom
+from app.core.db import fresh_timestamp
+from app.core.feed import CREATE, RESTORE, ChangeFeed
+from app.core.pagination import Page, encode_cursor
+from app.meeting_room.models import SEARCH_CONFIG, MeetingRoom
 from app.meeting_room.schemas import MeetingRoomCreate, MeetingRoomUpdate
+from app.reservation.crud import reservation_crud
 
 
 @dataclass
@@ -22,22 +43,235 @@ class CRUDMeetingRoom(
         model (Type[MeetingRoom]): Модель переговорок.
     """
 
+    async def create_or_restore(
+        self,
+        obj_in: MeetingRoomCreate,
+        session: AsyncSession,
+    ) -> MeetingRoom | None:
+        """Создать переговорку или восстановить удалённую с тем же именем.
+
+        Один атомарный запрос INSERT ... ON CONFLICT (name) DO UPDATE
+        с условием на удалённую переговорку. Конкурентные запросы
+        с одним именем не гоняются друг с другом: ровно один из них
+        вставит или восстановит строку.
+
+        Args:
+            obj_in (MeetingRoomCreate): Данные по переговорке.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            MeetingRoom | None: Созданная или восстановленная переговорка,
+                None если активная переговорка с таким именем уже есть.
+        """
+        db_objs = await self.bulk_create_or_restore([obj_in], session)
+        return db_objs.get(obj_in.name)
+
+    async def bulk_create_or_restore(
+        self,
+        objs_in: Sequence[MeetingRoomCreate],
+        session: AsyncSession,
+    ) -> dict[str, MeetingRoom]:
+        """Создать или восстановить переговорки в одной транзакции.
+
+        Переговорки с одинаковым набором переданных полей сохраняются
+        одним многострочным INSERT ... ON CONFLICT (name) DO UPDATE,
+        чтобы при восстановлении не затирать непереданные поля.
+        Названия во входных данных должны быть уникальны.
+
+        Args:
+            objs_in (Sequence[MeetingRoomCreate]): Данные по переговоркам.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            dict[str, MeetingRoom]: Созданные и восстановленные переговорки
+                по названиям, занятых активными переговорками названий
+                в словаре нет.
+        """
+        groups: dict[tuple[str, ...], list[MeetingRoomCreate]] = {}
+        for obj_in in objs_in:
+            groups.setdefault(
+                tuple(obj_in.model_dump(exclude_unset=True)), []
+            ).append(obj_in)
+
+        saved = {}
+        for fields, group in groups.items():
+            statement = insert(self.model).values(
+                [{**obj_in.model_dump(), "is_active": True} for obj_in in group]
+            )
+            db_objs = await self._write(
+                session,
+                statement.on_conflict_do_update(
+                    index_elements=[self.model.name],
+                    set_={
+                        **{field: statement.excluded[field] for field in fields},
+                        "is_active": True,
+                        "updated": fresh_timestamp(),
+                    },
+                    where=self.model.is_active.is_not(True),
+                ),
+                # У восстановленной переговорки есть время изменения,
+                # у созданной - нет.
+                lambda written: case(
+                    (written.c.updated.is_(None), CREATE), else_=RESTORE
+                ),
+            )
+            saved.update((db_obj.name, db_obj) for db_obj in db_objs)
+        await session.commit()
+        await self.invalidate(*saved.values())
+        return saved
+
     async def get_all_active(
         self,
         session: AsyncSession,
     ) -> list[MeetingRoom]:
         """Получить список активных переговорок.
 
+        Одновременные чтения объединяются в один запрос. Ожидающие
+        получают тот же список объектов, что и первый запрос, без
+        восстановления каждой строки в своей сессии: объекты не истекают
+        при фиксации и читаются после закрытия сессии. Список только
+        для чтения, изменять его объекты нельзя.
+
         Args:
             session (AsyncSession): Сессия базы данных.
 
         Returns:
             list[MeetingRoom]: Список переговорок.
         """
+
+        async def load() -> list[MeetingRoom]:
+            db_objs = await session.scalars(
+                select(self.model).where(
+                    # Эквивалентно self.model.is_active == True
+                    self.model.is_active.is_(True),
+                )
+            )
+            return list(db_objs.all())
+
+        return await self.flights.do(
+            (self._cache_key("active", None), bool(session.info.get("primary"))),
+            load,
+        )
+
+    async def get_active_page(
+        self,
+        session: AsyncSession,
+        after: int | None = None,
+        limit: int = 100,
+        name: str | None = None,
+        name_prefix: str | None = None,
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> Page[MeetingRoom] | Page[Row]:
+        """Получить страницу активных переговорок.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+            after (None or int): Идентификатор последней переговорки
+                предыдущей страницы.
+            limit (int): Размер страницы.
+            name (None or str): Точное название переговорки.
+            name_prefix (None or str): Начало названия переговорки.
+            columns (None or Sequence[ColumnElement]): Читаемые столбцы
+                вместо объектов.
+
+        Returns:
+            Page[MeetingRoom] | Page[Row]: Страница переговорок.
+        """
+        # Условие совпадает с условием частичных индексов.
+        where = [self.model.is_active]
+        if name is not None:
+            where.append(self.model.name == name)
+        if name_prefix is not None:
+            where.append(self.model.name.startswith(name_prefix, autoescape=True))
+        return await self.get_page(session, after, limit, *where, columns=columns)
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query_text: str,
+        columns: Sequence[ColumnElement],
+        after: dict[str, Any] | None = None,
+        limit: int = 100,
+    ) -> Page[Row]:
+        """Найти активные переговорки по названию и описанию.
+
+        Каждое слово запроса ищется как начало слова по поисковому
+        вектору с GIN индексом, совпадения в названии весят больше,
+        чем в описании. Результаты упорядочены по убыванию релевантности,
+        страницы строятся по ключу (релевантность, id).
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+            query_text (str): Текст запроса.
+            columns (Sequence[ColumnElement]): Читаемые столбцы. К ним
+                добавляются id и релевантность rank.
+            after (None or dict[str, Any]): Ключ последней переговорки
+                предыдущей страницы: id и rank.
+            limit (int): Размер страницы.
+
+        Returns:
+            Page[Row]: Страница строк, пустая, если в запросе нет слов.
+        """
+        words = re.findall(r"\w+", query_text)
+        if not words:
+            return Page([], None)
+        ts_query = func.to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'"),
+            " & ".join(f"{word}:*" for word in words),
+        )
+        rank = func.ts_rank(self.model.search_vector, ts_query).label("rank")
+        query = select(*columns, self.model.id, rank).where(
+            # Условие совпадает с условием частичных индексов, с IS TRUE
+            # планировщик их не выбирает.
+            self.model.is_active,
+            self.model.search_vector.bool_op("@@")(ts_query),
+        )
+        if after is not None:
+            query = query.where(
+                or_(
+                    rank < after["rank"],
+                    and_(rank == after["rank"], self.model.id > after["id"]),
+                )
+            )
+        rows = await session.execute(
+            # Лишняя строка показывает, есть ли следующая страница.
+            query.order_by(rank.desc(), self.model.id).limit(limit + 1)
+        )
+        items = list(rows.all())
+        if len(items) <= limit:
+            return Page(items, None)
+        items = items[:limit]
+        return Page(items, encode_cursor(items[-1].id, rank=items[-1].rank))
+
+    async def get_available(
+        self,
+        from_reserve: datetime,
+        to_reserve: datetime,
+        session: AsyncSession,
+    ) -> list[MeetingRoom]:
+        """Получить активные переговорки, свободные в интервале.
+
+        Один запрос с коррелированным NOT EXISTS по индексу бронирований
+        вместо отдельной проверки для каждой переговорки.
+
+        Args:
+            from_reserve (datetime): Начало интервала.
+            to_reserve (datetime): Окончание интервала.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            list[MeetingRoom]: Список свободных переговорок.
+        """
         db_objs = await session.scalars(
             select(self.model).where(
-                # Эквивалентно self.model.is_active == True
-                self.model.is_active.is_(True),
+                self.model.is_active,
+                ~exists().where(
+                    reservation_crud.intersection_clause(
+                        self.model.id,
+                        from_reserve,
+                        to_reserve,
+                    )
+                ),
             )
         )
         return list(db_objs.all())
@@ -63,6 +297,28 @@ class CRUDMeetingRoom(
         )
         return db_room_id.first()
 
+    async def get_room_ids_by_names(
+        self,
+        room_names: Sequence[str],
+        session: AsyncSession,
+    ) -> dict[str, int]:
+        """Получить идентификаторы переговорок по названиям.
+
+        Args:
+            room_names (Sequence[str]): Названия переговорок.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            dict[str, int]: Идентификаторы найденных переговорок
+                по названиям, включая удалённые.
+        """
+        rows = await session.execute(
+            select(self.model.name, self.model.id).where(
+                self.model.name.in_(room_names),
+            )
+        )
+        return dict(rows.all())
+
     async def get_room_by_name(
         self,
         room_name: str,
@@ -70,6 +326,10 @@ class CRUDMeetingRoom(
     ) -> MeetingRoom | None:
         """Получить переговорку по названию.
 
+        Кэш по названию хранит только идентификатор, сама переговорка
+        берётся из кэша по id. Если переговорку переименовали, её
+        название не совпадёт с запрошенным и запись будет промахом.
+
         Args:
             room_name (str): Название переговорки.
             session (AsyncSession): Сессия базы данных.
@@ -77,12 +337,100 @@ class CRUDMeetingRoom(
         Returns:
             MeetingRoom | None: Объект переговорки.
         """
-        meeting_room = await session.scalars(
-            select(self.model).where(
-                self.model.name == room_name,
+        key = self._cache_key("name", room_name)
+        room_id = None
+        if not session.info.get("primary"):
+            room_id = await self.cache.get(key)
+        if room_id is not None:
+            meeting_room = await self.get_by_id(room_id, session)
+            if meeting_room is not None and meeting_room.name == room_name:
+                return meeting_room
+
+        async def load() -> list[MeetingRoom]:
+            generation = await self.cache.generation()
+            meeting_room = await session.scalars(
+                select(self.model).where(
+                    self.model.name == room_name,
+                )
+            )
+            meeting_room = meeting_room.first()
+            if meeting_room is None:
+                return []
+            await self.cache.set_many(
+                {
+                    key: meeting_room.id,
+                    self._cache_key("id", meeting_room.id): self._to_cache(
+                        meeting_room
+                    ),
+                },
+                generation,
             )
+            return [meeting_room]
+
+        meeting_rooms = await self._single_flight(key, session, load)
+        return meeting_rooms[0] if meeting_rooms else None
+
+    async def get_many_by_name(
+        self,
+        room_names: Sequence[str],
+        session: AsyncSession,
+    ) -> dict[str, MeetingRoom]:
+        """Получить переговорки по нескольким названиям.
+
+        Идентификаторы берутся из кэша по названию, переговорки - через
+        get_many. Названия без записи в кэше или переименованные
+        переговорки ищутся одним запросом WHERE name = ANY(...).
+
+        Args:
+            room_names (Sequence[str]): Названия переговорок.
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            dict[str, MeetingRoom]: Найденные переговорки по названиям
+                в порядке запроса, включая удалённые.
+        """
+        room_names = list(dict.fromkeys(room_names))
+        cached_ids = await self.cache.get_many(
+            self._cache_key("name", room_name) for room_name in room_names
         )
-        return meeting_room.first()
+        by_id = await self.get_many(list(cached_ids.values()), session)
+        found = {}
+        for room_name in room_names:
+            room_id = cached_ids.get(self._cache_key("name", room_name))
+            meeting_room = by_id.get(room_id)
+            if meeting_room is not None and meeting_room.name == room_name:
+                found[room_name] = meeting_room
+
+        missing = [room_name for room_name in room_names if room_name not in found]
+        if missing:
+            generation = await self.cache.generation()
+            meeting_rooms = await session.scalars(
+                select(self.model).where(
+                    self.model.name
+                    == any_(bindparam("names", missing, type_=ARRAY(String)))
+                )
+            )
+            to_cache = {}
+            for meeting_room in meeting_rooms:
+                found[meeting_room.name] = meeting_room
+                to_cache[self._cache_key("name", meeting_room.name)] = meeting_room.id
+                to_cache[self._cache_key("id", meeting_room.id)] = self._to_cache(
+                    meeting_room
+                )
+            await self.cache.set_many(to_cache, generation)
+        return {
+            room_name: found[room_name]
+            for room_name in room_names
+            if room_name in found
+        }
+
+    def _cache_keys(self, db_obj: MeetingRoom) -> list[Hashable]:
+        return [
+            *super()._cache_keys(db_obj),
+            self._cache_key("name", db_obj.name),
+        ]
+
 
+meeting_room_feed = ChangeFeed("meetingroom_changes")
 
-meeting_room_crud = CRUDMeetingRoom(MeetingRoom)
+meeting_room_crud = CRUDMeetingRoom(MeetingRoom, feed=meeting_room_feed)
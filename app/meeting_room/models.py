@@ -1,7 +1,20 @@
-from sqlalchemy import Boolean, Column, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    Index,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 
 from app.core.db import Base
 
+# Конфигурация полнотекстового поиска: русская морфология, латиница
+# разбирается английским стеммером.
+SEARCH_CONFIG = "russian"
+
 
 class MeetingRoom(Base):
     """Модель переговорки.
@@ -10,8 +23,46 @@ class MeetingRoom(Base):
         name (str): Название переговорки уникальное и не более 100 символов.
         description (str): Описание переговорки.
         is_active (bool): Статус переговорки.
+        search_vector (str): Вычисляемый поисковый вектор названия
+            и описания, не загружается вместе с объектом.
     """
 
     name = Column(String(100), unique=True, nullable=False)
     description = Column(Text)
     is_active = Column(Boolean, default=True)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', name), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                "coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+        raiseload=True,
+    )
+
+    __table_args__ = (
+        # Страницы активных переговорок по ключу id. Название в индексе
+        # позволяет читать выборку полей id и name только из индекса.
+        Index(
+            "ix_meetingroom_active_id",
+            "id",
+            postgresql_include=["name"],
+            postgresql_where=is_active,
+        ),
+        # Поиск по началу названия (LIKE 'abc%') при любой сортировке базы.
+        Index(
+            "ix_meetingroom_active_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+            postgresql_where=is_active,
+        ),
+        Index(
+            "ix_meetingroom_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=is_active,
+        ),
+    )
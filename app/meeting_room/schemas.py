@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.config import settings
+
 
 class MeetingRoomBase(BaseModel):
     """Базовая схема переговорки.
@@ -48,3 +50,53 @@ class MeetingRoomResponse(MeetingRoomBase):
 
     class ConfigDict:
         from_attributes = True
+
+
+class MeetingRoomBatchUpdate(MeetingRoomUpdate):
+    """Схема обновления переговорки в пакетном запросе.
+
+    Args:
+        id (int): Идентификатор обновляемой переговорки.
+    """
+
+    id: int
+
+
+class MeetingRoomBatchResult(BaseModel):
+    """Схема результата для одного элемента пакетного запроса.
+
+    Args:
+        status_code (int): HTTP статус обработки элемента.
+        detail (None or str): Описание ошибки.
+        data (None or MeetingRoomResponse): Сохранённая переговорка.
+    """
+
+    status_code: int
+    detail: str | None = None
+    data: MeetingRoomResponse | None = None
+
+
+class MeetingRoomLookup(BaseModel):
+    """Схема запроса нескольких переговорок по id и названиям.
+
+    Args:
+        ids (list[int]): Идентификаторы переговорок.
+        names (list[str]): Названия переговорок.
+    """
+
+    ids: list[int] = Field([], max_length=settings.batch_size_max)
+    names: list[str] = Field([], max_length=settings.batch_size_max)
+
+
+class MeetingRoomLookupResult(BaseModel):
+    """Схема ответа на запрос нескольких переговорок.
+
+    Args:
+        items (list[MeetingRoomResponse]): Найденные переговорки.
+        missing_ids (list[int]): Идентификаторы, по которым переговорок нет.
+        missing_names (list[str]): Названия, по которым переговорок нет.
+    """
+
+    items: list[MeetingRoomResponse]
+    missing_ids: list[int]
+    missing_names: list[str]
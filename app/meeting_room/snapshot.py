@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from bisect import bisect_right
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import AsyncIterator, Mapping, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.feed import ChangeFeed, Subscription
+from app.core.pagination import Page, encode_cursor
+from app.core.serialization import dump_row, dump_rows
+from app.meeting_room.crud import meeting_room_crud
+from app.meeting_room.models import MeetingRoom
+from app.meeting_room.schemas import MeetingRoomResponse
+
+logger = logging.getLogger(__name__)
+
+# Поля ответа в порядке схемы, в этом порядке сериализуются строки снимка.
+RESPONSE_FIELDS = tuple(MeetingRoomResponse.model_fields)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Неизменяемый снимок активных переговорок.
+
+    Строки заранее сериализованы в JSON со всеми полями ответа, поэтому
+    страница списка собирается склейкой готовых байтов.
+
+    Args:
+        version (int): Версия каталога, как у get_version.
+        rows (tuple[Row, ...]): Переговорки по возрастанию id.
+        ids (tuple[int, ...]): Идентификаторы строк для поиска страницы.
+        documents (tuple[bytes, ...]): Строки в JSON со всеми полями.
+        by_id (Mapping[int, int]): Позиции строк по идентификатору.
+        by_name (Mapping[str, int]): Позиции строк по названию.
+    """
+
+    version: int
+    rows: tuple[Row, ...]
+    ids: tuple[int, ...]
+    documents: tuple[bytes, ...]
+    by_id: Mapping[int, int]
+    by_name: Mapping[str, int]
+
+    @classmethod
+    def build(cls, version: int, rows: Sequence[Row]) -> "CatalogSnapshot":
+        """Построить снимок.
+
+        Args:
+            version (int): Версия каталога.
+            rows (Sequence[Row]): Строки с полями ответа, created
+                и updated, упорядоченные по id.
+
+        Returns:
+            CatalogSnapshot: Снимок каталога.
+        """
+        rows = tuple(rows)
+        return cls(
+            version=version,
+            rows=rows,
+            ids=tuple(row.id for row in rows),
+            documents=tuple(
+                dump_row(
+                    [getattr(row, field) for field in RESPONSE_FIELDS],
+                    RESPONSE_FIELDS,
+                )
+                for row in rows
+            ),
+            by_id=MappingProxyType(
+                {row.id: index for index, row in enumerate(rows)}
+            ),
+            by_name=MappingProxyType(
+                {row.name: index for index, row in enumerate(rows)}
+            ),
+        )
+
+    def get(self, obj_id: int) -> Row | None:
+        index = self.by_id.get(obj_id)
+        return None if index is None else self.rows[index]
+
+    def page(
+        self,
+        after: int | None = None,
+        limit: int = 100,
+        name: str | None = None,
+        name_prefix: str | None = None,
+    ) -> Page[int]:
+        """Получить страницу, как get_active_page.
+
+        Args:
+            after (None or int): Идентификатор последней переговорки
+                предыдущей страницы.
+            limit (int): Размер страницы.
+            name (None or str): Точное название переговорки.
+            name_prefix (None or str): Начало названия переговорки.
+
+        Returns:
+            Page[int]: Позиции строк страницы и курсор следующей.
+        """
+        start = 0 if after is None else bisect_right(self.ids, after)
+        if name is not None:
+            index = self.by_name.get(name)
+            positions = [] if index is None or index < start else [index]
+        else:
+            positions = range(start, len(self.rows))
+        if name_prefix is not None:
+            positions = (
+                index
+                for index in positions
+                if self.rows[index].name.startswith(name_prefix)
+            )
+        items = []
+        for index in positions:
+            if len(items) == limit:
+                return Page(items, encode_cursor(self.ids[items[-1]]))
+            items.append(index)
+        return Page(items, None)
+
+    def dump(self, positions: Sequence[int], fields: Sequence[str]) -> bytes:
+        """Сериализовать строки в JSON-массив, как dump_rows.
+
+        Args:
+            positions (Sequence[int]): Позиции строк.
+            fields (Sequence[str]): Поля ответа.
+
+        Returns:
+            bytes: JSON в кодировке UTF-8.
+        """
+        if tuple(fields) == RESPONSE_FIELDS:
+            documents = b",".join(self.documents[index] for index in positions)
+            return b"[" + documents + b"]"
+        return dump_rows(
+            (
+                [getattr(self.rows[index], field) for field in fields]
+                for index in positions
+            ),
+            fields,
+        )
+
+
+class CatalogSnapshotStore:
+    """Снимок каталога переговорок в памяти процесса.
+
+    Снимок загружается при старте и перестраивается целиком по событиям
+    ленты изменений: после записи в этом процессе и по уведомлениям
+    других процессов. Новый снимок заменяет старый одним присваиванием.
+    Пока есть непрочитанные события или снимок перестраивается, он
+    считается устаревшим и чтение идёт в базу данных. Снимок устаревает
+    и сразу после фиксации записи этого процесса, не дожидаясь её
+    события, и пока лента не слушает базу: события могут теряться.
+
+    Args:
+        retry_seconds (float): Пауза перед повторной загрузкой после
+            ошибки базы данных.
+    """
+
+    def __init__(self, retry_seconds: float) -> None:
+        self.retry_seconds = retry_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._stale = True
+        self._subscription: Subscription | None = None
+        self._feed: ChangeFeed | None = None
+
+    def current(self) -> CatalogSnapshot | None:
+        """Актуальный снимок или None, если читать нужно из базы."""
+        if (
+            self._stale
+            or self._subscription is None
+            or self._subscription.pending
+            or not self._feed.live
+            or self._feed.last_committed > self._snapshot.version
+        ):
+            return None
+        return self._snapshot
+
+    async def load(self, session: AsyncSession) -> None:
+        """Перестроить снимок по данным базы.
+
+        Версия читается до строк: если каталог изменится между запросами,
+        версия снимка окажется старше строк, и клиент не сохранит старые
+        строки с новым ETag.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+        """
+        # Отстающая реплика могла ещё не получить изменение, о котором
+        # пришло уведомление.
+        session.info["primary"] = True
+        version = await meeting_room_crud.get_version(session)
+        rows = await session.execute(
+            select(
+                *(getattr(MeetingRoom, field) for field in RESPONSE_FIELDS),
+                MeetingRoom.created,
+                MeetingRoom.updated,
+            )
+            .where(MeetingRoom.is_active)
+            .order_by(MeetingRoom.id)
+        )
+        self._snapshot = CatalogSnapshot.build(version, rows.all())
+        self._stale = False
+
+    @asynccontextmanager
+    async def following(
+        self,
+        feed: ChangeFeed,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ) -> AsyncIterator[None]:
+        """Загрузить снимок и обновлять его, пока открыт контекст.
+
+        Если база недоступна при старте, приложение запускается без
+        снимка, и загрузка повторяется в фоне.
+
+        Args:
+            feed (ChangeFeed): Лента изменений переговорок.
+            session_factory (async_sessionmaker): Фабрика сессий.
+        """
+        # Подписка до загрузки: изменения во время загрузки не теряются.
+        self._subscription = feed.broker.subscribe()
+        self._feed = feed
+        await self._reload(session_factory)
+        task = asyncio.create_task(self._follow(session_factory))
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            self._subscription.close()
+            self._subscription = None
+            self._feed = None
+            self._stale = True
+
+    async def _follow(self, session_factory: async_sessionmaker) -> None:
+        while True:
+            if self._stale:
+                await asyncio.sleep(self.retry_seconds)
+            else:
+                await self._subscription.get()
+                self._stale = True
+            # Несколько изменений подряд дают одну перезагрузку.
+            self._subscription.clear()
+            await self._reload(session_factory)
+
+    async def _reload(self, session_factory: async_sessionmaker) -> None:
+        try:
+            async with session_factory() as session:
+                await self.load(session)
+        except (SQLAlchemyError, OSError) as error:
+            logger.warning("Не удалось загрузить снимок каталога: %s", error)
+
+
+catalog_snapshot = CatalogSnapshotStore(settings.catalog_snapshot_retry_seconds)
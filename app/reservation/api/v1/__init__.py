@@ -0,0 +1 @@
+from .endpoints import router as reservation_router  # noqa
@@ -0,0 +1,159 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.idempotency.routing import IdempotentRoute
+from app.meeting_room.api.v1.validators import check_meeting_room_exists
+from app.reservation.api.v1.validators import (
+    check_reservation_exists,
+    check_reservation_integrity,
+)
+from app.reservation.availability import availability_index
+from app.reservation.crud import reservation_crud
+from app.reservation.models import Reservation
+from app.reservation.schemas import (
+    ReservationCreate,
+    ReservationResponse,
+    ReservationUpdate,
+)
+
+router = APIRouter(route_class=IdempotentRoute)
+
+
+@router.get(
+    "/",
+    response_model=list[ReservationResponse],
+)
+async def get_all_reservations(
+    session: AsyncSession = Depends(get_async_session),
+) -> list[Reservation]:
+    """Получить список активных бронирований.
+
+    Args:
+        session (AsyncSession): Сессия базы данных.
+
+    Returns:
+        list[Reservation]: Список бронирований.
+    """
+    return await reservation_crud.get_all_active(session)
+
+
+@router.get(
+    "/{reservation_id}",
+    response_model=ReservationResponse,
+)
+async def get_reservation_by_id(
+    reservation_id: int,
+    session: AsyncSession = Depends(get_async_session),
+) -> Reservation:
+    """Получить бронирование по идентификатору id.
+
+    Args:
+        reservation_id (int): Идентификатор бронирования.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если бронирование не найдено.
+
+    Returns:
+        Reservation: Объект бронирования.
+    """
+    return await check_reservation_exists(reservation_id, session)
+
+
+@router.post(
+    "/",
+    response_model=ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_reservation(
+    reservation: ReservationCreate,
+    session: AsyncSession = Depends(get_async_session),
+) -> Reservation:
+    """Забронировать переговорку.
+
+    Пересечение с другими бронированиями проверяет ограничение
+    исключения в базе данных в рамках той же вставки.
+
+    Args:
+        reservation (ReservationCreate): Данные бронирования.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если переговорка не найдена или уже забронирована.
+
+    Returns:
+        Reservation: Объект бронирования.
+    """
+    await check_meeting_room_exists(reservation.meetingroom_id, session)
+    try:
+        new_reservation = await reservation_crud.create(reservation, session)
+    except IntegrityError as error:
+        await session.rollback()
+        check_reservation_integrity(error)
+    availability_index.add(new_reservation)
+    return new_reservation
+
+
+@router.patch(
+    "/{reservation_id}",
+    response_model=ReservationResponse,
+)
+async def partially_update_reservation(
+    reservation_id: int,
+    obj_in: ReservationUpdate,
+    session: AsyncSession = Depends(get_async_session),
+) -> Reservation:
+    """Изменить время бронирования.
+
+    Args:
+        reservation_id (int): Идентификатор бронирования.
+        obj_in (ReservationUpdate): Данные для обновления бронирования.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если бронирование не найдено или новое время
+            пересекается с другим бронированием.
+
+    Returns:
+        Reservation: Объект обновленного бронирования.
+    """
+    reservation = await check_reservation_exists(reservation_id, session)
+    try:
+        reservation = await reservation_crud.update(
+            reservation,
+            obj_in,
+            session,
+        )
+    except IntegrityError as error:
+        await session.rollback()
+        check_reservation_integrity(error)
+    availability_index.add(reservation)
+    return reservation
+
+
+@router.delete(
+    "/{reservation_id}",
+    response_model=ReservationResponse,
+)
+async def cancel_reservation(
+    reservation_id: int,
+    session: AsyncSession = Depends(get_async_session),
+) -> Reservation:
+    """Отменить бронирование.
+
+    Args:
+        reservation_id (int): Идентификатор бронирования.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если бронирование не найдено.
+
+    Returns:
+        Reservation: Объект отмененного бронирования.
+    """
+    reservation = await check_reservation_exists(reservation_id, session)
+    reservation = await reservation_crud.remove(reservation, session)
+    availability_index.remove(reservation)
+    return reservation
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.reservation.crud import reservation_crud
+from app.reservation.models import Reservation
+from app.reservation.schemas import to_naive_utc
+
+# Коды ошибок PostgreSQL, которые возвращают ограничения бронирования.
+EXCLUSION_VIOLATION = "23P01"
+CHECK_VIOLATION = "23514"
+
+
+async def check_reservation_exists(
+    reservation_id: int,
+    session: AsyncSession,
+) -> Reservation:
+    """Проверяет, наличие бронирования по идентификатору id.
+
+    Args:
+        reservation_id (int): Идентификатор бронирования.
+        session (AsyncSession): Сессия базы данных.
+
+    Raises:
+        HTTPException: Если бронирование не найдено или отменено.
+
+    Returns:
+        Reservation: Объект бронирования.
+    """
+    reservation = await reservation_crud.get_by_id(reservation_id, session)
+    if not reservation or not reservation.is_active:
+        raise HTTPException(
+            status_code=404,
+            detail="Бронирование не найдено!",
+        )
+    return reservation
+
+
+def check_reservation_interval(
+    from_reserve: datetime,
+    to_reserve: datetime,
+) -> tuple[datetime, datetime]:
+    """Проверяет, что начало интервала раньше окончания.
+
+    Время приводится к UTC без часового пояса, как в базе данных
+    и индексе занятости.
+
+    Args:
+        from_reserve (datetime): Начало интервала.
+        to_reserve (datetime): Окончание интервала.
+
+    Raises:
+        HTTPException: Если начало интервала не раньше окончания.
+
+    Returns:
+        tuple[datetime, datetime]: Начало и окончание интервала в UTC.
+    """
+    from_reserve = to_naive_utc(from_reserve)
+    to_reserve = to_naive_utc(to_reserve)
+    if from_reserve >= to_reserve:
+        raise HTTPException(
+            status_code=422,
+            detail="Начало бронирования должно быть раньше окончания!",
+        )
+    return from_reserve, to_reserve
+
+
+def check_reservation_integrity(error: IntegrityError) -> None:
+    """Преобразует нарушение ограничений бронирования в ошибку API.
+
+    Args:
+        error (IntegrityError): Ошибка базы данных.
+
+    Raises:
+        HTTPException: Если интервал пересекается с другим бронированием
+            или начало бронирования не раньше окончания.
+        IntegrityError: Если нарушено другое ограничение.
+    """
+    pgcode = getattr(error.orig, "pgcode", None)
+    if pgcode == EXCLUSION_VIOLATION:
+        raise HTTPException(
+            status_code=422,
+            detail="Переговорка уже забронирована на это время!",
+        ) from error
+    if pgcode == CHECK_VIOLATION:
+        raise HTTPException(
+            status_code=422,
+            detail="Начало бронирования должно быть раньше окончания!",
+        ) from error
+    raise error
@@ -0,0 +1,261 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import fresh_timestamp
+from app.reservation.models import Reservation
+from app.reservation.schemas import to_naive_utc
+
+
+@dataclass
+class RoomSchedule:
+    """Отсортированный индекс бронирований одной переговорки.
+
+    Активные бронирования переговорки не пересекаются, поэтому при
+    сортировке по началу окончания тоже отсортированы, и поиск
+    пересечения сводится к двоичному поиску.
+
+    Args:
+        starts (list[datetime]): Начала бронирований.
+        ends (list[datetime]): Окончания бронирований.
+        ids (list[int]): Идентификаторы бронирований.
+    """
+
+    starts: list[datetime] = field(default_factory=list)
+    ends: list[datetime] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+
+    def add(self, reservation_id: int, start: datetime, end: datetime) -> None:
+        position = bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, reservation_id)
+
+    def remove(self, reservation_id: int, start: datetime) -> None:
+        position = bisect_left(self.starts, start)
+        while position < len(self.ids) and self.starts[position] == start:
+            if self.ids[position] == reservation_id:
+                del self.starts[position]
+                del self.ends[position]
+                del self.ids[position]
+                return
+            position += 1
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Проверить, свободна ли переговорка в интервале [start, end)."""
+        position = bisect_right(self.ends, start)
+        return position == len(self.starts) or self.starts[position] >= end
+
+    def free_slots(
+        self,
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """Получить свободные промежутки внутри интервала [start, end)."""
+        slots = []
+        cursor = start
+        position = bisect_right(self.ends, start)
+        while position < len(self.starts) and self.starts[position] < end:
+            if self.starts[position] > cursor:
+                slots.append((cursor, self.starts[position]))
+            cursor = max(cursor, self.ends[position])
+            position += 1
+        if cursor < end:
+            slots.append((cursor, end))
+        return slots
+
+
+class AvailabilityIndex:
+    """Индекс занятости переговорок в памяти процесса.
+
+    Загружает активные бронирования, которые заканчиваются после момента
+    загрузки (горизонта), и обновляется инкрементально при создании,
+    изменении и отмене бронирований. Интервалы раньше горизонта индекс
+    не покрывает. Изменения, сделанные другими процессами, подтягиваются
+    периодической перезагрузкой.
+    """
+
+    def __init__(self, refresh_seconds: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._rooms: dict[int, RoomSchedule] = {}
+        self._reservations: dict[int, tuple[int, datetime, datetime]] = {}
+        self._horizon: datetime | None = None
+        self._loaded_at: float | None = None
+        self._pending: list[tuple[str, Reservation]] | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.refresh_seconds
+        )
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Загрузить индекс, если он ещё не загружен или устарел.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+        """
+        if not self.is_stale:
+            return
+        async with self._lock:
+            if self.is_stale:
+                await self.load(session)
+
+    async def load(self, session: AsyncSession) -> None:
+        """Перестроить индекс по данным базы.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+        """
+        horizon = fresh_timestamp()
+        self._pending = []
+        try:
+            rows = await session.execute(
+                select(
+                    Reservation.id,
+                    Reservation.meetingroom_id,
+                    Reservation.from_reserve,
+                    Reservation.to_reserve,
+                )
+                .where(
+                    Reservation.is_active,
+                    Reservation.to_reserve > horizon,
+                )
+                .order_by(Reservation.meetingroom_id, Reservation.from_reserve)
+            )
+            rooms: dict[int, RoomSchedule] = {}
+            reservations = {}
+            for reservation_id, room_id, start, end in rows:
+                schedule = rooms.setdefault(room_id, RoomSchedule())
+                # Строки уже отсортированы, вставка в конец дешевле insort.
+                schedule.starts.append(start)
+                schedule.ends.append(end)
+                schedule.ids.append(reservation_id)
+                reservations[reservation_id] = (room_id, start, end)
+            pending = self._pending
+        finally:
+            self._pending = None
+
+        self._rooms = rooms
+        self._reservations = reservations
+        self._horizon = horizon
+        self._loaded_at = time.monotonic()
+        # Изменения, пришедшие во время загрузки, могли не попасть в выборку.
+        for action, reservation in pending:
+            getattr(self, action)(reservation)
+
+    def covers(self, start: datetime) -> bool:
+        """Проверить, покрывает ли индекс интервалы с началом start."""
+        return self._horizon is not None and to_naive_utc(start) >= self._horizon
+
+    def add(self, reservation: Reservation) -> None:
+        """Учесть новое или изменённое бронирование.
+
+        Args:
+            reservation (Reservation): Объект бронирования.
+        """
+        if self._pending is not None:
+            self._pending.append(("add", reservation))
+        self._discard(reservation.id)
+        if not reservation.is_active:
+            return
+        if self._horizon is not None and reservation.to_reserve <= self._horizon:
+            return
+        self._rooms.setdefault(reservation.meetingroom_id, RoomSchedule()).add(
+            reservation.id,
+            reservation.from_reserve,
+            reservation.to_reserve,
+        )
+        self._reservations[reservation.id] = (
+            reservation.meetingroom_id,
+            reservation.from_reserve,
+            reservation.to_reserve,
+        )
+
+    def remove(self, reservation: Reservation) -> None:
+        """Удалить отменённое бронирование из индекса.
+
+        Args:
+            reservation (Reservation): Объект бронирования.
+        """
+        if self._pending is not None:
+            self._pending.append(("remove", reservation))
+        self._discard(reservation.id)
+
+    def _discard(self, reservation_id: int) -> None:
+        known = self._reservations.pop(reservation_id, None)
+        if known is not None:
+            room_id, start, _ = known
+            self._rooms[room_id].remove(reservation_id, start)
+
+    def is_free(self, room_id: int, start: datetime, end: datetime) -> bool:
+        """Проверить, свободна ли переговорка в интервале.
+
+        Args:
+            room_id (int): Идентификатор переговорки.
+            start (datetime): Начало интервала.
+            end (datetime): Окончание интервала.
+
+        Returns:
+            bool: True, если пересекающихся бронирований нет.
+        """
+        schedule = self._rooms.get(room_id)
+        if schedule is None:
+            return True
+        return schedule.is_free(to_naive_utc(start), to_naive_utc(end))
+
+    def free_rooms(
+        self,
+        room_ids: Iterable[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[int]:
+        """Отобрать переговорки, свободные в интервале.
+
+        Args:
+            room_ids (Iterable[int]): Идентификаторы переговорок.
+            start (datetime): Начало интервала.
+            end (datetime): Окончание интервала.
+
+        Returns:
+            list[int]: Идентификаторы свободных переговорок.
+        """
+        return [
+            room_id
+            for room_id in room_ids
+            if self.is_free(room_id, start, end)
+        ]
+
+    def free_slots(
+        self,
+        room_id: int,
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """Получить свободные промежутки переговорки внутри интервала.
+
+        Args:
+            room_id (int): Идентификатор переговорки.
+            start (datetime): Начало интервала.
+            end (datetime): Окончание интервала.
+
+        Returns:
+            list[tuple[datetime, datetime]]: Свободные промежутки.
+        """
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        schedule = self._rooms.get(room_id)
+        if schedule is None:
+            return [(start, end)]
+        return schedule.free_slots(start, end)
+
+
+availability_index = AvailabilityIndex(settings.availability_refresh_seconds)
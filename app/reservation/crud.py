@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, and_, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.crud import CRUDBase
+from app.reservation.models import Reservation
+from app.reservation.schemas import ReservationCreate, ReservationUpdate
+
+
+@dataclass
+class CRUDReservation(
+    CRUDBase[
+        Reservation,
+        ReservationCreate,
+        ReservationUpdate,
+    ]
+):
+    """CRUD методы для модели бронирований.
+
+    Args:
+        model (Type[Reservation]): Модель бронирований.
+    """
+
+    async def get_all_active(
+        self,
+        session: AsyncSession,
+    ) -> list[Reservation]:
+        """Получить список активных бронирований.
+
+        Args:
+            session (AsyncSession): Сессия базы данных.
+
+        Returns:
+            list[Reservation]: Список бронирований.
+        """
+        db_objs = await session.scalars(
+            select(self.model).where(
+                self.model.is_active.is_(True),
+            )
+        )
+        return list(db_objs.all())
+
+    def intersection_clause(
+        self,
+        meetingroom_id: int | ColumnElement[int],
+        from_reserve: datetime,
+        to_reserve: datetime,
+    ) -> ColumnElement[bool]:
+        """Условие пересечения активного бронирования с интервалом.
+
+        Выражения условия совпадают с ограничением исключения, поэтому
+        запрос обслуживается его GiST индексом, а не перебором всей
+        истории бронирований переговорки.
+
+        Args:
+            meetingroom_id (int | ColumnElement[int]): Идентификатор
+                переговорки или коррелированный столбец.
+            from_reserve (datetime): Начало интервала.
+            to_reserve (datetime): Окончание интервала.
+
+        Returns:
+            ColumnElement[bool]: Условие для WHERE.
+        """
+        closed = literal_column("'[]'")
+        return and_(
+            func.int4range(
+                self.model.meetingroom_id,
+                self.model.meetingroom_id,
+                closed,
+            )
+            == func.int4range(meetingroom_id, meetingroom_id, closed),
+            func.tsrange(self.model.from_reserve, self.model.to_reserve).op(
+                "&&"
+            )(func.tsrange(from_reserve, to_reserve)),
+            self.model.is_active,
+        )
+
+    async def get_intersecting_reservations(
+        self,
+        meetingroom_id: int,
+        from_reserve: datetime,
+        to_reserve: datetime,
+        session: AsyncSession,
+        reservation_id: int | None = None,
+    ) -> list[Reservation]:
+        """Получить активные бронирования, пересекающие интервал.
+
+        Args:
+            meetingroom_id (int): Идентификатор переговорки.
+            from_reserve (datetime): Начало интервала.
+            to_reserve (datetime): Окончание интервала.
+            session (AsyncSession): Сессия базы данных.
+            reservation_id (None or int): Бронирование, которое
+                не нужно учитывать, например при его обновлении.
+
+        Returns:
+            list[Reservation]: Список пересекающихся бронирований.
+        """
+        query = select(self.model).where(
+            self.intersection_clause(meetingroom_id, from_reserve, to_reserve)
+        )
+        if reservation_id is not None:
+            query = query.where(self.model.id != reservation_id)
+
+        reservations = await session.scalars(query)
+        return list(reservations.all())
+
+
+reservation_crud = CRUDReservation(Reservation)
@@ -0,0 +1,75 @@
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+from app.core.db import Base
+
+
+class Reservation(Base):
+    """Модель бронирования переговорки.
+
+    Пересечения бронирований одной переговорки запрещены ограничением
+    исключения: GiST индекс по паре (переговорка, интервал) проверяет
+    новую бронь одним индексным поиском и не позволяет двум
+    конкурентным транзакциям занять одно и то же время.
+
+    Args:
+        meetingroom_id (int): Идентификатор переговорки.
+        from_reserve (datetime): Начало бронирования.
+        to_reserve (datetime): Окончание бронирования.
+        owner (str): Владелец бронирования.
+        is_active (bool): Статус бронирования, отменённая бронь не
+            участвует в проверке пересечений.
+    """
+
+    meetingroom_id = Column(
+        Integer,
+        ForeignKey("meetingroom.id"),
+        nullable=False,
+    )
+    from_reserve = Column(DateTime, nullable=False)
+    to_reserve = Column(DateTime, nullable=False)
+    owner = Column(String(100), nullable=False)
+    is_active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "from_reserve < to_reserve",
+            name="ck_reservation_period",
+        ),
+        # int4range вместо самого идентификатора позволяет обойтись
+        # встроенными GiST классами операторов без расширения btree_gist.
+        ExcludeConstraint(
+            (
+                func.int4range(
+                    meetingroom_id,
+                    meetingroom_id,
+                    literal_column("'[]'"),
+                ),
+                "=",
+            ),
+            (func.tsrange(from_reserve, to_reserve), "&&"),
+            name="ex_reservation_overlap",
+            using="gist",
+            where=literal_column("is_active"),
+        ),
+        # Загрузка будущих бронирований в индекс занятости читает их
+        # в порядке (переговорка, начало) только из индекса, без сортировки.
+        Index(
+            "ix_reservation_active_room_from",
+            "meetingroom_id",
+            "from_reserve",
+            postgresql_include=["to_reserve", "id"],
+            postgresql_where=literal_column("is_active"),
+        ),
+    )
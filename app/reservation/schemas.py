@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Привести время к UTC без часового пояса, как в базе данных.
+
+    Время без часового пояса считается уже заданным в UTC.
+
+    Args:
+        value (datetime): Время.
+
+    Returns:
+        datetime: Время в UTC без часового пояса.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ReservationBase(BaseModel):
+    """Базовая схема бронирования.
+
+    Args:
+        from_reserve (None or datetime): Начало бронирования.
+        to_reserve (None or datetime): Окончание бронирования.
+    """
+
+    from_reserve: datetime | None = None
+    to_reserve: datetime | None = None
+
+    @field_validator("from_reserve", "to_reserve")
+    def convert_to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        if value is None:
+            return value
+        return to_naive_utc(value)
+
+    @model_validator(mode="after")
+    def check_from_reserve_before_to_reserve(self) -> "ReservationBase":
+        if (
+            self.from_reserve is not None
+            and self.to_reserve is not None
+            and self.from_reserve >= self.to_reserve
+        ):
+            raise ValueError(
+                "Начало бронирования должно быть раньше окончания!"
+            )
+        return self
+
+
+class ReservationCreate(ReservationBase):
+    """Схема создания бронирования.
+
+    Args:
+        meetingroom_id (int): Идентификатор переговорки.
+        from_reserve (datetime): Начало бронирования, обязательное поле.
+        to_reserve (datetime): Окончание бронирования, обязательное поле.
+        owner (str): Владелец бронирования.
+    """
+
+    meetingroom_id: int
+    from_reserve: datetime
+    to_reserve: datetime
+    owner: str = Field(..., min_length=1, max_length=100)
+
+
+class ReservationUpdate(ReservationBase):
+    """Схема обновления бронирования.
+
+    Args:
+        from_reserve (None or datetime): Новое начало бронирования.
+        to_reserve (None or datetime): Новое окончание бронирования.
+    """
+
+    @field_validator("from_reserve", "to_reserve")
+    def reserve_cannot_be_null(cls, value: datetime) -> datetime:
+        if value is None:
+            raise ValueError("Время бронирования не может быть пустым!")
+        return value
+
+
+class ReservationResponse(ReservationBase):
+    """Схема ответа с информацией о бронировании.
+
+    Args:
+        id (int): Идентификатор бронирования.
+        meetingroom_id (int): Идентификатор переговорки.
+        owner (str): Владелец бронирования.
+    """
+
+    id: int
+    meetingroom_id: int
+    owner: str
+
+    class ConfigDict:
+        from_attributes = True
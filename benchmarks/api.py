@@ -0,0 +1,366 @@
+"""Нагрузочный бенчмарк API переговорок.
+
+Запуск::
+
+    python -m benchmarks.api --sizes 1000,10000 --concurrency 1,16 \\
+        --output results.json
+    python -m benchmarks.api --compare results.json
+
+Сценарии list, get, create, patch и delete прогоняются для каждого
+размера каталога и уровня параллельности. Приложение вызывается внутри
+процесса через ASGI-транспорт httpx (``--transport asgi``) или по
+настоящему HTTP через uvicorn (``--transport http``). Запросы проходят
+через зависимость сессии и пул приложения с настройками из окружения,
+меняется только адрес базы. Каталог создаётся в базе
+``DATABASE_URL_TEST`` (или переданной через ``--database-url``),
+например в Postgres из ``docker compose up -d db``, и удаляется после
+замеров. Сценарий delete удаляет переговорки, созданные сценарием
+create, а недостающие создаёт перед замером.
+
+Результаты сохраняются в JSON. С ``--compare`` текущий прогон
+сравнивается с сохранённым, и при ухудшении медианы или пропускной
+способности больше ``--threshold`` команда завершается с кодом 1.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import text
+
+from app.core.base import Base
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, create_db_engine
+from app.main import app
+
+URL = "/api/v1/meeting_rooms/"
+
+SCENARIOS = ("list", "get", "create", "patch", "delete")
+
+FILL_ROOMS = """
+INSERT INTO meetingroom (name, description, is_active, created)
+SELECT 'Переговорка ' || n, 'Этаж ' || n % 20, true, now()
+FROM generate_series(1, :rooms) n
+"""
+
+SEED_DELETIONS = """
+INSERT INTO meetingroom (name, is_active, created)
+SELECT 'bench-delete-' || n, true, now()
+FROM generate_series(1, :rooms) n
+RETURNING id
+"""
+
+
+@dataclass
+class Result:
+    """Результат одного сценария.
+
+    Args:
+        scenario (str): Название сценария.
+        size (int): Количество переговорок в каталоге.
+        concurrency (int): Количество одновременных клиентов.
+        transport (str): Транспорт: asgi или http.
+        requests (int): Количество запросов.
+        errors (int): Количество ответов с неожиданным статусом.
+        throughput_rps (float): Пропускная способность, запросов в секунду.
+        latency_ms (dict[str, float]): Перцентили времени ответа, мс.
+    """
+
+    scenario: str
+    size: int
+    concurrency: int
+    transport: str
+    requests: int
+    errors: int
+    throughput_rps: float
+    latency_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def key(self) -> tuple:
+        return self.scenario, self.size, self.concurrency, self.transport
+
+
+def percentile(timings: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(timings)
+    rank = max(round(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    expected_status: int,
+    requests: int,
+    concurrency: int,
+) -> tuple[list[float], int, float]:
+    """Выполнить запросы в concurrency параллельных клиентах.
+
+    Returns:
+        tuple[list[float], int, float]: Время ответов в мс, количество
+            ошибок и общее время в секундах.
+    """
+    numbers = iter(range(requests))
+    timings = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for number in numbers:
+            started = time.perf_counter()
+            response = await make_request(client, number)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != expected_status:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - started
+
+
+def make_scenarios(size: int, seed: int, created: list[int]) -> dict:
+    """Запросы сценариев для каталога из size переговорок.
+
+    Идентификаторы выбираются генератором с фиксированным seed, чтобы
+    прогоны на разных коммитах выполняли одни и те же запросы.
+    Сценарий create добавляет идентификаторы в created, а delete забирает
+    их оттуда, поэтому каждый запрос удаляет свою переговорку.
+    """
+    rng = random.Random(seed)
+    ids = [rng.randint(1, size) for _ in range(size)]
+
+    async def list_rooms(client, number):
+        return await client.get(URL)
+
+    async def get_room(client, number):
+        return await client.get(f"{URL}{ids[number % size]}")
+
+    async def create_room(client, number):
+        response = await client.post(URL, json={"name": f"bench-{number}"})
+        if response.status_code == 201:
+            created.append(response.json()["id"])
+        return response
+
+    async def patch_room(client, number):
+        return await client.patch(
+            f"{URL}{ids[number % size]}",
+            json={"description": f"Описание {number}"},
+        )
+
+    async def delete_room(client, number):
+        return await client.delete(f"{URL}{created.pop()}")
+
+    return {
+        "list": (list_rooms, 200),
+        "get": (get_room, 200),
+        "create": (create_room, 201),
+        "patch": (patch_room, 200),
+        "delete": (delete_room, 200),
+    }
+
+
+async def fill_catalog(engine, size: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(FILL_ROOMS), {"rooms": size})
+        await conn.execute(text("ANALYZE"))
+    await cache.clear()
+
+
+async def seed_deletions(engine, created: list[int], requests: int) -> None:
+    """Создать переговорки, которых не хватает сценарию delete."""
+    missing = requests - len(created)
+    if missing <= 0:
+        return
+    async with engine.begin() as conn:
+        rows = await conn.execute(text(SEED_DELETIONS), {"rooms": missing})
+        created.extend(rows.scalars())
+
+
+async def start_server(port: int):
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def run(args: argparse.Namespace) -> list[Result]:
+    engine = create_db_engine(args.database_url)
+    app_engine = AsyncSessionLocal.kw["bind"]
+    # Зависимость сессии приложения работает как обычно, но с базой
+    # бенчмарка и пулом, собранным по настройкам приложения.
+    AsyncSessionLocal.configure(bind=engine)
+    if args.transport == "http":
+        server, server_task = await start_server(args.port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}")
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+
+    results = []
+    try:
+        for size in args.sizes:
+            for concurrency in args.concurrency:
+                await fill_catalog(engine, size)
+                created: list[int] = []
+                scenarios = make_scenarios(size, args.seed, created)
+                for name in args.scenarios:
+                    make_request, expected_status = scenarios[name]
+                    if name == "delete":
+                        await seed_deletions(engine, created, args.requests)
+                    # Прогрев, чтобы замер не включал открытие соединений.
+                    if name in ("list", "get"):
+                        await run_scenario(
+                            client, make_request, expected_status,
+                            concurrency, concurrency,
+                        )
+                    timings, errors, elapsed = await run_scenario(
+                        client, make_request, expected_status,
+                        args.requests, concurrency,
+                    )
+                    result = Result(
+                        scenario=name,
+                        size=size,
+                        concurrency=concurrency,
+                        transport=args.transport,
+                        requests=args.requests,
+                        errors=errors,
+                        throughput_rps=round(args.requests / elapsed, 1),
+                        latency_ms={
+                            f"p{q}": round(percentile(timings, q), 3)
+                            for q in (50, 90, 99)
+                        } | {"max": round(max(timings), 3)},
+                    )
+                    results.append(result)
+                    print(
+                        f"{name:<7} size={size:<7} c={concurrency:<4} "
+                        f"{result.throughput_rps:9.1f} rps   "
+                        f"p50 {result.latency_ms['p50']:8.3f} ms   "
+                        f"p99 {result.latency_ms['p99']:8.3f} ms   "
+                        f"errors {errors}",
+                        file=sys.stderr,
+                    )
+    finally:
+        await client.aclose()
+        if args.transport == "http":
+            server.should_exit = True
+            await server_task
+        AsyncSessionLocal.configure(bind=app_engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, results: list[Result], threshold: float) -> bool:
+    """Сравнить прогон с сохранённым и напечатать изменения.
+
+    Args:
+        baseline (dict): Сохранённый отчёт.
+        results (list[Result]): Результаты текущего прогона.
+        threshold (float): Допустимое ухудшение, доля.
+
+    Returns:
+        bool: True, если ухудшений сверх порога нет.
+    """
+    previous = {
+        Result(**item).key: Result(**item) for item in baseline["results"]
+    }
+    ok = True
+    print(f"baseline {baseline.get('commit')}", file=sys.stderr)
+    for result in results:
+        before = previous.get(result.key)
+        if before is None:
+            continue
+        latency = result.latency_ms["p50"] / before.latency_ms["p50"] - 1
+        throughput = result.throughput_rps / before.throughput_rps - 1
+        regressed = latency > threshold or throughput < -threshold
+        ok = ok and not regressed
+        print(
+            f"{result.scenario:<7} size={result.size:<7} "
+            f"c={result.concurrency:<4} p50 {latency:+7.1%}   "
+            f"rps {throughput:+7.1%}{'   REGRESSION' if regressed else ''}",
+            file=sys.stderr,
+        )
+    return ok
+
+
+def parse_ints(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[1000, 10000])
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 16])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=settings.database_url_test)
+    parser.add_argument("--output", help="Файл для сохранения результатов.")
+    parser.add_argument("--compare", help="Сохранённые результаты для сравнения.")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "args": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("output", "compare", "database_url")
+        },
+        "results": [asdict(result) for result in results],
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if not compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
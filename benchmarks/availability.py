@@ -0,0 +1,135 @@
+"""Сравнение индекса занятости в памяти с запросами к базе данных.
+
+Запуск::
+
+    python -m benchmarks.availability --rooms 500 --reservations 200
+
+Бенчмарк создаёт таблицы в базе ``DATABASE_URL_TEST`` (или переданной
+через ``--database-url``), заполняет их и удаляет после замеров.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.base import Base
+from app.core.config import settings
+from app.meeting_room.crud import meeting_room_crud
+from app.reservation.availability import AvailabilityIndex
+from app.reservation.crud import reservation_crud
+
+FILL_ROOMS = """
+INSERT INTO meetingroom (name, is_active, created)
+SELECT 'Переговорка ' || n, true, now() FROM generate_series(1, :rooms) n
+"""
+
+# Часовые бронирования с часовыми перерывами начиная с завтрашнего дня.
+FILL_RESERVATIONS = """
+INSERT INTO reservation
+    (meetingroom_id, from_reserve, to_reserve, owner, is_active, created)
+SELECT
+    room.id,
+    CAST(:start AS timestamp) + make_interval(hours => 2 * n),
+    CAST(:start AS timestamp) + make_interval(hours => 2 * n + 1),
+    'benchmark',
+    true,
+    now()
+FROM meetingroom room, generate_series(0, :reservations - 1) n
+"""
+
+
+async def measure(repeat: int, func) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(
+        f"{name:<28} median {statistics.median(timings):9.3f} ms"
+        f"   min {min(timings):9.3f} ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    start = datetime.utcnow().replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    # Окно попадает на середину расписания каждой переговорки.
+    window_start = start + timedelta(hours=args.reservations)
+    window_end = window_start + timedelta(minutes=30)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(FILL_ROOMS), {"rooms": args.rooms})
+        await conn.execute(
+            text(FILL_RESERVATIONS),
+            {"start": start, "reservations": args.reservations},
+        )
+        await conn.execute(text("ANALYZE"))
+
+    try:
+        async with session_factory() as session:
+            rooms = await meeting_room_crud.get_all_active(session)
+
+            async def sql_per_room():
+                for room in rooms:
+                    await reservation_crud.get_intersecting_reservations(
+                        room.id, window_start, window_end, session
+                    )
+
+            async def sql_single_query():
+                await meeting_room_crud.get_available(
+                    window_start, window_end, session
+                )
+
+            index = AvailabilityIndex(refresh_seconds=10**9)
+            load_timings = await measure(1, lambda: index.load(session))
+
+            async def in_memory():
+                index.free_rooms(
+                    (room.id for room in rooms), window_start, window_end
+                )
+
+            print(
+                f"rooms={args.rooms} "
+                f"reservations={args.rooms * args.reservations}"
+            )
+            report("index load", load_timings)
+            report("sql, query per room", await measure(args.repeat, sql_per_room))
+            report(
+                "sql, single NOT EXISTS",
+                await measure(args.repeat, sql_single_query),
+            )
+            report("in-memory index", await measure(args.repeat, in_memory))
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--reservations", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=settings.database_url_test)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
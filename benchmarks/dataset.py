@@ -0,0 +1,301 @@
+"""Генератор синтетического набора переговорок и бронирований.
+
+Запуск::
+
+    python -m benchmarks.dataset load --rooms 100000 --days 90 --seed 1
+    python -m benchmarks.dataset reset
+
+Данные полностью определяются параметрами ``--seed``, ``--rooms``,
+``--days`` и ``--start``: расписание каждой переговорки строится
+отдельным генератором случайных чисел, зависящим только от seed и
+номера переговорки. Строки загружаются через ``COPY`` asyncpg без ORM.
+Перед загрузкой таблицы очищаются через ``TRUNCATE``, поэтому сброс
+занимает секунды при любом объёме данных. Вместе с ними очищаются
+сохранённые ответы идемпотентных запросов: идентификаторы переговорок
+начинаются заново и в старых ответах указывали бы на другие строки.
+Счётчик ленты изменений в той же транзакции увеличивается, поэтому
+ETag списка и снимки каталога в процессах приложения устаревают,
+а подписчики ленты получают resync.
+
+Бронирования приходятся на рабочие дни с 8 до 20 часов, начинаются
+на границе 15 минут и длятся от 30 минут до 2 часов. Загруженность
+переговорок различается: небольшая часть занята почти весь день,
+большинство - несколько часов.
+
+Большая часть времени загрузки уходит на построение GiST индекса
+ограничения ``ex_reservation_overlap`` после COPY.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.base import Base
+from app.core.config import settings
+from app.meeting_room.crud import meeting_room_feed
+
+ROOM_COLUMNS = ("id", "name", "description", "is_active", "created")
+RESERVATION_COLUMNS = (
+    "meetingroom_id",
+    "from_reserve",
+    "to_reserve",
+    "owner",
+    "is_active",
+    "created",
+)
+
+# Длительности бронирований в минутах и их веса.
+DURATIONS = (30, 60, 90, 120)
+DURATION_WEIGHTS = (4, 8, 2, 3)
+
+DAY_START_HOUR = 8
+DAY_END_HOUR = 20
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = (DAY_END_HOUR - DAY_START_HOUR) * 60 // SLOT_MINUTES
+
+# Вероятности бронирования в выходной и отмены бронирования.
+WEEKEND_BOOKING_CHANCE = 0.05
+CANCEL_CHANCE = 0.05
+OWNERS = 5000
+
+# Размер пачки строк, передаваемой в один COPY.
+COPY_CHUNK = 100_000
+
+# Первый день расписания по умолчанию - понедельник, одинаковый при
+# любой дате запуска, чтобы наборы с одним seed совпадали.
+DEFAULT_START = date(2024, 1, 1)
+
+
+def room_rng(seed: int, room_id: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + room_id)
+
+
+def generate_rooms(rooms: int, seed: int, start: date) -> Iterator[tuple]:
+    """Строки переговорок с идентификаторами от 1 до rooms."""
+    created = datetime.combine(start, datetime.min.time()) - timedelta(days=365)
+    for room_id in range(1, rooms + 1):
+        rng = room_rng(seed, -room_id)
+        yield (
+            room_id,
+            f"Переговорка {room_id}",
+            f"Этаж {rng.randint(1, 30)}, мест {rng.choice((4, 6, 8, 12, 20))}",
+            rng.random() > 0.03,
+            created + timedelta(seconds=rng.randrange(365 * 86400)),
+        )
+
+
+def generate_reservations(
+    room_id: int,
+    seed: int,
+    start: date,
+    days: int,
+) -> Iterator[tuple]:
+    """Строки бронирований одной переговорки.
+
+    Бронирования одной переговорки не пересекаются: расписание дня
+    заполняется последовательно, и следующая бронь начинается не
+    раньше окончания предыдущей.
+    """
+    rng = room_rng(seed, room_id)
+    # Доля свободных слотов, с которых начинается бронирование.
+    popularity = rng.betavariate(1.5, 6)
+    day_start = datetime.combine(start, datetime.min.time()) + timedelta(
+        hours=DAY_START_HOUR
+    )
+    for day in range(days):
+        current = day_start + timedelta(days=day)
+        if current.weekday() >= 5 and rng.random() > WEEKEND_BOOKING_CHANCE:
+            continue
+        slot = 0
+        while slot < SLOTS_PER_DAY:
+            if rng.random() >= popularity:
+                slot += 1
+                continue
+            duration = rng.choices(DURATIONS, DURATION_WEIGHTS)[0]
+            length = min(duration // SLOT_MINUTES, SLOTS_PER_DAY - slot)
+            from_reserve = current + timedelta(minutes=slot * SLOT_MINUTES)
+            to_reserve = from_reserve + timedelta(minutes=length * SLOT_MINUTES)
+            yield (
+                room_id,
+                from_reserve,
+                to_reserve,
+                f"employee{rng.randrange(OWNERS)}",
+                rng.random() > CANCEL_CHANCE,
+                from_reserve - timedelta(hours=rng.randint(1, 24 * 14)),
+            )
+            slot += length
+
+
+def chunks(rows: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Все строки заменены: номер события сдвигается, как после записи,
+# а слушатели ленты получают resync вместо отдельных событий.
+BUMP_CHANGES = """
+WITH counter AS (
+    INSERT INTO changecounter (name, value, created)
+    VALUES ($1, 1, now() AT TIME ZONE 'utc')
+    ON CONFLICT (name) DO UPDATE
+    SET value = changecounter.value + 1, updated = excluded.created
+    RETURNING value
+)
+SELECT pg_notify(
+    $1, json_build_object('kind', 'resync', 'id', null, 'seq', value)::text
+)
+FROM counter
+"""
+
+
+async def reset(conn: AsyncConnection) -> None:
+    """Очистить таблицы и сбросить последовательности идентификаторов.
+
+    Счётчик ленты изменений переговорок увеличивается в той же
+    транзакции.
+    """
+    driver = (await conn.get_raw_connection()).driver_connection
+    await driver.execute(
+        "TRUNCATE reservation, meetingroom, idempotencykey "
+        "RESTART IDENTITY CASCADE"
+    )
+    await driver.execute(BUMP_CHANGES, meeting_room_feed.channel)
+
+
+async def copy_rows(
+    conn: AsyncConnection,
+    table: str,
+    columns: tuple[str, ...],
+    rows: Iterator[tuple],
+) -> int:
+    driver = (await conn.get_raw_connection()).driver_connection
+    total = 0
+    for chunk in chunks(rows, COPY_CHUNK):
+        await driver.copy_records_to_table(table, records=chunk, columns=columns)
+        total += len(chunk)
+    return total
+
+
+# Внешние ключи и ограничения исключения проверяются на каждую строку
+# COPY, поэтому на время загрузки они снимаются и создаются заново
+# одной проверкой по всей таблице.
+DEFERRED_CONSTRAINTS = """
+SELECT conname, pg_get_constraintdef(oid)
+FROM pg_constraint
+WHERE conrelid = 'reservation'::regclass AND contype IN ('f', 'x')
+"""
+
+
+async def load(
+    conn: AsyncConnection,
+    rooms: int,
+    days: int,
+    seed: int,
+    start: date,
+    scheduled_rooms: int | None = None,
+) -> tuple[int, int]:
+    """Заново заполнить таблицы переговорок и бронирований.
+
+    Args:
+        conn (AsyncConnection): Соединение с базой данных.
+        rooms (int): Количество переговорок.
+        days (int): Количество дней расписания начиная со start.
+        seed (int): Начальное значение генератора.
+        start (date): Первый день расписания.
+        scheduled_rooms (None or int): Сколько первых переговорок
+            получают расписание, по умолчанию все.
+
+    Returns:
+        tuple[int, int]: Количество загруженных переговорок и бронирований.
+    """
+    await conn.run_sync(Base.metadata.create_all)
+    await reset(conn)
+    room_count = await copy_rows(
+        conn, "meetingroom", ROOM_COLUMNS, generate_rooms(rooms, seed, start)
+    )
+    reservations = (
+        row
+        for room_id in range(1, min(rooms, scheduled_rooms or rooms) + 1)
+        for row in generate_reservations(room_id, seed, start, days)
+    )
+    driver = (await conn.get_raw_connection()).driver_connection
+    constraints = await driver.fetch(DEFERRED_CONSTRAINTS)
+    for name, _ in constraints:
+        await driver.execute(f'ALTER TABLE reservation DROP CONSTRAINT "{name}"')
+    reservation_count = await copy_rows(
+        conn, "reservation", RESERVATION_COLUMNS, reservations
+    )
+    for name, definition in constraints:
+        await driver.execute(
+            f'ALTER TABLE reservation ADD CONSTRAINT "{name}" {definition}'
+        )
+    # Идентификаторы переговорок заданы явно, последовательность
+    # продолжается после них.
+    await driver.execute(
+        "SELECT setval(pg_get_serial_sequence('meetingroom', 'id'), "
+        "GREATEST((SELECT max(id) FROM meetingroom), 1))"
+    )
+    await driver.execute("ANALYZE meetingroom, reservation")
+    return room_count, reservation_count
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as conn:
+            if args.command == "reset":
+                await reset(conn)
+                print("reset", file=sys.stderr)
+            else:
+                rooms, reservations = await load(
+                    conn,
+                    args.rooms,
+                    args.days,
+                    args.seed,
+                    args.start,
+                    args.scheduled_rooms,
+                )
+                print(
+                    f"rooms={rooms} reservations={reservations}",
+                    file=sys.stderr,
+                )
+    finally:
+        await engine.dispose()
+    print(f"done in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("load", "reset"))
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scheduled-rooms",
+        type=int,
+        help="Сколько первых переговорок получают расписание, по умолчанию все.",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=DEFAULT_START,
+        help=f"Первый день расписания, по умолчанию {DEFAULT_START}.",
+    )
+    parser.add_argument("--database-url", default=settings.database_url_test)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
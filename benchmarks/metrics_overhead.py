@@ -0,0 +1,89 @@
+"""Накладные расходы сбора метрик на один запрос.
+
+Запуск::
+
+    python -m benchmarks.metrics_overhead --requests 5000
+
+Бенчмарк не обращается к базе данных: он сравнивает пустой эндпоинт
+без промежуточного слоя метрик и с ним, а также замеряет запись
+одного наблюдения в гистограмму.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware, RequestMetrics
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware, metrics=RequestMetrics())
+    return app
+
+
+async def measure_requests(apps: list[FastAPI], requests: int) -> list[list[float]]:
+    """Замерить запросы к приложениям поочерёдно.
+
+    Запросы к приложениям чередуются, чтобы прогрев и фоновая нагрузка
+    одинаково сказывались на всех замерах.
+    """
+    clients = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+        for app in apps
+    ]
+    timings = [[] for _ in apps]
+    try:
+        for number in range(requests):
+            for client, app_timings in zip(clients, timings):
+                started = time.perf_counter()
+                await client.get(f"/items/{number}")
+                app_timings.append((time.perf_counter() - started) * 10**6)
+    finally:
+        for client in clients:
+            await client.aclose()
+    return timings
+
+
+def measure_observe(observations: int) -> float:
+    metrics = RequestMetrics()
+    started = time.perf_counter()
+    for number in range(observations):
+        metrics.observe("GET", "/items/{item_id}", "get_item", 200, number * 1e-6)
+    return (time.perf_counter() - started) / observations * 10**9
+
+
+async def run(args: argparse.Namespace) -> None:
+    apps = [make_app(False), make_app(True)]
+    # Прогрев, чтобы первые запросы не искажали замер.
+    await measure_requests(apps, args.requests // 10)
+    plain, instrumented = await measure_requests(apps, args.requests)
+    plain_median = statistics.median(plain)
+    instrumented_median = statistics.median(instrumented)
+
+    print(f"requests={args.requests}")
+    print(f"{'without metrics':<24} median {plain_median:9.1f} us")
+    print(f"{'with metrics':<24} median {instrumented_median:9.1f} us")
+    print(f"{'overhead':<24} median {instrumented_median - plain_median:9.1f} us")
+    print(f"{'observe()':<24} mean   {measure_observe(args.requests * 10):9.1f} ns")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Поиск переговорок по поисковому вектору и сравнение с ILIKE.
+
+Запуск::
+
+    python -m benchmarks.search --rooms 100000
+
+Каталог заполняется генератором ``benchmarks.dataset`` в базе
+``DATABASE_URL_TEST`` (или переданной через ``--database-url``),
+таблицы удаляются после замеров.
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.base import Base
+from app.core.config import settings
+from app.meeting_room.crud import meeting_room_crud
+from app.meeting_room.models import MeetingRoom
+from benchmarks.availability import measure, report
+from benchmarks.dataset import DEFAULT_START, load
+
+# Запросы от редкого к частому: одно название, этаж, общее слово.
+QUERIES = ("Переговорка 4242", "этаж 7 мест 12", "перег")
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await load(conn, args.rooms, 0, args.seed, DEFAULT_START)
+
+    columns = [MeetingRoom.name, MeetingRoom.description, MeetingRoom.id]
+    try:
+        async with session_factory() as session:
+            print(f"rooms={args.rooms} limit={args.limit}")
+            for query_text in QUERIES:
+                page = await meeting_room_crud.search(
+                    session, query_text, columns, limit=args.limit
+                )
+
+                async def search():
+                    await meeting_room_crud.search(
+                        session, query_text, columns, limit=args.limit
+                    )
+
+                patterns = [f"%{word}%" for word in query_text.split()]
+
+                async def ilike():
+                    await session.execute(
+                        select(*columns)
+                        .where(
+                            MeetingRoom.is_active.is_(True),
+                            *(
+                                MeetingRoom.name.ilike(pattern)
+                                | MeetingRoom.description.ilike(pattern)
+                                for pattern in patterns
+                            ),
+                        )
+                        .order_by(MeetingRoom.id)
+                        .limit(args.limit)
+                    )
+
+                print(f"\n{query_text!r}: {len(page.items)} on first page")
+                report("search vector", await measure(args.repeat, search))
+                report("ilike scan", await measure(args.repeat, ilike))
+
+            if args.explain:
+                query = (
+                    "EXPLAIN (ANALYZE, FORMAT JSON) SELECT id FROM meetingroom "
+                    "WHERE is_active AND search_vector @@ "
+                    "to_tsquery('russian', 'переговорка:* & 4242:*')"
+                )
+                plan = (await session.execute(text(query))).scalar()
+                print(json.dumps(plan, indent=2))
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--database-url", default=settings.database_url_test)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
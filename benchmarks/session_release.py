@@ -0,0 +1,194 @@
+"""Пропускная способность при фиксированном пуле соединений.
+
+Запуск::
+
+    python -m benchmarks.session_release --pool-size 2 --page 200 \\
+        --concurrency 1,2,4,8,16,32
+
+Один и тот же эндпоинт - страница переговорок из базы, сериализуемая
+по response_model, - замеряется с обычным маршрутом FastAPI, который
+держит сессию до конца сериализации, и с SessionReleasingRoute, который
+закрывает её сразу после эндпоинта. Для каждого уровня параллельности
+печатаются пропускная способность, p99, среднее время, которое запрос
+держит соединение, и среднее ожидание соединения. Наибольшая
+устойчивая пропускная способность - лучшая среди уровней, на которых
+p99 не превышает ``--slo-ms`` и нет таймаутов пула.
+
+Сериализация идёт в том же цикле событий и не уступает управление,
+поэтому в одном процессе, упирающемся в процессор, пропускная
+способность обоих маршрутов совпадает в пределах шума: раньше
+освобождённое соединение всё равно некому взять, пока ответ
+сериализуется. Сокращается время удержания соединения (hold) - на время
+сериализации при невысокой нагрузке. Это время соединение простаивает
+в открытой транзакции на сервере, и его сокращение даёт пропускную
+способность, когда соединения общие для нескольких процессов,
+например через pgbouncer.
+
+Каталог создаётся в базе ``DATABASE_URL_TEST`` (или переданной через
+``--database-url``) и удаляется после замеров.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, status
+from fastapi.routing import APIRoute
+from sqlalchemy import event, exc, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.base import Base
+from app.core.config import settings
+from app.core.pool import InstrumentedAsyncAdaptedQueuePool, get_pool_stats
+from app.core.routing import SessionReleasingRoute
+from app.meeting_room.models import MeetingRoom
+from app.meeting_room.schemas import MeetingRoomResponse
+from benchmarks.api import fill_catalog, parse_ints, percentile, run_scenario
+
+ROUTES = {"APIRoute": APIRoute, "SessionReleasingRoute": SessionReleasingRoute}
+
+
+def make_app(
+    session_factory: async_sessionmaker,
+    route_class: type[APIRoute],
+    page: int,
+) -> FastAPI:
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/rooms", response_model=list[MeetingRoomResponse])
+    async def get_rooms(
+        session: AsyncSession = Depends(get_session),
+    ) -> list[MeetingRoom]:
+        rooms = await session.execute(
+            select(MeetingRoom).order_by(MeetingRoom.id).limit(page)
+        )
+        return rooms.scalars().all()
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+class HoldTimer:
+    """Среднее время между выдачей соединения и его возвратом в пул."""
+
+    def __init__(self, engine) -> None:
+        self.total = 0.0
+        self.count = 0
+        event.listen(engine.sync_engine, "checkout", self.on_checkout)
+        event.listen(engine.sync_engine, "checkin", self.on_checkin)
+
+    def on_checkout(self, dbapi_connection, record, proxy) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+
+    def on_checkin(self, dbapi_connection, record) -> None:
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            self.total += time.perf_counter() - started
+            self.count += 1
+
+    def reset(self) -> None:
+        self.total = 0.0
+        self.count = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total / self.count * 1000 if self.count else 0.0
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        args.database_url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    hold = HoldTimer(engine)
+
+    async def get_rooms(client, number):
+        try:
+            return await client.get("/rooms")
+        except exc.TimeoutError:
+            return httpx.Response(status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    print(
+        f"pool_size={args.pool_size} page={args.page} "
+        f"requests={args.requests} slo_p99={args.slo_ms} ms"
+    )
+    clients = {
+        name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(
+                app=make_app(session_factory, route_class, args.page)
+            ),
+            base_url="http://test",
+        )
+        for name, route_class in ROUTES.items()
+    }
+    best = dict.fromkeys(ROUTES, 0.0)
+    try:
+        await fill_catalog(engine, max(args.page, 1))
+        for concurrency in args.concurrency:
+            # Маршруты чередуются на каждом уровне, чтобы фоновая нагрузка
+            # одинаково сказывалась на обоих замерах.
+            for name, client in clients.items():
+                # Прогрев, чтобы замер не включал открытие соединений.
+                await run_scenario(
+                    client, get_rooms, status.HTTP_200_OK,
+                    concurrency, concurrency,
+                )
+                hold.reset()
+                before = get_pool_stats(engine)
+                timings, errors, elapsed = await run_scenario(
+                    client, get_rooms, status.HTTP_200_OK,
+                    args.requests, concurrency,
+                )
+                after = get_pool_stats(engine)
+                checkouts = after.checkouts - before.checkouts
+                wait_ms = (
+                    (after.wait_total_ms - before.wait_total_ms) / checkouts
+                    if checkouts
+                    else 0.0
+                )
+                rps = args.requests / elapsed
+                p99 = percentile(timings, 99)
+                sustainable = not errors and p99 <= args.slo_ms
+                if sustainable:
+                    best[name] = max(best[name], rps)
+                print(
+                    f"{name:<22} c={concurrency:<4} {rps:9.1f} rps   "
+                    f"p99 {p99:8.2f} ms   hold {hold.mean_ms:6.2f} ms   "
+                    f"wait {wait_ms:7.2f} ms   errors {errors}"
+                    f"{'' if sustainable else '   over SLO'}"
+                )
+        for name, rps in best.items():
+            print(f"{name:<22} max sustainable {rps:9.1f} rps")
+    finally:
+        for client in clients.values():
+            await client.aclose()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=5)
+    parser.add_argument("--page", type=int, default=200)
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--slo-ms", type=float, default=100)
+    parser.add_argument("--database-url", default=settings.database_url_test)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
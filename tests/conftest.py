@@ -1,12 +1,21 @@
 import asyncio
+import os
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.core.config import settings
+# Превышение бюджета SQL-запросов в тестах - ошибка, а не предупреждение.
+os.environ["SQL_BUDGET_STRICT"] = "true"
+# Лента изменений без LISTEN/NOTIFY, события доставляются в процессе.
+os.environ["CHANGE_FEED_BACKEND"] = "local"
+
+from app.core.config import settings  # noqa: E402
 
 try:
     from app.main import app
@@ -17,29 +26,56 @@ except (NameError, ImportError):
     )
 
 try:
-    from app.core.db import Base, get_async_session
+    from app.core.db import SAFE_METHODS, Base, get_async_session
 except (NameError, ImportError):
     raise AssertionError(
         "Не обнаружены объекты `Base, get_async_session`. "
         "Проверьте и поправьте: они должны быть доступны в модуле `app.core.db`.",
     )
 
+from app.core.profiling import instrument_engine  # noqa: E402
+from app.idempotency.store import idempotency_store  # noqa: E402
+
 SQLALCHEMY_DATABASE_URL = settings.database_url_test
 engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+instrument_engine(engine)
 TestingSessionLocal = async_sessionmaker(
     class_=AsyncSession,
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
 )
 
 
-async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
+@contextmanager
+def capture_statements():
+    """Собрать SQL-запросы, выполненные тестовым движком."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+async def override_get_async_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
     async with TestingSessionLocal() as override_async_session:
+        if request.method not in SAFE_METHODS:
+            # Как в get_async_session: проверки перед записью идут мимо кэша.
+            override_async_session.info["primary"] = True
         yield override_async_session
 
 
 app.dependency_overrides[get_async_session] = override_get_async_session
+# Ответы на запросы с ключом идемпотентности хранятся в тестовой базе.
+idempotency_store.session_factory = TestingSessionLocal
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.reservation.availability import RoomSchedule
+
+AVAILABLE_URL = "/api/v1/meeting_rooms/available"
+
+
+def test_room_schedule_is_free():
+    """Тест проверки занятости по отсортированному индексу."""
+    schedule = RoomSchedule()
+    schedule.add(1, datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 13))
+    schedule.add(2, datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11))
+
+    assert schedule.is_free(datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 12))
+    assert not schedule.is_free(
+        datetime(2030, 1, 1, 10, 30), datetime(2030, 1, 1, 12, 30)
+    )
+    assert schedule.free_slots(
+        datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 14)
+    ) == [
+        (datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 10)),
+        (datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 12)),
+        (datetime(2030, 1, 1, 13), datetime(2030, 1, 1, 14)),
+    ]
+
+    schedule.remove(2, datetime(2030, 1, 1, 10))
+    assert schedule.is_free(datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11))
+
+
+def test_get_available_meeting_rooms(client: TestClient):
+    """Тест GET запроса на получение свободных переговорок.
+
+    Занятая переговорка не должна попадать в список, после отмены
+    бронирования она должна снова стать свободной.
+    """
+    busy_room = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Занятая переговорка"}
+    ).json()
+    free_room = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Свободная переговорка"}
+    ).json()
+    reservation = client.post(
+        "/api/v1/reservations/",
+        json={
+            "meetingroom_id": busy_room["id"],
+            "from_reserve": "2030-02-01T10:00",
+            "to_reserve": "2030-02-01T11:00",
+            "owner": "Сидоров",
+        },
+    ).json()
+    params = {
+        "from_reserve": "2030-02-01T10:30",
+        "to_reserve": "2030-02-01T10:45",
+    }
+
+    response = client.get(AVAILABLE_URL, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    room_ids = {room["id"] for room in response.json()}
+    assert free_room["id"] in room_ids
+    assert busy_room["id"] not in room_ids
+
+    # Начало в часовом поясе и окончание без него - то же время в UTC.
+    response = client.get(
+        AVAILABLE_URL,
+        params={
+            "from_reserve": "2030-02-01T13:30+03:00",
+            "to_reserve": "2030-02-01T10:45",
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert busy_room["id"] not in {room["id"] for room in response.json()}
+
+    client.delete(f"/api/v1/reservations/{reservation['id']}")
+    response = client.get(AVAILABLE_URL, params=params)
+    assert busy_room["id"] in {room["id"] for room in response.json()}
+
+
+def test_get_available_meeting_rooms_in_past(client: TestClient):
+    """Тест GET запроса на интервал раньше горизонта индекса.
+
+    Такой запрос обслуживается базой данных и тоже должен работать.
+    """
+    response = client.get(
+        AVAILABLE_URL,
+        params={
+            "from_reserve": "2020-01-01T10:00",
+            "to_reserve": "2020-01-01T11:00",
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(response.json(), list)
+
+
+def test_get_available_meeting_rooms_with_invalid_interval(
+    client: TestClient,
+):
+    """Тест GET запроса с началом интервала позже окончания.
+
+    Эндпоинт должен вернуть ошибку 422.
+    """
+    response = client.get(
+        AVAILABLE_URL,
+        params={
+            "from_reserve": "2030-01-01T11:00",
+            "to_reserve": "2030-01-01T10:00",
+        },
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
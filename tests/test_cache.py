@@ -0,0 +1,294 @@
+import asyncio
+
+import httpx
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.cache import LRUCache
+from app.core.feed import ChangeBroker, ChangeFeed
+from app.core.singleflight import SingleFlight
+from app.main import app
+from app.meeting_room.crud import CRUDMeetingRoom, meeting_room_crud
+from app.meeting_room.models import MeetingRoom
+from app.meeting_room.schemas import MeetingRoomCreate, MeetingRoomUpdate
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_crud import count_queries
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_lru_cache_evicts_and_expires():
+    """Тест вытеснения записей кэша по размеру и по TTL."""
+    clock = FakeClock()
+    cache = LRUCache(max_size=2, ttl=10, clock=clock)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.get("a") == 1
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+
+    clock.now = 11
+    assert await cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert (stats.evictions, stats.expirations) == (1, 1)
+
+
+async def test_get_by_id_is_cached_and_invalidated():
+    """Тест кэширования чтения по id и сброса кэша при записи.
+
+    Повторное чтение не должно обращаться к базе, а обновление
+    должно быть видно при следующем чтении.
+    """
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Кэшируемая переговорка"), session
+        )
+    async with TestingSessionLocal() as session:
+        await meeting_room_crud.get_by_id(room.id, session)
+
+    async with TestingSessionLocal() as session:
+        with count_queries() as counter:
+            cached = await meeting_room_crud.get_by_id(room.id, session)
+        assert counter.statements == 0
+        assert cached.name == "Кэшируемая переговорка"
+
+        await meeting_room_crud.update(
+            cached,
+            MeetingRoomUpdate(name="Переименованная переговорка"),
+            session,
+        )
+
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.get_by_id(room.id, session)
+        assert room.name == "Переименованная переговорка"
+        assert (
+            await meeting_room_crud.get_room_by_name(
+                "Кэшируемая переговорка", session
+            )
+            is None
+        )
+
+
+async def test_get_room_by_name_survives_bulk_rename():
+    """Тест кэша по названию после пакетного переименования.
+
+    Пакетное обновление не знает прежних названий, поэтому запись
+    по старому названию должна отбрасываться при проверке.
+    """
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Переговорка до пакета"), session
+        )
+        await meeting_room_crud.get_room_by_name("Переговорка до пакета", session)
+        await meeting_room_crud.bulk_update(
+            [(room.id, MeetingRoomUpdate(name="Переговорка после пакета"))],
+            session,
+        )
+
+    async with TestingSessionLocal() as session:
+        assert (
+            await meeting_room_crud.get_room_by_name(
+                "Переговорка до пакета", session
+            )
+            is None
+        )
+
+
+class SlowSetCache(LRUCache):
+    """Кэш, в котором сохранение ждёт разрешения."""
+
+    def __init__(self) -> None:
+        super().__init__(max_size=10, ttl=60)
+        self.gate = asyncio.Event()
+
+    async def set(self, key, value, generation=None) -> None:
+        await self.gate.wait()
+        await super().set(key, value, generation)
+
+
+async def test_lru_cache_skips_set_after_delete():
+    """Тест сохранения значения, прочитанного до удаления.
+
+    Значение с поколением, предшествующим удалению, не сохраняется.
+    """
+    cache = LRUCache(max_size=2, ttl=10)
+    generation = await cache.generation()
+    await cache.delete("a")
+    await cache.set("a", 1, generation)
+    assert await cache.get("a") is None
+
+    await cache.set("a", 2, await cache.generation())
+    assert await cache.get("a") == 2
+
+
+async def test_get_by_id_does_not_cache_row_read_before_write():
+    """Тест чтения, которое завершилось после записи.
+
+    Строка, прочитанная до фиксации записи, не должна остаться в кэше
+    после того, как запись сбросила кэш.
+    """
+    slow_cache = SlowSetCache()
+    crud = CRUDMeetingRoom(MeetingRoom, cache=slow_cache, flights=SingleFlight())
+    async with TestingSessionLocal() as session:
+        room = await crud.create(
+            MeetingRoomCreate(name="Переговорка гонки кэша"), session
+        )
+
+    async with TestingSessionLocal() as reader:
+        read = asyncio.create_task(crud.get_by_id(room.id, reader))
+        while not reader.in_transaction():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        async with TestingSessionLocal() as writer:
+            await crud.remove(await writer.get(MeetingRoom, room.id), writer)
+        slow_cache.gate.set()
+        assert (await read).is_active
+
+    async with TestingSessionLocal() as session:
+        assert not (await crud.get_by_id(room.id, session)).is_active
+
+
+async def test_primary_session_skips_cache():
+    """Тест чтения в сессии, закреплённой за основной базой.
+
+    Проверки перед записью должны читать объект из базы, а не из кэша
+    процесса, который не знает о записях других процессов.
+    """
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Переговорка проверки записи"), session
+        )
+        await meeting_room_crud.get_by_id(room.id, session)
+        await meeting_room_crud.get_room_by_name(room.name, session)
+
+    async with TestingSessionLocal() as session:
+        session.info["primary"] = True
+        with count_queries() as counter:
+            await meeting_room_crud.get_by_id(room.id, session)
+            await meeting_room_crud.get_room_by_name(room.name, session)
+        assert counter.statements == 2
+
+
+async def test_write_checks_room_deactivated_behind_cache():
+    """Тест записи в переговорку, удалённую мимо кэша процесса.
+
+    Пока событие об удалении не дошло до процесса, чтение отдаёт
+    переговорку из кэша, но PATCH и DELETE должны проверять её
+    по базе и отвечать 404.
+    """
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        room = await client.post(
+            "/api/v1/meeting_rooms/",
+            json={"name": "Переговорка, удалённая мимо кэша"},
+        )
+        room_url = f"/api/v1/meeting_rooms/{room.json()['id']}"
+        assert (await client.get(room_url)).status_code == status.HTTP_200_OK
+
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                text("UPDATE meetingroom SET is_active = false WHERE id = :id"),
+                {"id": room.json()["id"]},
+            )
+            await session.commit()
+        assert (await client.get(room_url)).status_code == status.HTTP_200_OK
+
+        response = await client.patch(room_url, json={"description": "Новое"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = await client.delete(room_url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def wait_evicted(cache: LRUCache, key) -> None:
+    async def evicted() -> None:
+        while await cache.get(key) is not None:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(evicted(), 5)
+
+
+async def test_write_of_other_process_evicts_cache():
+    """Тест удаления из кэша записи, сделанной другим процессом.
+
+    Процессы с отдельными кэшами связаны только лентой изменений
+    через LISTEN/NOTIFY. Запись второго процесса должна удалить
+    переговорку из кэша первого, а строка, прочитанная из отстающей
+    реплики после события, должна удаляться повторно через заданное
+    отставание.
+    """
+
+    def process() -> CRUDMeetingRoom:
+        feed = ChangeFeed(
+            "test_cache_changes",
+            backend="postgres",
+            broker=ChangeBroker(buffer_size=10, queue_size=10),
+        )
+        return CRUDMeetingRoom(
+            MeetingRoom,
+            cache=LRUCache(max_size=10, ttl=60),
+            feed=feed,
+            flights=SingleFlight(),
+        )
+
+    reader, writer = process(), process()
+    async with TestingSessionLocal() as session:
+        room = await writer.create(
+            MeetingRoomCreate(name="Переговорка другого процесса"), session
+        )
+    key = reader._cache_key("id", room.id)
+
+    async with reader.feed.listening(engine), reader.invalidating(0.2):
+        while not reader.feed.live:
+            await asyncio.sleep(0.01)
+        # Событие resync после подключения очищает кэш.
+        await asyncio.sleep(0.1)
+        async with TestingSessionLocal() as session:
+            await reader.get_room_by_name(room.name, session)
+            stale = await reader.cache.get(key)
+            assert stale["name"] == "Переговорка другого процесса"
+
+        async with TestingSessionLocal() as session:
+            await writer.update(
+                await session.get(MeetingRoom, room.id),
+                MeetingRoomUpdate(name="Переименована другим процессом"),
+                session,
+            )
+        await wait_evicted(reader.cache, key)
+
+        async with TestingSessionLocal() as session:
+            assert (
+                await reader.get_by_id(room.id, session)
+            ).name == "Переименована другим процессом"
+            assert (
+                await reader.get_room_by_name(
+                    "Переговорка другого процесса", session
+                )
+                is None
+            )
+
+        # Чтение из отстающей реплики вернуло строку до записи.
+        await reader.cache.set(key, stale)
+        await wait_evicted(reader.cache, key)
+
+
+def test_get_cache_stats(client: TestClient):
+    """Тест GET запроса на получение счётчиков кэша."""
+    response = client.get("/api/v1/internal/cache")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()) == {
+        "hits",
+        "misses",
+        "evictions",
+        "expirations",
+        "size",
+    }
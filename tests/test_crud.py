@@ -0,0 +1,134 @@
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import event
+
+from app.meeting_room.crud import meeting_room_crud, meeting_room_feed
+from app.meeting_room.schemas import MeetingRoomCreate, MeetingRoomUpdate
+from tests.conftest import TestingSessionLocal, engine
+
+
+@dataclass
+class QueryCounter:
+    statements: int = 0
+    commits: int = 0
+
+
+@contextmanager
+def count_queries():
+    """Посчитать запросы и фиксации транзакций тестового движка."""
+    counter = QueryCounter()
+
+    def on_execute(*args):
+        counter.statements += 1
+
+    def on_commit(*args):
+        counter.commits += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+        event.remove(engine.sync_engine, "commit", on_commit)
+
+
+@pytest.mark.parametrize("backend", ["local", "postgres"])
+async def test_write_methods_make_one_statement(
+    backend: str,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Тест количества запросов методов записи CRUDBase.
+
+    Каждый метод записи должен выполнять один запрос с RETURNING
+    и фиксацию транзакции, без перечитывания объекта. Счётчик ленты
+    изменений и уведомления входят в тот же запрос.
+    """
+    monkeypatch.setattr(meeting_room_feed, "backend", backend)
+    async with TestingSessionLocal() as session:
+        with count_queries() as counter:
+            room = await meeting_room_crud.create(
+                MeetingRoomCreate(name=f"Переговорка для подсчёта запросов {backend}"),
+                session,
+            )
+            assert room.id is not None and room.created is not None
+        assert (counter.statements, counter.commits) == (1, 1)
+
+        with count_queries() as counter:
+            room = await meeting_room_crud.update(
+                room, MeetingRoomUpdate(description="Описание"), session
+            )
+            assert room.description == "Описание"
+            assert room.updated is not None
+        assert (counter.statements, counter.commits) == (1, 1)
+
+        with count_queries() as counter:
+            room = await meeting_room_crud.remove(room, session)
+            assert room.is_active is False
+        assert (counter.statements, counter.commits) == (1, 1)
+
+        with count_queries() as counter:
+            room = await meeting_room_crud.restore(
+                room, MeetingRoomUpdate(), session
+            )
+            assert room.is_active is True
+        assert (counter.statements, counter.commits) == (1, 1)
+
+
+async def test_create_or_restore_is_atomic():
+    """Тест конкурентного создания переговорок с одним именем.
+
+    Одна из транзакций должна создать переговорку одним запросом,
+    вторая - получить None без ошибки уникальности.
+    """
+    room_in = MeetingRoomCreate(name="Переговорка для гонки")
+
+    async def create():
+        async with TestingSessionLocal() as session:
+            return await meeting_room_crud.create_or_restore(room_in, session)
+
+    with count_queries() as counter:
+        results = await asyncio.gather(create(), create())
+    assert sorted(result is None for result in results) == [False, True]
+    assert counter.statements == 2
+
+
+async def test_get_many_reuses_cache():
+    """Тест пакетного чтения переговорок по id и названиям.
+
+    Промахи кэша должны читаться одним запросом, а повторное чтение
+    тех же переговорок - обходиться без запросов.
+    """
+    async with TestingSessionLocal() as session:
+        rooms = await meeting_room_crud.bulk_create(
+            [MeetingRoomCreate(name=f"Пакетное чтение {n}") for n in range(3)],
+            session,
+        )
+        await meeting_room_crud.cache.clear()
+        ids = [room.id for room in rooms]
+        names = [room.name for room in rooms]
+
+        with count_queries() as counter:
+            found = await meeting_room_crud.get_many([*ids, -1, ids[0]], session)
+        assert list(found) == ids
+        assert counter.statements == 1
+
+        with count_queries() as counter:
+            found = await meeting_room_crud.get_many(ids, session)
+            assert list(found) == ids
+        assert counter.statements == 0
+
+        with count_queries() as counter:
+            found = await meeting_room_crud.get_many_by_name(
+                [*names, "Нет такой"], session
+            )
+        assert list(found) == names
+        assert counter.statements == 1
+
+        with count_queries() as counter:
+            found = await meeting_room_crud.get_many_by_name(names, session)
+            assert [room.id for room in found.values()] == ids
+        assert counter.statements == 0
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.db import fresh_timestamp
+from app.core.feed import RESYNC, ChangeBroker
+from app.idempotency.models import IdempotencyKey
+from app.meeting_room.crud import meeting_room_crud, meeting_room_feed
+from benchmarks.dataset import load
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+# Набор данных загружается в отдельную схему, чтобы не затирать
+# таблицы остальных тестов.
+SCHEMA = "dataset"
+
+
+@pytest.fixture
+async def dataset_engine():
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def test_reload_invalidates_versions_and_stored_responses(
+    dataset_engine,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Тест повторной загрузки набора данных.
+
+    Перезагрузка должна увеличить версию каталога, отправить слушателям
+    ленты resync и удалить сохранённые ответы идемпотентных запросов:
+    идентификаторы переговорок начинаются заново.
+    """
+    session_factory = async_sessionmaker(dataset_engine, class_=AsyncSession)
+    async with dataset_engine.begin() as conn:
+        await load(conn, 10, 1, 0, date(2024, 1, 1))
+    async with session_factory() as session:
+        version = await meeting_room_crud.get_version(session)
+        await session.execute(
+            insert(IdempotencyKey).values(
+                key="before-reload",
+                fingerprint="a" * 64,
+                expires_at=fresh_timestamp(),
+            )
+        )
+        await session.commit()
+
+    broker = ChangeBroker(buffer_size=10, queue_size=10)
+    monkeypatch.setattr(meeting_room_feed, "broker", broker)
+    async with dataset_engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.add_listener(
+            meeting_room_feed.channel, meeting_room_feed._on_notify
+        )
+        subscription = broker.subscribe()
+        async with dataset_engine.begin() as load_conn:
+            await load(load_conn, 10, 1, 0, date(2024, 1, 1))
+        # Уведомление приходит слушателю, пока соединение читает ответ.
+        await conn.execute(text("SELECT 1"))
+        assert (await asyncio.wait_for(subscription.get(), 5)).kind == RESYNC
+
+    async with session_factory() as session:
+        assert await meeting_room_crud.get_version(session) == version + 1
+        assert broker.head == version + 1
+        assert await session.scalar(select(func.count(IdempotencyKey.id))) == 0
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+MEETING_ROOMS_URL = "/api/v1/meeting_rooms/"
+
+
+def test_get_meeting_room_not_modified(client: TestClient):
+    """Тест условного GET запроса переговорки по If-None-Match.
+
+    При актуальном ETag эндпоинт должен вернуть 304 без тела,
+    после изменения переговорки - 200 с новым ETag.
+    """
+    room = client.post(
+        MEETING_ROOMS_URL, json={"name": "Переговорка с ETag"}
+    ).json()
+    url = f"{MEETING_ROOMS_URL}{room['id']}"
+    etag = client.get(url).headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.patch(url, json={"description": "Новое описание"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_get_all_meeting_rooms_not_modified(client: TestClient):
+    """Тест условного GET запроса списка переговорок по If-None-Match.
+
+    ETag списка должен меняться при изменении каталога.
+    """
+    etag = client.get(MEETING_ROOMS_URL).headers["ETag"]
+    response = client.get(MEETING_ROOMS_URL, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.post(MEETING_ROOMS_URL, json={"name": "Новая переговорка с ETag"})
+    response = client.get(MEETING_ROOMS_URL, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+class LaggingClock(datetime):
+    """Часы процесса, отстающие от часов других процессов."""
+
+    @classmethod
+    def utcnow(cls) -> datetime:
+        return datetime(2000, 1, 1)
+
+
+def test_get_all_meeting_rooms_etag_ignores_clock(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    """Тест ETag списка при изменении с отстающими часами.
+
+    Версия списка берётся из счётчика изменений в базе, поэтому ETag
+    меняется, даже если время изменения меньше уже сохранённых.
+    """
+    room = client.post(
+        MEETING_ROOMS_URL, json={"name": "Переговорка с отстающими часами"}
+    ).json()
+    client.post(MEETING_ROOMS_URL, json={"name": "Более новая переговорка"})
+    etag = client.get(MEETING_ROOMS_URL).headers["ETag"]
+
+    monkeypatch.setattr("app.core.db.datetime", LaggingClock)
+    client.patch(
+        f"{MEETING_ROOMS_URL}{room['id']}", json={"description": "Правка"}
+    )
+    response = client.get(MEETING_ROOMS_URL, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_patch_meeting_room_if_match(client: TestClient):
+    """Тест PATCH и DELETE запросов с If-Match.
+
+    Изменение по устаревшему ETag должно вернуть 412, по актуальному -
+    выполниться.
+    """
+    room = client.post(
+        MEETING_ROOMS_URL, json={"name": "Переговорка с If-Match"}
+    ).json()
+    url = f"{MEETING_ROOMS_URL}{room['id']}"
+    etag = client.get(url).headers["ETag"]
+
+    response = client.patch(
+        url, json={"description": "Первая правка"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    new_etag = response.headers["ETag"]
+
+    response = client.patch(
+        url, json={"description": "Вторая правка"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    response = client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = client.delete(url, headers={"If-Match": new_etag})
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,291 @@
+import asyncio
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.feed import (
+    NOTIFY_PAYLOAD_MAX,
+    RESYNC,
+    UPDATE,
+    ChangeBroker,
+    ChangeEvent,
+    ChangeFeed,
+    stream_events,
+)
+from app.main import app
+from app.meeting_room.crud import meeting_room_crud, meeting_room_feed
+from app.meeting_room.schemas import MeetingRoomCreate, MeetingRoomUpdate
+from tests.conftest import SQLALCHEMY_DATABASE_URL, TestingSessionLocal
+
+
+async def next_event(subscription) -> ChangeEvent:
+    return await asyncio.wait_for(subscription.get(), 5)
+
+
+def drain(subscription) -> list[ChangeEvent]:
+    events = []
+    while subscription._events:
+        events.append(subscription._events.popleft())
+    return events
+
+
+async def read_stream(path: str, query: str = "", events: int = 1) -> bytes:
+    """Прочитать первые события потока и отключиться, как клиент."""
+    body = b""
+    received = asyncio.Event()
+
+    async def receive():
+        await received.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body += message.get("body", b"")
+            if body.count(b"\n\n") >= events:
+                received.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"test")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+    return body
+
+
+def test_broker_replays_events_after_sequence_number():
+    """Тест повтора событий после переподключения.
+
+    Подписчик с номером последнего события получает только события
+    после него, а если они вытеснены из буфера или номер неизвестен
+    брокеру - событие resync.
+    """
+    broker = ChangeBroker(buffer_size=3, queue_size=10)
+    for seq in range(1, 6):
+        broker.publish(ChangeEvent(seq, UPDATE, seq))
+
+    assert [event.seq for event in drain(broker.subscribe(3))] == [4, 5]
+    assert drain(broker.subscribe(5)) == []
+    assert drain(broker.subscribe(1)) == [ChangeEvent(5, RESYNC)]
+    assert drain(broker.subscribe(10)) == [ChangeEvent(5, RESYNC)]
+    assert drain(broker.subscribe()) == []
+
+
+def test_broker_replaces_lagging_queue_with_resync():
+    """Тест переполнения очереди медленного подписчика."""
+    broker = ChangeBroker(buffer_size=10, queue_size=2)
+    subscription = broker.subscribe()
+    for seq in range(1, 5):
+        broker.publish(ChangeEvent(seq, UPDATE, seq))
+
+    assert drain(subscription) == [
+        ChangeEvent(3, RESYNC),
+        ChangeEvent(4, UPDATE, 4),
+    ]
+    subscription.close()
+    assert broker.subscribers == 0
+
+
+def test_broker_reset_sends_resync():
+    """Тест сброса брокера после потери соединения с базой."""
+    broker = ChangeBroker(buffer_size=10, queue_size=10)
+    broker.publish(ChangeEvent(1, UPDATE, 1))
+    subscription = broker.subscribe()
+    broker.reset(7)
+
+    assert drain(subscription) == [ChangeEvent(7, RESYNC)]
+    assert drain(broker.subscribe(7)) == []
+    assert drain(broker.subscribe(1)) == [ChangeEvent(7, RESYNC)]
+
+
+async def test_crud_writes_publish_events():
+    """Тест событий методов записи CRUD.
+
+    События создания, изменения, удаления и восстановления должны
+    приходить после фиксации с растущими номерами, а изменения
+    откаченной транзакции - не приходить.
+    """
+    subscription = meeting_room_feed.broker.subscribe()
+    try:
+        async with TestingSessionLocal() as session:
+            room = await meeting_room_crud.create(
+                MeetingRoomCreate(name="Переговорка для ленты"), session
+            )
+            room = await meeting_room_crud.update(
+                room, MeetingRoomUpdate(description="Новое описание"), session
+            )
+            room = await meeting_room_crud.remove(room, session)
+            saved = await meeting_room_crud.bulk_create_or_restore(
+                [
+                    MeetingRoomCreate(name="Переговорка для ленты"),
+                    MeetingRoomCreate(name="Вторая переговорка для ленты"),
+                ],
+                session,
+            )
+
+            room_id = room.id
+            second_id = saved["Вторая переговорка для ленты"].id
+
+            await meeting_room_feed.publish(session, UPDATE, [{"id": room_id}])
+            await session.rollback()
+
+        events = [await next_event(subscription) for _ in range(5)]
+        assert [(event.kind, event.id) for event in events] == [
+            ("create", room_id),
+            ("update", room_id),
+            ("deactivate", room_id),
+            # События одного запроса нумеруются по возрастанию id.
+            ("restore", room_id),
+            ("create", second_id),
+        ]
+        assert [event.seq for event in events] == sorted(
+            {event.seq for event in events}
+        )
+        assert events[1].data["description"] == "Новое описание"
+        assert events[2].data["is_active"] is False
+        assert drain(subscription) == []
+    finally:
+        subscription.close()
+
+
+async def test_postgres_feed_delivers_after_commit():
+    """Тест доставки событий через LISTEN/NOTIFY.
+
+    Событие должно прийти слушателю только после фиксации транзакции,
+    с номером из счётчика в базе. Значения, не поместившиеся
+    в уведомление, заменяются идентификатором.
+    """
+    engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    feed = ChangeFeed(
+        "test_changes",
+        backend="postgres",
+        broker=ChangeBroker(buffer_size=10, queue_size=10),
+    )
+    subscription = feed.broker.subscribe()
+    try:
+        async with feed.listening(engine):
+            # Слушатель подключился и начал отсчёт.
+            assert (await next_event(subscription)).kind == RESYNC
+
+            async with session_factory() as session:
+                await feed.publish(session, UPDATE, [{"id": 1, "name": "Откат"}])
+                await session.rollback()
+                await feed.publish(
+                    session,
+                    UPDATE,
+                    [
+                        {"id": 2, "name": "Переговорка"},
+                        {"id": 3, "description": "x" * NOTIFY_PAYLOAD_MAX},
+                    ],
+                )
+                await session.commit()
+
+            first = await next_event(subscription)
+            second = await next_event(subscription)
+            assert (first.kind, first.id, first.data) == (
+                UPDATE,
+                2,
+                {"id": 2, "name": "Переговорка"},
+            )
+            assert (second.id, second.data) == (3, None)
+            assert second.seq == first.seq + 1
+            assert feed.broker.head == second.seq
+    finally:
+        subscription.close()
+        await engine.dispose()
+
+
+async def test_postgres_feed_orders_events_by_commit():
+    """Тест порядка событий конкурентных транзакций.
+
+    Транзакция, начавшая публикацию позже, не может зафиксироваться
+    раньше первой: её событие получает больший номер и приходит после.
+    Иначе клиент, переподключившийся с номером позднего события,
+    пропустил бы событие с меньшим номером.
+    """
+    engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    feed = ChangeFeed(
+        "test_order_changes",
+        backend="postgres",
+        broker=ChangeBroker(buffer_size=10, queue_size=10),
+    )
+    subscription = feed.broker.subscribe()
+
+    async def write_second() -> None:
+        async with session_factory() as session:
+            await feed.publish(session, UPDATE, [{"id": 2}])
+            await session.commit()
+
+    try:
+        async with feed.listening(engine):
+            assert (await next_event(subscription)).kind == RESYNC
+            async with session_factory() as first:
+                await feed.publish(first, UPDATE, [{"id": 1}])
+                second = asyncio.create_task(write_second())
+                await asyncio.sleep(0.2)
+                # Вторая транзакция ждёт фиксации первой.
+                assert not second.done()
+                await first.commit()
+            await second
+
+            events = [await next_event(subscription) for _ in range(2)]
+            assert [event.id for event in events] == [1, 2]
+            assert events[1].seq == events[0].seq + 1
+    finally:
+        subscription.close()
+        await engine.dispose()
+
+
+async def test_changes_endpoint_resumes_from_sequence_number():
+    """Тест потока изменений переговорок.
+
+    Клиент с номером последнего события должен получить пропущенные
+    события в формате Server-Sent Events, а с неизвестным номером -
+    событие resync.
+    """
+    after = meeting_room_feed.broker.head
+    # Подписчики приложения, например сброс кэша, остаются.
+    subscribers = meeting_room_feed.broker.subscribers
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Переговорка для потока"), session
+        )
+
+    body = await read_stream(
+        "/api/v1/meeting_rooms/changes", f"after={after}", events=1
+    )
+    event_id, event_kind, data = body.split(b"\n\n")[0].split(b"\n")
+    assert event_id == b"id: %d" % (after + 1)
+    assert event_kind == b"event: create"
+    data = orjson.loads(data.removeprefix(b"data: "))
+    assert (data["id"], data["name"]) == (room.id, "Переговорка для потока")
+
+    body = await read_stream(
+        "/api/v1/meeting_rooms/changes", f"after={after + 100}", events=1
+    )
+    assert body.startswith(b"id: %d\nevent: resync\n" % (after + 1))
+    assert meeting_room_feed.broker.subscribers == subscribers
+
+
+async def test_stream_sends_keepalive():
+    """Тест комментариев, поддерживающих соединение без событий."""
+    broker = ChangeBroker(buffer_size=10, queue_size=10)
+    stream = stream_events(broker.subscribe(), keepalive=0.01)
+    assert await anext(stream) == b": keepalive\n\n"
+    broker.publish(ChangeEvent(1, UPDATE, 1))
+    assert await anext(stream) == b'id: 1\nevent: update\ndata: {"id":1}\n\n'
+    await stream.aclose()
+    assert broker.subscribers == 0
@@ -0,0 +1,238 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi import HTTPException, Response, status
+from sqlalchemy import insert, select, update
+
+from app.core.db import fresh_timestamp
+from app.idempotency.models import IdempotencyKey
+from app.idempotency.store import IdempotencyStore, idempotency_store
+from app.main import app
+from tests.conftest import TestingSessionLocal, capture_statements
+
+URL = "/api/v1/meeting_rooms/"
+
+
+def make_store(**kwargs) -> IdempotencyStore:
+    options = {
+        "ttl_seconds": 60,
+        "lock_seconds": 60,
+        "wait_seconds": 1,
+        "poll_seconds": 0.01,
+        "cache_size": 10,
+        "cleanup_seconds": 60,
+    }
+    return IdempotencyStore(TestingSessionLocal, **{**options, **kwargs})
+
+
+class Handler:
+    """Обработчик, считающий вызовы."""
+
+    def __init__(self, status_code: int = status.HTTP_201_CREATED) -> None:
+        self.status_code = status_code
+        self.calls = 0
+
+    async def __call__(self) -> Response:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return Response(b'{"call":%d}' % self.calls, self.status_code)
+
+
+async def test_retry_replays_stored_response():
+    """Тест повтора запроса с тем же ключом.
+
+    Повтор должен получить сохранённый ответ без выполнения обработчика
+    и запросов к базе, а после очистки кэша процесса - ответ из базы.
+    Ключ с другим запросом отклоняется.
+    """
+    headers = {"Idempotency-Key": "create-room-1"}
+    body = {"name": "Переговорка с ключом"}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = await client.post(URL, json=body, headers=headers)
+        assert first.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in first.headers
+
+        with capture_statements() as statements:
+            retry = await client.post(URL, json=body, headers=headers)
+        assert statements == []
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.content == first.content
+        assert retry.headers["idempotent-replayed"] == "true"
+
+        await idempotency_store.cache.clear()
+        retry = await client.post(URL, json=body, headers=headers)
+        assert retry.content == first.content
+        assert retry.headers["idempotent-replayed"] == "true"
+
+        other = await client.post(
+            URL, json={"name": "Другая переговорка"}, headers=headers
+        )
+        assert other.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # Без ключа запрос выполняется как обычно.
+        duplicate = await client.post(URL, json=body)
+        assert duplicate.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_concurrent_requests_wait_for_first():
+    """Тест одновременных запросов с одним ключом.
+
+    Обработчик должен выполниться один раз, остальные запросы - получить
+    его ответ.
+    """
+    headers = {"Idempotency-Key": "create-room-concurrent"}
+    body = {"name": "Переговорка одновременных запросов"}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        responses = await asyncio.gather(
+            *(client.post(URL, json=body, headers=headers) for _ in range(5))
+        )
+    assert {response.status_code for response in responses} == {
+        status.HTTP_201_CREATED
+    }
+    assert len({response.content for response in responses}) == 1
+    assert [
+        "idempotent-replayed" in response.headers for response in responses
+    ].count(False) == 1
+
+
+async def test_server_errors_are_not_stored():
+    """Тест ответов 5xx и ошибок обработчика.
+
+    Такие ответы не сохраняются, и повтор выполняет обработчик заново.
+    """
+    store = make_store()
+    failing = Handler(status.HTTP_503_SERVICE_UNAVAILABLE)
+    await store.run("server-error", "a" * 64, failing)
+    await store.run("server-error", "a" * 64, failing)
+    assert failing.calls == 2
+
+    async def broken() -> Response:
+        raise RuntimeError("обработчик упал")
+
+    with pytest.raises(RuntimeError):
+        await store.run("broken", "a" * 64, broken)
+    handler = Handler()
+    await store.run("broken", "a" * 64, handler)
+    assert handler.calls == 1
+
+
+async def test_waits_for_request_in_other_process():
+    """Тест ожидания запроса с тем же ключом в другом процессе.
+
+    Пока ключ занят без ответа, запрос ждёт сохранённый ответ, а если
+    ответа нет дольше wait_seconds - получает 409.
+    """
+    store = make_store(wait_seconds=0.2)
+    fingerprint = "b" * 64
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            insert(IdempotencyKey).values(
+                key="other-process",
+                fingerprint=fingerprint,
+                expires_at=fresh_timestamp() + timedelta(minutes=1),
+            )
+        )
+        await session.commit()
+
+    handler = Handler()
+    with pytest.raises(HTTPException) as error:
+        await store.run("other-process", fingerprint, handler)
+    assert error.value.status_code == status.HTTP_409_CONFLICT
+
+    async def finish() -> None:
+        await asyncio.sleep(0.05)
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == "other-process")
+                .values(status_code=200, headers=[], body=b"{}")
+            )
+            await session.commit()
+
+    response, _ = await asyncio.gather(
+        store.run("other-process", fingerprint, handler), finish()
+    )
+    assert (response.status_code, response.body) == (200, b"{}")
+    assert handler.calls == 0
+
+
+async def test_cleanup_removes_expired_keys():
+    """Тест удаления устаревших ключей.
+
+    Устаревший ответ удаляется очисткой, а до неё повтор занимает ключ
+    заново и выполняет обработчик.
+    """
+    store = make_store(ttl_seconds=0)
+    handler = Handler()
+    await store.run("expired", "c" * 64, handler)
+    await store.run("expired", "c" * 64, handler)
+    assert handler.calls == 2
+
+    assert await store.cleanup() >= 1
+    async with TestingSessionLocal() as session:
+        assert (
+            await session.scalar(
+                select(IdempotencyKey.id).where(IdempotencyKey.key == "expired")
+            )
+        ) is None
+
+
+async def test_lease_is_extended_while_handler_runs():
+    """Тест продления занятого ключа.
+
+    Обработчик, который выполняется дольше lock_seconds, не должен
+    выполниться повторно в другом процессе: тот ждёт сохранённый ответ.
+    """
+    handler = Handler()
+
+    async def slow() -> Response:
+        await asyncio.sleep(0.5)
+        return await handler()
+
+    async def retry_in_other_process() -> Response:
+        await asyncio.sleep(0.3)
+        return await make_store(lock_seconds=0.15).run(
+            "slow-handler", "d" * 64, handler
+        )
+
+    first, retry = await asyncio.gather(
+        make_store(lock_seconds=0.15).run("slow-handler", "d" * 64, slow),
+        retry_in_other_process(),
+    )
+    assert handler.calls == 1
+    assert retry.body == first.body
+
+
+async def test_failed_save_keeps_key_claimed(monkeypatch: pytest.MonkeyPatch):
+    """Тест ошибки сохранения ответа.
+
+    Клиент получает ответ обработчика, а ключ не освобождается: ответ
+    сохраняется в фоне, и повтор в другом процессе получает его, не
+    выполняя обработчик.
+    """
+    store = make_store(lock_seconds=0.15)
+    store_response = store._store
+    failures = []
+
+    async def flaky_store(*args) -> None:
+        if not failures:
+            failures.append(args)
+            raise OSError("соединение с базой потеряно")
+        await store_response(*args)
+
+    monkeypatch.setattr(store, "_store", flaky_store)
+    handler = Handler()
+    first = await store.run("failed-save", "e" * 64, handler)
+    assert first.status_code == status.HTTP_201_CREATED
+    assert len(failures) == 1
+
+    await asyncio.sleep(0.3)
+    retry = await make_store().run("failed-save", "e" * 64, handler)
+    assert handler.calls == 1
+    assert (retry.body, retry.headers["idempotent-replayed"]) == (first.body, "true")
@@ -1,7 +1,19 @@
+import json
+
 from fastapi import status
 
 from fastapi.testclient import TestClient
 
+from tests.conftest import capture_statements
+
+
+def statement_kinds(statements: list[str]) -> list[str]:
+    """Виды SQL-запросов: проверка перед записью или запись."""
+    return [
+        "write" if statement.startswith("WITH written") else "check"
+        for statement in statements
+    ]
+
 
 def test_get_all_meeting_rooms(client: TestClient):
     """Тест GET запроса на получение списка переговорок.
@@ -66,3 +78,297 @@ def test_create_meeting_rooms_which_max_length_name(client: TestClient):
     )
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY,\
         "При POST-запросе к эндпоинту `/api/v1/meeting_rooms/`, поле name не должно быть > 100 символов."
+
+
+def test_get_all_meeting_rooms_pagination(client: TestClient):
+    """Тест постраничного GET запроса на получение списка переговорок.
+
+    Страницы, полученные по курсору из заголовка X-Next-Cursor, должны
+    идти по возрастанию id без пропусков и повторов.
+    """
+    for number in range(3):
+        client.post(
+            "/api/v1/meeting_rooms/",
+            json={"name": f"Страничная переговорка {number}"},
+        )
+    all_ids = [room["id"] for room in client.get("/api/v1/meeting_rooms/").json()]
+
+    page_ids = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/v1/meeting_rooms/", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= 2
+        page_ids += [room["id"] for room in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["after"] = response.headers["X-Next-Cursor"]
+    assert page_ids == sorted(all_ids)
+
+
+def test_get_all_meeting_rooms_filter_by_name(client: TestClient):
+    """Тест GET запроса на получение списка переговорок с фильтрами.
+
+    Фильтр name_prefix не должен трактовать % и _ как шаблон.
+    """
+    response = client.get(
+        "/api/v1/meeting_rooms/", params={"name_prefix": "Страничная"}
+    )
+    assert len(response.json()) == 3
+
+    response = client.get(
+        "/api/v1/meeting_rooms/", params={"name": "Страничная переговорка 1"}
+    )
+    assert [room["name"] for room in response.json()] == [
+        "Страничная переговорка 1"
+    ]
+
+    response = client.get("/api/v1/meeting_rooms/", params={"name_prefix": "%"})
+    assert response.json() == []
+
+
+def test_get_all_meeting_rooms_with_invalid_cursor(client: TestClient):
+    """Тест GET запроса на получение списка переговорок с битым курсором.
+
+    Эндпоинт должен вернуть ошибку 422.
+    """
+    response = client.get("/api/v1/meeting_rooms/", params={"after": "мусор"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_export_meeting_rooms(client: TestClient):
+    """Тест GET запроса на выгрузку каталога переговорок.
+
+    Выгрузка в NDJSON должна содержать по строке на каждую активную
+    переговорку, выгрузка в CSV - строку заголовка и те же строки.
+    """
+    rooms = client.get(
+        "/api/v1/meeting_rooms/", params={"limit": 1000}
+    ).json()
+
+    response = client.get("/api/v1/meeting_rooms/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == rooms
+
+    response = client.get("/api/v1/meeting_rooms/export", params={"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    lines = response.text.splitlines()
+    assert lines[0] == "name,description,id"
+    assert len(lines) == len(rooms) + 1
+
+
+def test_meeting_rooms_sparse_fields(client: TestClient):
+    """Тест выборки полей параметром fields.
+
+    Ответы списка, переговорки по id и выгрузки должны содержать
+    только запрошенные поля в порядке схемы, а неизвестное поле -
+    приводить к статусу 422.
+    """
+    meeting_room = client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Поля", "description": "Длинное описание"},
+    ).json()
+    params = {"name": "Поля", "fields": "id,name"}
+
+    response = client.get("/api/v1/meeting_rooms/", params=params)
+    assert response.json() == [{"name": "Поля", "id": meeting_room["id"]}]
+
+    response = client.get(
+        "/api/v1/meeting_rooms/", params={"name": "Поля", "fields": "name"}
+    )
+    assert response.json() == [{"name": "Поля"}]
+
+    response = client.get(
+        f"/api/v1/meeting_rooms/{meeting_room['id']}",
+        params={"fields": "description"},
+    )
+    assert response.json() == {"description": "Длинное описание"}
+    assert response.headers["etag"]
+
+    response = client.get(
+        "/api/v1/meeting_rooms/export", params={"format": "csv", "fields": "id"}
+    )
+    assert response.text.splitlines()[0] == "id"
+
+    response = client.get("/api/v1/meeting_rooms/", params={"fields": "is_active"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_lookup_meeting_rooms(client: TestClient):
+    """Тест POST запроса на получение нескольких переговорок.
+
+    Найденные переговорки возвращаются один раз, даже если запрошены
+    и по id, и по названию, а ненайденные и удалённые - перечисляются
+    отдельно.
+    """
+    first = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Поиск 1"}
+    ).json()
+    second = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Поиск 2"}
+    ).json()
+    deleted = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Поиск 3"}
+    ).json()
+    client.delete(f"/api/v1/meeting_rooms/{deleted['id']}")
+
+    response = client.post(
+        "/api/v1/meeting_rooms/lookup",
+        json={
+            "ids": [first["id"], deleted["id"], 10**6],
+            "names": ["Поиск 1", "Поиск 2", "Поиск 3", "Нет такой"],
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "items": [first, second],
+        "missing_ids": [deleted["id"], 10**6],
+        "missing_names": ["Поиск 3", "Нет такой"],
+    }
+
+
+def test_search_meeting_rooms(client: TestClient):
+    """Тест GET запроса на поиск переговорок.
+
+    Совпадение в названии должно быть выше совпадения в описании,
+    поиск должен находить начало слова в любом регистре, а курсор -
+    проходить по всем результатам.
+    """
+    in_name = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Квазары Большой"}
+    ).json()
+    in_description = client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Поиск в описании", "description": "Рядом с квазаром"},
+    ).json()
+    deleted = client.post(
+        "/api/v1/meeting_rooms/", json={"name": "Квазар удалённый"}
+    ).json()
+    client.delete(f"/api/v1/meeting_rooms/{deleted['id']}")
+
+    response = client.get("/api/v1/meeting_rooms/search", params={"q": "КВАЗ"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [in_name, in_description]
+
+    response = client.get(
+        "/api/v1/meeting_rooms/search",
+        params={"q": "квазар больш", "fields": "id"},
+    )
+    assert response.json() == [{"id": in_name["id"]}]
+
+    pages = []
+    params = {"q": "квазар", "limit": 1}
+    while True:
+        response = client.get("/api/v1/meeting_rooms/search", params=params)
+        pages.extend(response.json())
+        if "x-next-cursor" not in response.headers:
+            break
+        params["after"] = response.headers["x-next-cursor"]
+    assert pages == [in_name, in_description]
+
+    response = client.get("/api/v1/meeting_rooms/search", params={"q": "?!"})
+    assert response.json() == []
+
+    response = client.get(
+        "/api/v1/meeting_rooms/search", params={"q": "квазар", "after": "bad"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_create_meeting_room_restores_deleted(client: TestClient):
+    """Тест POST запроса на создание переговорки с именем удалённой.
+
+    Эндпоинт должен восстановить удалённую переговорку со статусом 201,
+    сохранив её идентификатор.
+    """
+    room = client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Восстанавливаемая переговорка", "description": "Старое"},
+    ).json()
+    client.delete(f"/api/v1/meeting_rooms/{room['id']}")
+
+    response = client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Восстанавливаемая переговорка"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == room
+
+
+def test_meeting_rooms_batch(client: TestClient):
+    """Тест пакетных запросов на создание, обновление и удаление.
+
+    Результат возвращается по каждому элементу в порядке запроса,
+    ошибки отдельных элементов не прерывают обработку пакета.
+    """
+    response = client.post(
+        "/api/v1/meeting_rooms/batch",
+        json=[
+            {"name": "Пакетная переговорка 1", "description": "Первая"},
+            {"name": "Пакетная переговорка 2"},
+            {"name": "Пакетная переговорка 1"},
+            {"name": "Главная переговорка"},
+        ],
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert [result["status_code"] for result in results] == [201, 201, 422, 422]
+    first, second = results[0]["data"], results[1]["data"]
+    assert first["description"] == "Первая"
+
+    response = client.patch(
+        "/api/v1/meeting_rooms/batch",
+        json=[
+            {"id": first["id"], "description": "Обновлённая"},
+            {"id": second["id"], "name": "Главная переговорка"},
+            {"id": 10**6, "description": "Нет такой"},
+        ],
+    )
+    results = response.json()
+    assert [result["status_code"] for result in results] == [200, 422, 404]
+    assert results[0]["data"] == {**first, "description": "Обновлённая"}
+
+    response = client.delete(
+        "/api/v1/meeting_rooms/batch",
+        params={"ids": [first["id"], second["id"], 10**6]},
+    )
+    results = response.json()
+    assert [result["status_code"] for result in results] == [200, 200, 404]
+    response = client.get(f"/api/v1/meeting_rooms/{first['id']}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_write_endpoints_statement_count(client: TestClient):
+    """Тест количества SQL-запросов эндпоинтов записи.
+
+    Запись с публикацией в ленту изменений - один запрос. Проверки
+    перед записью читают основную базу, а не кэш, и считаются явно:
+    существование переговорки и, при смене названия, его занятость.
+    """
+    with capture_statements() as statements:
+        response = client.post(
+            "/api/v1/meeting_rooms/",
+            json={"name": "Переговорка подсчёта запросов API"},
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert statement_kinds(statements) == ["write"]
+    room_url = f"/api/v1/meeting_rooms/{response.json()['id']}"
+
+    with capture_statements() as statements:
+        response = client.patch(room_url, json={"description": "Описание"})
+    assert response.status_code == status.HTTP_200_OK
+    assert statement_kinds(statements) == ["check", "write"]
+
+    with capture_statements() as statements:
+        response = client.patch(
+            room_url, json={"name": "Переименованная переговорка API"}
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert statement_kinds(statements) == ["check", "check", "write"]
+
+    with capture_statements() as statements:
+        response = client.delete(room_url)
+    assert response.status_code == status.HTTP_200_OK
+    assert statement_kinds(statements) == ["check", "write"]
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram, request_metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    """Тест гистограммы.
+
+    Значение на границе попадает в её корзину, а выгрузка содержит
+    накопленные количества.
+    """
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert (histogram.count, histogram.sum) == (4, 3.65)
+
+
+def test_metrics_are_keyed_on_route_template(client: TestClient):
+    """Тест эндпоинта /metrics.
+
+    Запросы к разным объектам должны учитываться в одном ряду по
+    шаблону маршрута, а статусы ответов - считаться отдельно.
+    """
+    request_metrics.clear()
+    for meeting_room_id in (10**6, 10**6 + 1):
+        client.get(f"/api/v1/meeting_rooms/{meeting_room_id}")
+    client.get("/api/v1/no-such-route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    labels = (
+        'method="GET",route="/api/v1/meeting_rooms/{meeting_room_id}",'
+        'handler="get_meeting_room_by_id"'
+    )
+    lines = response.text.splitlines()
+    assert f'http_requests_total{{{labels},status="404"}} 2' in lines
+    assert f'http_request_duration_seconds_count{{{labels}}} 2' in lines
+    assert any(
+        line.startswith('http_requests_total{method="GET",route="unmatched"')
+        for line in lines
+    )
+    assert any(line.startswith("db_pool_checkouts_total ") for line in lines)
@@ -0,0 +1,48 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.pool import InstrumentedAsyncAdaptedQueuePool, get_pool_stats
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+
+async def test_pool_stats_track_checkouts_and_timeouts():
+    """Тест счётчиков пула соединений.
+
+    Пул должен считать выданные соединения, переполнение и таймауты
+    ожидания свободного соединения. Ожидание, закончившееся таймаутом,
+    не входит во время ожидания выданных соединений.
+    """
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            stats = get_pool_stats(engine)
+            assert (stats.size, stats.checked_out, stats.overflow) == (1, 2, 1)
+
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = get_pool_stats(engine)
+        assert stats.checked_out == 0
+        assert (stats.checkouts, stats.timeouts) == (2, 1)
+        assert stats.wait_max_ms < 100
+    finally:
+        await engine.dispose()
+
+
+def test_get_pool_stats(client: TestClient):
+    """Тест GET запроса на получение состояния пула соединений."""
+    response = client.get("/api/v1/internal/pool")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["pool_class"] == "InstrumentedAsyncAdaptedQueuePool"
@@ -0,0 +1,97 @@
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+
+from app.core.profiling import (
+    QueryStats,
+    QueryStatsMiddleware,
+    StatementBudgetExceeded,
+    _current_stats,
+)
+from tests.conftest import engine
+
+
+def make_app(statements: int, **middleware_options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, **middleware_options)
+
+    @app.get("/")
+    async def run_statements():
+        async with engine.connect() as connection:
+            for _ in range(statements):
+                await connection.execute(text("SELECT 1"))
+        return {}
+
+    return app
+
+
+def test_server_timing_header(client: TestClient):
+    """Тест заголовка Server-Timing.
+
+    Ответ должен содержать количество и суммарное время SQL-запросов.
+    """
+    response = client.get("/api/v1/meeting_rooms/")
+    timing = response.headers["server-timing"]
+    match = re.match(r'db;dur=[\d.]+;desc="(\d+) statements", total;dur=', timing)
+    assert match, timing
+    assert int(match.group(1)) > 0
+
+
+def test_statement_budget_fails_in_strict_mode():
+    """Тест бюджета SQL-запросов.
+
+    В строгом режиме превышение бюджета должно завершать запрос ошибкой.
+    """
+    with TestClient(make_app(2, budget=2, strict=True)) as client:
+        assert client.get("/").status_code == 200
+    with TestClient(make_app(3, budget=2, strict=True)) as client:
+        with pytest.raises(StatementBudgetExceeded):
+            client.get("/")
+    with TestClient(make_app(3, budget=2, strict=False)) as client:
+        assert client.get("/").status_code == 200
+
+
+def test_repeated_statements_are_flagged(caplog):
+    """Тест обнаружения N+1.
+
+    Запрос, повторённый не меньше порогового числа раз, должен
+    попадать в лог с предупреждением.
+    """
+    app = make_app(3, budget=0, n_plus_one_threshold=3)
+    with caplog.at_level(logging.INFO, logger="app.core.profiling"):
+        with TestClient(app) as client:
+            client.get("/")
+    warnings = [
+        record for record in caplog.records if record.levelno == logging.WARNING
+    ]
+    assert len(warnings) == 1
+    assert warnings[0].repeated == 3
+    assert warnings[0].statement == "SELECT 1"
+
+
+async def test_failed_statement_leaves_no_state():
+    """Тест запроса, завершившегося ошибкой.
+
+    Для него не вызывается after_cursor_execute: замер не должен
+    оставлять данных в соединении, а следующие запросы - учитываться
+    как обычно.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            info = repr(connection.info)
+            for _ in range(3):
+                with pytest.raises(exc.DBAPIError):
+                    await connection.execute(text("SELECT 1 / 0"))
+                await connection.rollback()
+            await connection.execute(text("SELECT 2"))
+            assert repr(connection.info) == info
+    finally:
+        _current_stats.reset(token)
+    assert stats.count == 2
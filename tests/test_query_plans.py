@@ -0,0 +1,224 @@
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import cache
+from app.meeting_room.crud import meeting_room_crud
+from app.meeting_room.models import MeetingRoom
+from app.meeting_room.schemas import MeetingRoomCreate, MeetingRoomUpdate
+from app.reservation.availability import AvailabilityIndex
+from app.reservation.crud import reservation_crud
+from benchmarks.dataset import load
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+# Планы проверяются в отдельной схеме, чтобы объём данных не влиял
+# на остальные тесты.
+SCHEMA = "query_plans"
+ROOMS = 100_000
+SCHEDULED_ROOMS = 1000
+DAYS = 5
+START = date.today() - timedelta(days=2)
+NOON = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=12)
+
+
+@dataclass
+class PlanCase:
+    """Запрос CRUD и ожидания к его плану.
+
+    Args:
+        call (Callable): Вызов метода CRUD с сессией.
+        indexes (set[str]): Индексы, которые должны быть в плане.
+        seq_scans (set[str]): Таблицы, которые запрос читает целиком
+            по смыслу и может перебирать последовательно.
+    """
+
+    call: Callable[[AsyncSession], Awaitable[Any]]
+    indexes: set[str] = field(default_factory=set)
+    seq_scans: set[str] = field(default_factory=set)
+
+
+CASES = {
+    "get_active_page": PlanCase(
+        lambda session: meeting_room_crud.get_active_page(session, None, 100),
+    ),
+    "get_active_page_after": PlanCase(
+        lambda session: meeting_room_crud.get_active_page(session, ROOMS // 2, 100),
+    ),
+    "get_active_page_columns": PlanCase(
+        lambda session: meeting_room_crud.get_active_page(
+            session, None, 100, columns=[MeetingRoom.id, MeetingRoom.name]
+        ),
+        indexes={"ix_meetingroom_active_id"},
+    ),
+    "get_active_page_name_prefix": PlanCase(
+        lambda session: meeting_room_crud.get_active_page(
+            session, None, 100, name_prefix="Переговорка 123"
+        ),
+        indexes={"ix_meetingroom_active_name_pattern"},
+    ),
+    "get_version": PlanCase(
+        meeting_room_crud.get_version,
+        seq_scans={"changecounter"},
+    ),
+    "get_by_id": PlanCase(
+        lambda session: meeting_room_crud.get_by_id(123, session),
+        indexes={"meetingroom_pkey"},
+    ),
+    "get_many": PlanCase(
+        lambda session: meeting_room_crud.get_many([1, 2, 3], session),
+        indexes={"meetingroom_pkey"},
+    ),
+    "get_many_by_name": PlanCase(
+        lambda session: meeting_room_crud.get_many_by_name(
+            ["Переговорка 5", "Переговорка 6"], session
+        ),
+    ),
+    "get_room_by_name": PlanCase(
+        lambda session: meeting_room_crud.get_room_by_name("Переговорка 7", session),
+    ),
+    "get_room_ids_by_names": PlanCase(
+        lambda session: meeting_room_crud.get_room_ids_by_names(
+            ["Переговорка 8"], session
+        ),
+    ),
+    "search": PlanCase(
+        lambda session: meeting_room_crud.search(
+            session, "Переговорка 1234", [MeetingRoom.id]
+        ),
+        indexes={"ix_meetingroom_search_vector"},
+    ),
+    "get_all_active": PlanCase(
+        meeting_room_crud.get_all_active,
+        seq_scans={"meetingroom"},
+    ),
+    "get_available": PlanCase(
+        lambda session: meeting_room_crud.get_available(
+            NOON, NOON + timedelta(hours=1), session
+        ),
+        indexes={"ex_reservation_overlap"},
+        seq_scans={"meetingroom"},
+    ),
+    "get_intersecting_reservations": PlanCase(
+        lambda session: reservation_crud.get_intersecting_reservations(
+            5, NOON, NOON + timedelta(hours=1), session
+        ),
+        indexes={"ex_reservation_overlap"},
+    ),
+    "availability_index_load": PlanCase(
+        lambda session: AvailabilityIndex(refresh_seconds=60).load(session),
+        indexes={"ix_reservation_active_room_from"},
+    ),
+    "update": PlanCase(
+        lambda session: meeting_room_crud.update(
+            MeetingRoom(id=10), MeetingRoomUpdate(description="План"), session
+        ),
+        indexes={"meetingroom_pkey"},
+    ),
+    "bulk_update": PlanCase(
+        lambda session: meeting_room_crud.bulk_update(
+            [(11, MeetingRoomUpdate(description="План"))], session
+        ),
+        indexes={"meetingroom_pkey"},
+    ),
+    "bulk_remove": PlanCase(
+        lambda session: meeting_room_crud.bulk_remove([12, 13], session),
+        indexes={"meetingroom_pkey"},
+    ),
+    "bulk_create_or_restore": PlanCase(
+        lambda session: meeting_room_crud.bulk_create_or_restore(
+            [MeetingRoomCreate(name="Переговорка 12")], session
+        ),
+    ),
+}
+
+
+def plan_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+@pytest.fixture(scope="module")
+async def plan_engine():
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await load(conn, ROOMS, DAYS, 0, START, SCHEDULED_ROOMS)
+    async with engine.connect() as conn:
+        # Карта видимости нужна планировщику для Index Only Scan.
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+    yield engine
+    await cache.clear()
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def explain_case(engine, case: PlanCase) -> list[list[dict]]:
+    """Выполнить запросы метода CRUD и получить их планы."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    # Идентификаторы в схеме планов совпадают с основными тестами,
+    # поэтому кэш очищается и до, и после вызова.
+    await cache.clear()
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            await case.call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        await cache.clear()
+
+    plans = []
+    async with engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        for statement, parameters in statements:
+            plan = await driver.fetchval(
+                f"EXPLAIN (FORMAT JSON) {statement}", *parameters
+            )
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append(plan_nodes(plan[0]["Plan"]))
+    return plans
+
+
+@pytest.mark.parametrize("name", CASES)
+async def test_query_plan(plan_engine, name: str):
+    """Тест планов запросов CRUD на реалистичном объёме данных.
+
+    Запросы не должны перебирать таблицы последовательно, кроме тех,
+    что читают таблицу целиком по смыслу, и должны использовать
+    ожидаемые индексы.
+    """
+    case = CASES[name]
+    plans = await explain_case(plan_engine, case)
+    assert plans, f"{name}: запросы не выполнялись"
+
+    nodes = [node for plan in plans for node in plan]
+    seq_scans = {
+        node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"
+    }
+    assert seq_scans <= case.seq_scans, (
+        f"{name}: последовательное чтение {sorted(seq_scans - case.seq_scans)}"
+    )
+    used_indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert case.indexes <= used_indexes, (
+        f"{name}: не используются индексы {sorted(case.indexes - used_indexes)}, "
+        f"используются {sorted(used_indexes)}"
+    )
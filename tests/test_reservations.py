@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.reservation.crud import reservation_crud
+from app.reservation.schemas import ReservationCreate
+from tests.conftest import TestingSessionLocal
+
+RESERVATIONS_URL = "/api/v1/reservations/"
+
+
+@pytest.fixture(scope="module")
+def meeting_room_id(client: TestClient) -> int:
+    response = client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Переговорка для бронирования"},
+    )
+    return response.json()["id"]
+
+
+def reserve(
+    client: TestClient,
+    meeting_room_id: int,
+    from_reserve: str,
+    to_reserve: str,
+):
+    return client.post(
+        RESERVATIONS_URL,
+        json={
+            "meetingroom_id": meeting_room_id,
+            "from_reserve": from_reserve,
+            "to_reserve": to_reserve,
+            "owner": "Иванов",
+        },
+    )
+
+
+def test_create_reservation(client: TestClient, meeting_room_id: int):
+    """Тест POST запроса на создание бронирования.
+
+    Эндпоинт должен создать бронирование со статусом 201.
+    """
+    response = reserve(
+        client, meeting_room_id, "2030-01-01T10:00", "2030-01-01T11:00"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["meetingroom_id"] == meeting_room_id
+
+
+def test_create_intersecting_reservation(
+    client: TestClient,
+    meeting_room_id: int,
+):
+    """Тест POST запроса на бронирование занятого времени.
+
+    Эндпоинт должен вернуть ошибку 422 при пересечении интервалов,
+    смежные интервалы пересечением не считаются.
+    """
+    response = reserve(
+        client, meeting_room_id, "2030-01-01T10:30", "2030-01-01T11:30"
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = reserve(
+        client, meeting_room_id, "2030-01-01T11:00", "2030-01-01T12:00"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_cancelled_reservation_frees_time(
+    client: TestClient,
+    meeting_room_id: int,
+):
+    """Тест DELETE запроса на отмену бронирования.
+
+    После отмены время снова должно быть доступно для бронирования.
+    """
+    response = reserve(
+        client, meeting_room_id, "2030-01-02T10:00", "2030-01-02T11:00"
+    )
+    client.delete(f"{RESERVATIONS_URL}{response.json()['id']}")
+
+    response = reserve(
+        client, meeting_room_id, "2030-01-02T10:00", "2030-01-02T11:00"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_create_reservation_for_unknown_room(client: TestClient):
+    """Тест POST запроса на бронирование несуществующей переговорки.
+
+    Эндпоинт должен вернуть ошибку 404.
+    """
+    response = reserve(client, 10**6, "2030-01-01T10:00", "2030-01-01T11:00")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_concurrent_reservations(meeting_room_id: int):
+    """Тест конкурентного бронирования одного и того же времени.
+
+    Из двух одновременных транзакций успешной должна быть только одна.
+    """
+    reservation = ReservationCreate(
+        meetingroom_id=meeting_room_id,
+        from_reserve="2030-01-03T10:00",
+        to_reserve="2030-01-03T11:00",
+        owner="Петров",
+    )
+
+    async def create():
+        async with TestingSessionLocal() as session:
+            return await reservation_crud.create(reservation, session)
+
+    results = await asyncio.gather(create(), create(), return_exceptions=True)
+    errors = [
+        result for result in results if isinstance(result, IntegrityError)
+    ]
+    assert len(errors) == 1
+
+
+def test_create_reservation_with_timezone(
+    client: TestClient,
+    meeting_room_id: int,
+):
+    """Тест POST запроса на бронирование со временем в часовом поясе.
+
+    Время должно сохраняться в UTC, и пересечение проверяется с уже
+    созданными бронированиями без часового пояса.
+    """
+    response = reserve(
+        client,
+        meeting_room_id,
+        "2030-01-04T13:00+03:00",
+        "2030-01-04T14:00+03:00",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["from_reserve"] == "2030-01-04T10:00:00"
+
+    response = reserve(
+        client, meeting_room_id, "2030-01-04T10:30", "2030-01-04T11:30"
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_update_reservation_with_null(
+    client: TestClient,
+    meeting_room_id: int,
+):
+    """Тест PATCH запроса с пустым временем бронирования.
+
+    Эндпоинт должен вернуть ошибку 422.
+    """
+    response = reserve(
+        client, meeting_room_id, "2030-01-05T10:00", "2030-01-05T11:00"
+    )
+    response = client.patch(
+        f"{RESERVATIONS_URL}{response.json()['id']}",
+        json={"to_reserve": None},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,70 @@
+import httpx
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, field_serializer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.routing import SessionReleasingRoute
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+
+def make_app(engine, route_class: type[APIRoute]) -> FastAPI:
+    """Приложение, которое отдаёт число выданных пулом соединений.
+
+    Число замеряется во время сериализации ответа.
+    """
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    class CheckedOut(BaseModel):
+        value: int
+
+        @field_serializer("value")
+        def serialize_value(self, value: int) -> int:
+            return engine.sync_engine.pool.checkedout()
+
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/query", response_model=CheckedOut)
+    async def query(session: AsyncSession = Depends(get_session)) -> dict:
+        return {"value": (await session.execute(text("SELECT 1"))).scalar()}
+
+    @router.get("/idle", response_model=CheckedOut)
+    async def idle(session: AsyncSession = Depends(get_session)) -> dict:
+        return {"value": 0}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+@pytest.mark.parametrize(
+    "route_class, checked_out",
+    [(APIRoute, 1), (SessionReleasingRoute, 0)],
+)
+async def test_session_released_before_serialization(route_class, checked_out):
+    """Тест освобождения соединения до сериализации ответа.
+
+    С обычным маршрутом соединение выдано, пока ответ сериализуется,
+    с SessionReleasingRoute оно уже возвращено в пул. Эндпоинт, который
+    не обращается к базе, соединение не берёт.
+    """
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, pool_size=1
+    )
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=make_app(engine, route_class)),
+            base_url="http://test",
+        ) as client:
+            assert (await client.get("/query")).json() == {"value": checked_out}
+            assert (await client.get("/idle")).json() == {"value": 0}
+        assert engine.sync_engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
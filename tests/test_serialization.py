@@ -0,0 +1,54 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.serialization import dump_rows
+from app.meeting_room.schemas import MeetingRoomResponse
+
+FIELDS = list(MeetingRoomResponse.model_fields)
+
+
+def slow_path(rows: list[tuple]) -> bytes:
+    """Ответ, который FastAPI построил бы через response_model."""
+    items = [
+        MeetingRoomResponse.model_validate(dict(zip(FIELDS, row))).model_dump(
+            exclude_none=True
+        )
+        for row in rows
+    ]
+    return JSONResponse(jsonable_encoder(items)).body
+
+
+def test_dump_rows_matches_json_response():
+    """Тест побайтной совместимости быстрой сериализации.
+
+    Управляющие символы, кавычки, кириллица и символы вне BMP должны
+    кодироваться так же, как в JSONResponse.
+    """
+    tricky = "".join(chr(code) for code in range(32)) + '"\\/ Ёж 😀  \x7f'
+    rows = [
+        ("Переговорка", None, 1),
+        (tricky[:100], tricky, 2**31 - 1),
+        ("x", "y", 3),
+    ]
+    assert dump_rows(rows, FIELDS) == slow_path(rows)
+    assert dump_rows([], FIELDS) == b"[]"
+
+
+def test_list_response_matches_schema(client: TestClient):
+    """Тест списка переговорок.
+
+    Быстрый путь должен отдавать те же байты, что и валидация
+    через MeetingRoomResponse.
+    """
+    client.post(
+        "/api/v1/meeting_rooms/",
+        json={"name": "Сериализация \"1\"", "description": "Этаж\t2"},
+    )
+    response = client.get("/api/v1/meeting_rooms/")
+    assert response.headers["content-type"] == "application/json"
+    rows = [
+        tuple(item.get(field) for field in FIELDS) for item in response.json()
+    ]
+    assert rows
+    assert response.content == slow_path(rows)
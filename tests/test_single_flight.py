@@ -0,0 +1,215 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.cache import cache
+from app.core.singleflight import SingleFlight
+from app.meeting_room.crud import meeting_room_crud
+from app.meeting_room.schemas import MeetingRoomCreate
+from tests.conftest import TestingSessionLocal, capture_statements
+
+
+class Gate:
+    """Загрузка, которая ждёт разрешения завершиться."""
+
+    def __init__(self, result=None, error: Exception | None = None) -> None:
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.open = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.open.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def settle() -> None:
+    """Дать запущенным задачам дойти до ожидания."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def start(flights: SingleFlight, load, count: int) -> list[asyncio.Task]:
+    tasks = [
+        asyncio.create_task(flights.do("key", load)) for _ in range(count)
+    ]
+    await settle()
+    return tasks
+
+
+async def test_single_flight_shares_result_and_error():
+    """Тест объединения одинаковых загрузок.
+
+    Одновременные запросы с одним ключом должны получить результат или
+    ошибку одной загрузки, а после её завершения запрос выполняет
+    загрузку заново.
+    """
+    flights = SingleFlight()
+    load = Gate(result=[1])
+    tasks = await start(flights, load, 5)
+    assert flights.stats().in_flight == 1
+    load.open.set()
+    assert await asyncio.gather(*tasks) == [[1]] * 5
+    assert load.calls == 1
+
+    failing = Gate(error=ValueError("нет базы"))
+    tasks = await start(flights, failing, 3)
+    failing.open.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert failing.calls == 1
+
+    again = Gate(result=[2])
+    again.open.set()
+    assert await flights.do("key", again) == [2]
+    stats = flights.stats()
+    assert (stats.executed, stats.coalesced, stats.errors, stats.in_flight) == (
+        3,
+        6,
+        1,
+        0,
+    )
+
+
+async def test_single_flight_cancellation():
+    """Тест отмены запросов.
+
+    Отмена ожидающего запроса не должна влиять на загрузку, а после
+    отмены запроса, выполнявшего загрузку, её должен повторить один
+    из ожидающих.
+    """
+    flights = SingleFlight()
+    load = Gate(result="строки")
+    leader, follower, other = await start(flights, load, 3)
+
+    follower.cancel()
+    await settle()
+    assert load.calls == 1
+
+    leader.cancel()
+    await settle()
+    assert load.calls == 2
+    load.open.set()
+    assert await other == "строки"
+    for task in (leader, follower):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert flights.stats().in_flight == 0
+
+
+async def test_single_flight_forget():
+    """Тест загрузки после записи.
+
+    Запрос, пришедший после записи, не должен получить результат
+    загрузки, начатой до неё.
+    """
+    flights = SingleFlight()
+    before = Gate(result="до записи")
+    (first,) = await start(flights, before, 1)
+    flights.forget("key")
+    after = Gate(result="после записи")
+    (second,) = await start(flights, after, 1)
+    before.open.set()
+    after.open.set()
+    assert await first == "до записи"
+    assert await second == "после записи"
+
+
+async def test_crud_reads_share_one_query():
+    """Тест объединения чтений CRUD.
+
+    Одновременные чтения по id и по названию в разных сессиях должны
+    выполнить по одному запросу, а каждая сессия - получить свои
+    объекты. Списки активных объектов не объединяются.
+    """
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Переговорка для объединения"), session
+        )
+    reads = {
+        "id": lambda session: meeting_room_crud.get_by_id(room.id, session),
+        "name": lambda session: meeting_room_crud.get_room_by_name(
+            room.name, session
+        ),
+    }
+    for name, read in reads.items():
+        await cache.clear()
+        sessions = [TestingSessionLocal() for _ in range(5)]
+        try:
+            with capture_statements() as statements:
+                results = await asyncio.gather(
+                    *(read(session) for session in sessions)
+                )
+            assert len(statements) == 1, name
+            for session, result in zip(sessions, results):
+                rooms = result if isinstance(result, list) else [result]
+                found = [item for item in rooms if item.id == room.id]
+                assert [item.name for item in found] == [room.name], name
+                assert all(item in session for item in rooms), name
+        finally:
+            for session in sessions:
+                await session.close()
+
+
+async def test_active_rooms_share_one_list():
+    """Тест объединения чтений списка активных переговорок.
+
+    Одновременные чтения в разных сессиях должны выполнить один запрос
+    и получить один и тот же список без восстановления строк в каждой
+    сессии. Чтение после записи не присоединяется к загрузке,
+    начатой до неё.
+    """
+    async with TestingSessionLocal() as session:
+        room = await meeting_room_crud.create(
+            MeetingRoomCreate(name="Переговорка общего списка"), session
+        )
+    sessions = [TestingSessionLocal() for _ in range(5)]
+    try:
+        with capture_statements() as statements:
+            results = await asyncio.gather(
+                *(meeting_room_crud.get_all_active(session) for session in sessions)
+            )
+        assert len(statements) == 1
+        assert all(result is results[0] for result in results)
+        assert room.id in [item.id for item in results[0]]
+    finally:
+        for session in sessions:
+            await session.close()
+
+    async with TestingSessionLocal() as reader, TestingSessionLocal() as writer:
+        # Загрузка, начатая до записи, ждёт разрешения выполнить запрос.
+        gate = asyncio.Event()
+        scalars = reader.scalars
+
+        async def gated_scalars(*args, **kwargs):
+            await gate.wait()
+            return await scalars(*args, **kwargs)
+
+        reader.scalars = gated_scalars
+        before = asyncio.create_task(meeting_room_crud.get_all_active(reader))
+        await asyncio.sleep(0)
+        await meeting_room_crud.remove(room, writer)
+        async with TestingSessionLocal() as session:
+            after = await asyncio.wait_for(
+                meeting_room_crud.get_all_active(session), 5
+            )
+            assert room.id not in [item.id for item in after]
+        gate.set()
+        await before
+
+
+def test_get_single_flight_stats(client: TestClient):
+    """Тест GET запроса на получение счётчиков объединения чтений."""
+    response = client.get("/api/v1/internal/single_flight")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()) == {
+        "executed",
+        "coalesced",
+        "errors",
+        "in_flight",
+    }
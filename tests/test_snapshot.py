@@ -0,0 +1,206 @@
+import asyncio
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor
+from app.core.serialization import dump_rows
+from app.main import app
+from app.meeting_room.crud import meeting_room_feed
+from app.meeting_room.snapshot import (
+    RESPONSE_FIELDS,
+    CatalogSnapshot,
+    catalog_snapshot,
+)
+from tests.conftest import TestingSessionLocal, engine
+
+URL = "/api/v1/meeting_rooms/"
+
+RoomRow = namedtuple("RoomRow", [*RESPONSE_FIELDS, "created", "updated"])
+
+
+@contextmanager
+def count_checkouts():
+    """Посчитать соединения, выданные пулом тестового движка."""
+    checkouts = []
+
+    def on_checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine, "checkout", on_checkout)
+
+
+async def wait_for_snapshot():
+    for _ in range(500):
+        if catalog_snapshot.current() is not None:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Снимок каталога не перестроен")
+
+
+async def terminate_listener():
+    """Оборвать соединение, слушающее ленту изменений."""
+    async with engine.connect() as connection:
+        await connection.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE query LIKE :query AND pid <> pg_backend_pid()"
+            ),
+            {"query": "SELECT coalesce(max(value), 0)%"},
+        )
+
+
+def test_snapshot_pages_match_database_order():
+    """Тест страниц снимка каталога.
+
+    Страницы должны строиться по id, как get_active_page, а готовые
+    строки JSON - совпадать с сериализацией dump_rows.
+    """
+    created = datetime(2024, 1, 1)
+    rows = [
+        RoomRow(
+            name=f"Комната {room_id}",
+            description=None if room_id % 2 else "Окно",
+            id=room_id,
+            created=created,
+            updated=None,
+        )
+        for room_id in (2, 3, 5, 8, 13)
+    ]
+    snapshot = CatalogSnapshot.build(13, rows)
+
+    page = snapshot.page(after=3, limit=2)
+    assert [snapshot.rows[index].id for index in page.items] == [5, 8]
+    assert decode_cursor(page.next_cursor) == 8
+    assert snapshot.page(after=8, limit=2).next_cursor is None
+    assert snapshot.page(name="Комната 5").items == [2]
+    assert snapshot.page(after=5, name="Комната 5").items == []
+    assert [
+        snapshot.rows[index].id
+        for index in snapshot.page(name_prefix="Комната 1").items
+    ] == [13]
+
+    all_rows = range(len(rows))
+    assert snapshot.dump(all_rows, RESPONSE_FIELDS) == dump_rows(
+        ([getattr(row, field) for field in RESPONSE_FIELDS] for row in rows),
+        RESPONSE_FIELDS,
+    )
+    assert snapshot.dump([0], ["id"]) == b'[{"id":2}]'
+    assert snapshot.get(13) is rows[-1] and snapshot.get(4) is None
+
+
+async def test_snapshot_serves_reads_without_database():
+    """Тест чтения каталога из снимка.
+
+    Список и переговорка по id должны отдаваться без соединения
+    с базой данных теми же байтами и с теми же ETag, что и из базы.
+    После записи чтение идёт в базу, пока снимок не перестроен.
+    """
+    # Подписчики приложения, например сброс кэша, остаются.
+    subscribers = meeting_room_feed.broker.subscribers
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        room = await client.post(URL, json={"name": "Переговорка из снимка"})
+        room_url = f"{URL}{room.json()['id']}"
+        requests = [
+            (URL, {}),
+            (URL, {"name_prefix": "Переговорка из", "fields": "name"}),
+            (room_url, {}),
+            (f"{URL}999999", {}),
+        ]
+        from_database = [
+            await client.get(url, params=params) for url, params in requests
+        ]
+
+        async with catalog_snapshot.following(
+            meeting_room_feed, TestingSessionLocal
+        ):
+            assert catalog_snapshot.current() is not None
+            with count_checkouts() as checkouts:
+                from_snapshot = [
+                    await client.get(url, params=params)
+                    for url, params in requests
+                ]
+            assert checkouts == []
+            for expected, response in zip(from_database, from_snapshot):
+                assert response.status_code == expected.status_code
+                assert response.content == expected.content
+                assert response.headers.get("ETag") == expected.headers.get("ETag")
+
+            await client.patch(room_url, json={"description": "Новое"})
+            assert catalog_snapshot.current() is None
+            assert (await client.get(room_url)).json()["description"] == "Новое"
+
+            await wait_for_snapshot()
+            with count_checkouts() as checkouts:
+                response = await client.get(room_url)
+            assert checkouts == []
+            assert response.json()["description"] == "Новое"
+
+            await client.delete(room_url)
+            await wait_for_snapshot()
+            assert (await client.get(room_url)).status_code == 404
+
+        assert catalog_snapshot.current() is None
+        assert meeting_room_feed.broker.subscribers == subscribers
+
+
+async def test_snapshot_follows_postgres_feed(monkeypatch: pytest.MonkeyPatch):
+    """Тест снимка каталога с лентой через LISTEN/NOTIFY.
+
+    Уведомление о записи приходит позже ответа на неё, но следующий
+    запрос того же процесса должен увидеть запись. Пока соединение
+    с LISTEN потеряно, чтение идёт в базу.
+    """
+    monkeypatch.setattr(meeting_room_feed, "backend", "postgres")
+    monkeypatch.setattr(settings, "change_feed_retry_seconds", 0.2)
+    on_notify = meeting_room_feed._on_notify
+
+    def late_notify(*args):
+        asyncio.get_running_loop().call_later(0.2, on_notify, *args)
+
+    # Уведомления приходят с задержкой, как при нагрузке на базу.
+    monkeypatch.setattr(meeting_room_feed, "_on_notify", late_notify)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        async with meeting_room_feed.listening(
+            engine
+        ), catalog_snapshot.following(meeting_room_feed, TestingSessionLocal):
+            await wait_for_snapshot()
+
+            room = await client.post(URL, json={"name": "Переговорка из NOTIFY"})
+            room_url = f"{URL}{room.json()['id']}"
+            assert (await client.get(room_url)).status_code == 200
+
+            etag = (await client.get(room_url)).headers["ETag"]
+            await client.patch(room_url, json={"description": "Новое"})
+            response = await client.get(room_url)
+            assert response.json()["description"] == "Новое"
+            assert response.headers["ETag"] != etag
+
+            await wait_for_snapshot()
+            with count_checkouts() as checkouts:
+                response = await client.get(room_url)
+            assert checkouts == []
+            assert response.json()["description"] == "Новое"
+
+            await terminate_listener()
+            for _ in range(500):
+                if not meeting_room_feed.live:
+                    break
+                await asyncio.sleep(0.01)
+            assert catalog_snapshot.current() is None
+            await wait_for_snapshot()
+
+        assert catalog_snapshot.current() is None